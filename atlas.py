@@ -0,0 +1,145 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+# выравнивание блоков атласа по строке кэша
+ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+# =====================================================
+# Спрайт с заранее посчитанными данными для наложения
+# =====================================================
+class Sprite:
+    __slots__ = ("bgra", "bgr", "mask", "box", "opaque", "blended")
+
+    def __init__(self, bgra: np.ndarray):
+        self.bgra = bgra
+        alpha = bgra[..., 3]
+        # полупрозрачные пиксели -> нужен честный альфа-блендинг
+        self.blended = bool(((alpha > 0) & (alpha < 255)).any())
+
+        # прямоугольник, в котором есть видимые пиксели (y1, y2, x1, x2)
+        ys, xs = np.nonzero(alpha)
+        if len(ys):
+            self.box = (int(ys.min()), int(ys.max()) + 1, int(xs.min()), int(xs.max()) + 1)
+        else:
+            self.box = None
+        y1, y2, x1, x2 = self.box or (0, 0, 0, 0)
+        self.bgr = np.ascontiguousarray(bgra[y1:y2, x1:x2, :3])
+        self.mask = np.ascontiguousarray(alpha[y1:y2, x1:x2] == 255)[..., np.newaxis]
+        # внутри прямоугольника всё непрозрачно -> простое копирование
+        self.opaque = bool(self.mask.all())
+
+    @property
+    def shape(self):
+        return self.bgra.shape
+
+
+# ==================================================================
+# Атлас: все спрайты в одном непрерывном буфере uint8
+# ==================================================================
+# Каждый спрайт - один блок: BGRA целиком, затем BGR и маска его
+# непрозрачного прямоугольника. Блоки лежат подряд, поэтому массивы
+# Sprite - непрерывные срезы атласа (без шага строки большой текстуры,
+# как было бы при упаковке в 2D). Таблица index (offset, высота, ширина,
+# прямоугольник, флаги) вместе с буфером полностью описывает атлас, так что
+# буфер можно отобразить в память из файла или разделить между процессами.
+class SpriteAtlas:
+    def __init__(self, capacity: int = 1 << 20):
+        self.buffer = np.zeros(capacity, dtype=np.uint8)
+        self.used = 0
+        self.sprites: Dict[str, Sprite] = {}
+        # key -> (offset, h, w, (y1, y2, x1, x2) | None, opaque, blended)
+        self.index: Dict[str, tuple] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.sprites
+
+    def __len__(self) -> int:
+        return len(self.sprites)
+
+    def get(self, key: str) -> Optional[Sprite]:
+        return self.sprites.get(key)
+
+    @property
+    def nbytes(self) -> int:
+        return self.used
+
+    def add(self, key: str, bgra: np.ndarray) -> Sprite:
+        # спрайт копируется в атлас, его массивы заменяются срезами атласа
+        sprite = Sprite(bgra)
+        h, w = bgra.shape[:2]
+        offset = self._alloc(self._block_size(h, w, sprite.box))
+        entry = (offset, h, w, sprite.box, sprite.opaque, sprite.blended)
+        bgra_v, bgr_v, mask_v = self._views(entry)
+        bgra_v[...] = sprite.bgra
+        bgr_v[...] = sprite.bgr
+        mask_v[...] = sprite.mask
+        sprite.bgra, sprite.bgr, sprite.mask = bgra_v, bgr_v, mask_v
+        self.index[key] = entry
+        self.sprites[key] = sprite
+        return sprite
+
+    # ---- раскладка блока ----
+    @staticmethod
+    def _block_size(h: int, w: int, box) -> int:
+        y1, y2, x1, x2 = box or (0, 0, 0, 0)
+        bh, bw = y2 - y1, x2 - x1
+        return _align(h * w * 4) + _align(bh * bw * 3) + _align(bh * bw)
+
+    def _views(self, entry):
+        offset, h, w, box, _, _ = entry
+        y1, y2, x1, x2 = box or (0, 0, 0, 0)
+        bh, bw = y2 - y1, x2 - x1
+        buf = self.buffer
+        bgra = buf[offset:offset + h * w * 4].reshape(h, w, 4)
+        offset += _align(h * w * 4)
+        bgr = buf[offset:offset + bh * bw * 3].reshape(bh, bw, 3)
+        offset += _align(bh * bw * 3)
+        mask = buf[offset:offset + bh * bw].view(bool).reshape(bh, bw, 1)
+        return bgra, bgr, mask
+
+    def _alloc(self, nbytes: int) -> int:
+        if self.used + nbytes > self.buffer.size or not self.buffer.flags.writeable:
+            self._grow(self.used + nbytes)
+        offset = self.used
+        self.used += nbytes
+        return offset
+
+    def _grow(self, min_capacity: int):
+        # новый буфер (вдвое больше) и перепривязка всех спрайтов к нему;
+        # объекты Sprite те же, поэтому ссылки в ASSETS/SPRITES остаются верными.
+        # Буфер из файла только для чтения -> первый lazy-спрайт копирует атлас
+        capacity = max(min_capacity, 2 * self.buffer.size, 1 << 16)
+        buffer = np.zeros(capacity, dtype=np.uint8)
+        buffer[:self.used] = self.buffer[:self.used]
+        self.buffer = buffer
+        for key, entry in self.index.items():
+            sprite = self.sprites[key]
+            sprite.bgra, sprite.bgr, sprite.mask = self._views(entry)
+
+    # ---- сохранение / загрузка (sprite_cache.py) ----
+    def to_index(self) -> dict:
+        return {key: [offset, h, w, list(box) if box else None, opaque, blended]
+                for key, (offset, h, w, box, opaque, blended) in self.index.items()}
+
+    @classmethod
+    def from_buffer(cls, buffer: np.ndarray, index: dict) -> "SpriteAtlas":
+        atlas = cls.__new__(cls)
+        atlas.buffer = buffer
+        atlas.used = buffer.size
+        atlas.sprites, atlas.index = {}, {}
+        for key, (offset, h, w, box, opaque, blended) in index.items():
+            entry = (offset, h, w, tuple(box) if box else None, opaque, blended)
+            if offset + cls._block_size(h, w, entry[3]) > buffer.size:
+                raise ValueError(f"atlas entry {key} is out of buffer bounds")
+            sprite = Sprite.__new__(Sprite)
+            sprite.bgra, sprite.bgr, sprite.mask = atlas._views(entry)
+            sprite.box, sprite.opaque, sprite.blended = entry[3], opaque, blended
+            atlas.index[key] = entry
+            atlas.sprites[key] = sprite
+        return atlas
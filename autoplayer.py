@@ -0,0 +1,411 @@
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from enums import Action, GameState
+from settings import CELL_SIZE
+from board import ROW_FINISH, ROW_ROAD, ROW_WATER
+from entities import WoodLog
+from world import World, ACTION_STEPS
+from env import SIM_DT
+
+PAD = 1 # отступ хитбоксов (Frog.hitbox, MovingRect.hitbox)
+
+# коды переходов в таблице приземления
+DEAD = -1
+WIN = -2
+
+_ACTIONS = [Action.NOOP, Action.UP, Action.DOWN, Action.LEFT, Action.RIGHT]
+
+# нижние границы поиска при урезании под бюджет времени
+MIN_DECISIONS = 15
+MIN_WINDOW_ROWS = 4
+
+
+def _tick_times(now: float, dt: float, ticks: int) -> np.ndarray:
+    # world.time на тиках 0..ticks тем же последовательным сложением, что и
+    # World.update
+    steps = np.full(ticks + 1, dt)
+    steps[0] = now
+    return np.add.accumulate(steps)
+
+
+def _trajectories(items, times: np.ndarray) -> np.ndarray:
+    # x объектов в моменты times по той же формуле, что и MovingRect.x,
+    # поэтому предсказание совпадает с игрой бит-в-бит
+    x0 = np.array([it.x0 for it in items])
+    vx = np.array([it.vx for it in items], dtype=float)
+    t0 = np.array([it.t0 for it in items])
+    return x0[:, np.newaxis] + vx[:, np.newaxis] * (times - t0[:, np.newaxis])
+
+
+def _phantom(lane_state, board_width: int, width: int, spawn_in: float, dt: float, ticks: int):
+    # x фантома на тиках 0..ticks для спавна через spawn_in секунд; спавнер
+    # ставит объект в точный момент спавна (spawners._spawn_x), фантом
+    # покрывает спавн в любой момент на тик раньше - запас на ошибку
+    # world.time. Возвращает (x, ширина, первый тик) или None
+    t = np.arange(ticks + 1) * dt - spawn_in # время с момента спавна
+    valid = t >= -dt
+    if not valid.any():
+        return None
+    first = int(valid.argmax())
+    v = lane_state["dir"] * lane_state["speed"]
+    base = -width if lane_state["dir"] > 0 else board_width
+    late = base + v * t
+    return np.minimum(late, late + v * dt), width + abs(v) * dt, first
+
+
+def _overlaps(px, ix, width):
+    # пересечение хитбоксов лягушки (x = px) и объекта (x = ix) одной строки
+    d = px - ix
+    return (d >= 2 * PAD - CELL_SIZE) & (d <= width - 2 * PAD)
+
+
+# ======================================================================
+# Автоигрок: поиск в ширину по (тик, строка, позиция) с предсказанием полос
+# ======================================================================
+# Объекты едут с постоянной скоростью, поэтому на горизонт horizon тиков
+# строится таблица занятости: для дорожных строк - клетки, где лягушку
+# собьёт машина, для воды - позиции брёвен. Будущие машины, которых ещё
+# нет, учитываются "фантомами": машина максимальной длины в момент
+# next_spawn_time и сплошной клин от края полосы после минимального
+# интервала спавна - реальные машины всегда внутри них. Будущие брёвна не
+# учитываются (на них просто не рассчитываем).
+#
+# Решение принимается раз в hop_ticks тиков; между решениями лягушка стоит,
+# и каждый тик этого окна проверяется по таблице. Состояние - клетка поля
+# или "слот" (бревно, клетка на бревне). Переходы повторяют World: прыжок с
+# бревна округляет колонку, приземление на воду привязывает к первому
+# бревну под хитбоксом, с бревна уносит за край. Для каждого окна заранее
+# считается, куда приводит прыжок в каждую клетку (состояние, смерть или
+# финиш), поэтому слой поиска - несколько операций numpy над всеми
+# состояниями сразу.
+#
+# Планируется полоса строк от window_rows над лягушкой до двух под ней;
+# если финиш выше полосы, целью служит её верхняя строка.
+#
+# Найденный путь до финиша исполняется, пока состояние лягушки совпадает с
+# ожидаемым; если финиш за горизонтом, берётся самая продвинутая позиция,
+# в которой можно дожить до конца горизонта, и план пересчитывается на
+# каждом решении.
+#
+# План должен укладываться в кадр: на него бюджет budget секунд. Главная
+# цена - таблица, она растёт с числом строк полосы и решений, поэтому
+# после медленного плана (дольше половины бюджета) полоса и горизонт
+# урезаются, после быстрого (меньше четверти) растут обратно до
+# window_rows и horizon. Поиск, не уложившийся в бюджет, обрывается на
+# последнем построенном слое - как при финише за горизонтом. budget=None -
+# поиск полного размера без обрывов: ходы не зависят от скорости машины
+# (воспроизводимые прогоны rollout.py).
+class Autoplayer:
+    def __init__(self, world: World, horizon: int = 240, hop_ticks: int = 4,
+                 window_rows: int = 12, dt: float = SIM_DT, budget: Optional[float] = 0.008):
+        self.world = world
+        self.hop = hop_ticks
+        self.window_rows = window_rows # наибольшая полоса строк
+        self.max_decisions = horizon // hop_ticks # наибольшая глубина поиска
+        self.budget = budget
+        self._resize(self.max_decisions, window_rows)
+        self.dt = dt
+        self._init_moves(world.board)
+        self._band_cache = {}
+
+        self._actions: Optional[List[Action]] = None
+        self._expect = []
+        self._goal = False
+        self._k = 0 # тиков с момента построения плана
+
+        # статистика
+        self.plan_times: List[float] = []
+        self.decision_count = 0
+
+    def _resize(self, decisions: int, rows: int):
+        self.decisions = decisions # глубина поиска в решениях
+        self.ticks = decisions * self.hop
+        self.rows = rows # строк полосы над лягушкой
+
+    def _adapt(self, elapsed: float):
+        if self.budget is None:
+            return
+        if elapsed > self.budget / 2:
+            self._resize(max(MIN_DECISIONS, self.decisions * 3 // 4), max(MIN_WINDOW_ROWS, self.rows - 1))
+        elif elapsed < self.budget / 4:
+            self._resize(min(self.max_decisions, self.decisions + 1), min(self.window_rows, self.rows + 1))
+
+    def _init_moves(self, board):
+        # переходы "клетка -> клетка до приземления" не зависят от времени
+        rows, cols = board.rows, board.cols
+        src, tgt, act = [], [], []
+        for r in range(rows):
+            if board.row_kinds[r] in (ROW_WATER, ROW_FINISH):
+                continue # стоять не на бревне здесь нельзя
+            for c in range(cols):
+                for a, action in enumerate(_ACTIONS):
+                    dc, dr = ACTION_STEPS.get(action, (0, 0))
+                    r2 = min(max(r + dr, 0), rows - 1)
+                    c2 = min(max(c + dc, 0), cols - 1)
+                    if a and (r2, c2) == (r, c):
+                        continue # упёрлись в край - то же, что стоять
+                    src.append(r * cols + c)
+                    tgt.append(r2 * cols + c2)
+                    act.append(a)
+        self._move_src = np.array(src, dtype=np.intp)
+        self._move_tgt = np.array(tgt, dtype=np.intp)
+        self._move_act = np.array(act, dtype=np.int8)
+
+    # ==============================
+    # Таблица занятости
+    # ==============================
+    def _car_windows(self, lane_state, max_width: int, times: np.ndarray) -> np.ndarray:
+        # (решение, колонка) -> машина заденет лягушку в окне решения
+        w, board, ticks = self.world, self.world.board, self.ticks
+        spawner = w.cars
+        items = lane_state["items"]
+        cars = [(x, it.width, 0) for x, it in zip(_trajectories(items, times), items)]
+
+        # фантомы: ближайший спавн максимальной длины, затем клин на всю полосу
+        next_spawn = max(lane_state["next_spawn_time"], w.time)
+        for spawn, width in ((next_spawn, max_width),
+                             (next_spawn + spawner.min_spawn_interval(lane_state), spawner.width + max_width)):
+            phantom = _phantom(lane_state, spawner.width, width, spawn - w.time, self.dt, ticks)
+            if phantom is not None:
+                cars.append(phantom)
+
+        cols40 = np.arange(board.cols) * CELL_SIZE
+        hit = np.zeros((ticks + 1, board.cols), dtype=bool)
+        for x, width, first in cars:
+            hit[first:] |= _overlaps(cols40, np.trunc(x[first:, np.newaxis]), width)
+        # окно решения j - тики j * hop .. (j + 1) * hop включительно: World
+        # заметает весь шаг, начиная с позиций в момент прыжка
+        windows = hit[:-1].reshape(self.decisions, self.hop, board.cols).any(axis=1)
+        return windows | hit[self.hop::self.hop]
+
+    def _band_moves(self, lo: int, hi: int):
+        # переходы по клеткам полосы строк lo..hi в локальной нумерации
+        key = (lo, hi)
+        if key not in self._band_cache:
+            cols = self.world.board.cols
+            src_row, tgt_row = self._move_src // cols, self._move_tgt // cols
+            sel = (src_row >= lo) & (src_row <= hi) & (tgt_row >= lo) & (tgt_row <= hi)
+            self._band_cache[key] = (self._move_src[sel] - lo * cols,
+                                     self._move_tgt[sel] - lo * cols, self._move_act[sel])
+        return self._band_cache[key]
+
+    def _build_table(self):
+        w, board = self.world, self.world.board
+        cols, D, hop = board.cols, self.decisions, self.hop
+        k0 = np.arange(D) * hop # тик решения (прыжок и привязка к бревну)
+        k2 = k0 + hop # последний тик окна
+        times = _tick_times(w.time, self.dt, self.ticks)
+
+        # полоса планирования: rows строк вверх от лягушки и 2 вниз;
+        # если финиш за полосой, цель - её верхняя строка
+        finish = board.finish_rows[1]
+        lo = max(finish, w.frog.row - self.rows)
+        hi = min(board.rows - 1, w.frog.row + 2)
+        n_cells = (hi - lo + 1) * cols
+        band = range(lo, hi + 1)
+
+        # слоты: все клетки известных брёвен полосы
+        logs = []
+        for lane_state in w.water.lanes:
+            if lane_state["row"] not in band:
+                continue
+            row_logs = [it for it in lane_state["items"] if isinstance(it, WoodLog)]
+            if row_logs:
+                xs = _trajectories(row_logs, times)
+                logs.extend((lane_state["row"], it, x) for it, x in zip(row_logs, xs))
+        log_sizes = np.array([it.size for _, it, _ in logs], dtype=np.intp)
+        log_base = np.concatenate(([0], np.cumsum(log_sizes))).astype(np.intp)
+        n_slots = int(log_base[-1])
+        slot_log = np.repeat(np.arange(len(logs)), log_sizes)
+        slot_rel = np.arange(n_slots) - log_base[slot_log]
+        slot_row = np.array([logs[i][0] for i in slot_log], dtype=np.intp)
+        log_ix = np.trunc(np.array([x for _, _, x in logs]).reshape(len(logs), self.ticks + 1)).astype(np.intp)
+        slot_px = log_ix[slot_log] + slot_rel[:, np.newaxis] * CELL_SIZE
+
+        # на бревне всё окно: за краем поля - смерть; движение монотонно,
+        # поэтому хватает концов окна
+        limit = board.width - CELL_SIZE + PAD
+        on_board = (slot_px >= -PAD) & (slot_px <= limit)
+        ride_ok = (on_board[:, k0] & on_board[:, k2]).T # (D, слоты)
+
+        # приземление: (решение, клетка) -> состояние / DEAD / WIN;
+        # последний столбец - DEAD для прыжков за полосу
+        landing = np.full((D, n_cells + 1), DEAD, dtype=np.intp)
+        cols40 = np.arange(cols) * CELL_SIZE
+        max_width = max(s["size"] for s in w.cars.size_table) * CELL_SIZE
+        car_lanes = {lane_state["row"]: lane_state for lane_state in w.cars.lanes}
+        for r in band:
+            kind = board.row_kinds[r]
+            cells = np.arange(cols) + (r - lo) * cols
+            out = landing[:, cells[0]:cells[-1] + 1]
+            if r <= finish:
+                out[:] = WIN
+            elif kind == ROW_ROAD:
+                blocked = self._car_windows(car_lanes[r], max_width, times)
+                out[:] = np.where(blocked, DEAD, cells)
+            elif kind == ROW_WATER:
+                idx = np.array([i for i, (row, _, _) in enumerate(logs) if row == r], dtype=np.intp)
+                if not len(idx):
+                    continue
+                # первое бревно по x под хитбоксом (CollisionIndex.first_hit)
+                widths = (log_sizes[idx] * CELL_SIZE)[:, np.newaxis, np.newaxis]
+                under = _overlaps(cols40, log_ix[idx][:, k0, np.newaxis], widths)
+                log = idx[under.argmax(axis=0)]
+                start_cell = np.floor_divide(log_ix[log, k0[:, np.newaxis]], CELL_SIZE)
+                slot = log_base[log] + np.clip(np.arange(cols) - start_cell, 0, log_sizes[log] - 1)
+                alive = under.any(axis=0) & np.take_along_axis(ride_ok, slot, axis=1)
+                out[:] = np.where(alive, n_cells + slot, DEAD)
+            elif kind != ROW_FINISH:
+                out[:] = cells
+
+        # прыжок с бревна вверх/вниз: колонка округляется по текущему x (Frog.step)
+        hop_col = np.clip(np.round(slot_px[:, k0] / CELL_SIZE).astype(np.intp), 0, cols - 1)
+        hop_tgt = []
+        for dr in (-1, 1):
+            row = np.clip(slot_row + dr, 0, board.rows - 1)[:, np.newaxis]
+            inside = (row >= lo) & (row <= hi)
+            hop_tgt.append(np.where(inside, (row - lo) * cols + hop_col, n_cells))
+        hop_tgt = np.concatenate(hop_tgt).T # (D, 2 * слоты)
+
+        # шаги по бревну: на месте и на клетку в сторону (с края не шагаем)
+        left = np.flatnonzero(slot_rel > 0)
+        right = np.flatnonzero(slot_rel < log_sizes[slot_log] - 1)
+        ride_src = np.concatenate((np.arange(n_slots), left, right))
+        ride_tgt = np.concatenate((np.arange(n_slots), left - 1, right + 1))
+        ride_act = np.concatenate((np.zeros(n_slots), np.full(len(left), 3), np.full(len(right), 4)))
+
+        # все переходы слоя одной таблицей: (решение, ребро) -> состояние / DEAD / WIN
+        move_src, move_tgt, move_act = self._band_moves(lo, hi)
+        slots = np.arange(n_slots)
+        self._src = np.concatenate((move_src, n_cells + slots, n_cells + slots, n_cells + ride_src))
+        self._act = np.concatenate((move_act, np.full(n_slots, 1), np.full(n_slots, 2), ride_act)).astype(np.int8)
+        self._tgt = np.concatenate((
+            landing[:, move_tgt],
+            np.take_along_axis(landing, hop_tgt, axis=1),
+            np.where(ride_ok[:, ride_tgt], n_cells + ride_tgt, DEAD),
+        ), axis=1)
+
+        self._lo, self._n_cells, self._n_slots = lo, n_cells, n_slots
+        self._slot_row, self._slot_px, self._log_base = slot_row, slot_px, log_base
+        self._slot_logs = [it for _, it, _ in logs]
+        # промежуточная цель - любое состояние в верхней строке полосы
+        if lo > finish:
+            self._subgoal = np.concatenate((np.arange(cols), n_cells + np.flatnonzero(slot_row == lo)))
+        else:
+            self._subgoal = None
+
+    # ==============================
+    # Поиск
+    # ==============================
+    def _state_row(self, s: int) -> int:
+        if s < self._n_cells:
+            return self._lo + s // self.world.board.cols
+        return int(self._slot_row[s - self._n_cells])
+
+    def _pixel_x(self, j: int, s: int) -> int:
+        if s < self._n_cells:
+            return s % self.world.board.cols * CELL_SIZE
+        return int(self._slot_px[s - self._n_cells, j * self.hop])
+
+    def _start(self) -> int:
+        frog, cols = self.world.frog, self.world.board.cols
+        if frog.attached_log is not None:
+            for i, log in enumerate(self._slot_logs):
+                if log is frog.attached_log:
+                    return self._n_cells + int(self._log_base[i]) + frog.rel_cell
+        return (frog.row - self._lo) * cols + frog.col
+
+    def plan(self):
+        t0 = time.perf_counter()
+        deadline = t0 + self.budget if self.budget is not None else float("inf")
+        self._build_table()
+        n_cells, D = self._n_cells, self.decisions
+        n = n_cells + self._n_slots
+        start = self._start()
+
+        reach = np.zeros(n, dtype=bool)
+        reach[start] = True
+        layers = [reach]
+        src, tgt, subgoal = self._src, self._tgt, self._subgoal
+        goal = None
+        for j in range(D):
+            t = tgt[j][reach[src]]
+            if (t == WIN).any():
+                goal = (j + 1, WIN) # финиш - как состояние следующего слоя
+                break
+            reach = np.zeros(n, dtype=bool)
+            reach[t[t >= 0]] = True
+            if not reach.any():
+                break
+            layers.append(reach)
+            if subgoal is not None and reach[subgoal].any():
+                goal = (j + 1, int(subgoal[reach[subgoal].argmax()]))
+                break
+            if time.perf_counter() > deadline:
+                break
+
+        if goal is not None:
+            j, s = goal
+        else:
+            # финиш за горизонтом: самая продвинутая позиция последнего слоя
+            j = len(layers) - 1
+            s = int(min(np.flatnonzero(layers[j]), key=self._state_row))
+
+        # обратный проход: ребро из достижимого состояния прошлого слоя в s;
+        # expect - ожидаемое состояние лягушки перед каждым решением
+        actions, expect = [], []
+        while j > 0:
+            e = int(np.flatnonzero((tgt[j - 1] == s) & layers[j - 1][src])[0])
+            s, j = int(src[e]), j - 1
+            actions.append(_ACTIONS[self._act[e]])
+            expect.append((self._state_row(s), self._pixel_x(j, s)))
+        actions.reverse()
+        expect.reverse()
+
+        self._actions = actions or [Action.NOOP]
+        self._expect = expect or [(self._state_row(start), self._pixel_x(0, start))]
+        self._goal = goal is not None
+        self._k = 0
+        elapsed = time.perf_counter() - t0
+        self.plan_times.append(elapsed)
+        self._adapt(elapsed)
+
+    # ==============================
+    # Действие на текущий тик
+    # ==============================
+    def act(self) -> Action:
+        # вызывается перед каждым world.update (как действие FroggerEnv.step)
+        if self.world.state != GameState.PLAYING:
+            self._actions = None
+            return Action.NOOP
+        if self._k % self.hop:
+            self._k += 1
+            return Action.NOOP
+
+        self.decision_count += 1
+        frog = self.world.frog
+        j = self._k // self.hop
+        if (self._actions is None or j >= len(self._actions) or (j > 0 and not self._goal)
+                or self._expect[j] != (frog.row, frog.pixel_x)):
+            with self.world.profiler.section("autoplay.plan"):
+                self.plan()
+            j = 0
+        self._k += 1
+        return self._actions[j]
+
+    def stats(self) -> dict:
+        times = sorted(self.plan_times)
+        if not times:
+            return {"plans": 0, "decisions": self.decision_count}
+        return {
+            "plans": len(times),
+            "decisions": self.decision_count,
+            "plan_ms_mean": sum(times) / len(times) * 1e3,
+            "plan_ms_p50": times[len(times) // 2] * 1e3,
+            "plan_ms_p99": times[min(len(times) - 1, int(0.99 * len(times)))] * 1e3,
+            "plan_ms_max": times[-1] * 1e3,
+            "ms_per_decision": sum(times) / max(self.decision_count, 1) * 1e3,
+        }
@@ -0,0 +1,428 @@
+from typing import Optional
+
+import numpy as np
+
+from settings import (
+    CELL_SIZE,
+    ROAD_TARGET_GAP_CELLS, WATER_TARGET_GAP_CELLS,
+    CAR_SIZES, CAR_COLORS, CAR_MIN_GAP_CELLS,
+    LOG_SIZES, LOG_COLORS, CROC_SIZES, CROC_COLORS,
+    WATER_MIN_GAP_CELLS, WATER_SPAWN_WEIGHTS, WATER_MAX_CONSEC_CROCS,
+    START_LIVES,
+)
+from board import Board, DEFAULT_BOARD, ROW_WATER
+from spawners import SPAWN_JITTER
+from env import SIM_DT, KIND_CAR, KIND_LOG, KIND_CROC, REWARD_PROGRESS, REWARD_DEATH, REWARD_WIN
+
+# смещения лягушки по действиям (индексы совпадают с enums.Action)
+ACTION_DCOL = np.array([0, 0, 0, -1, +1], dtype=np.int64)
+ACTION_DROW = np.array([0, -1, +1, 0, 0], dtype=np.int64)
+# Facing: UP=1, DOWN=2, LEFT=3, RIGHT=4 (NOOP не меняет взгляд)
+ACTION_FACING = np.array([0, 1, 2, 3, 4], dtype=np.int8)
+# все три таблицы одной выборкой по действиям
+_ACTION_MOVES = np.stack([ACTION_DCOL, ACTION_DROW, ACTION_FACING.astype(np.int64)])
+
+# таблицы размеров и палитры по виду объекта (индекс - KIND_*)
+_KIND_SIZES = {KIND_CAR: CAR_SIZES, KIND_LOG: LOG_SIZES, KIND_CROC: CROC_SIZES}
+_KIND_COLORS = np.array([len(CAR_COLORS), len(LOG_COLORS), len(CROC_COLORS)], dtype=np.float64)
+
+
+# вероятности размеров кратны 0.01, поэтому utils.weighted_choice для
+# массивов - выбор из таблицы [вид, 100] по int(u * 100)
+_SIZE_BINS = 100
+
+def _size_table():
+    table = np.zeros((3, _SIZE_BINS), dtype=np.int64)
+    mid = (np.arange(_SIZE_BINS) + 0.5) / _SIZE_BINS
+    for kind, items in _KIND_SIZES.items():
+        cum = np.cumsum([it["prob"] for it in items])
+        i = np.minimum(np.searchsorted(cum, mid), len(items) - 1)
+        table[kind] = [items[j]["size"] for j in i]
+    return table.ravel()
+
+_SIZE_TABLE = _size_table()
+
+def _sample(kind, u):
+    return _SIZE_TABLE[kind * _SIZE_BINS + (u * _SIZE_BINS).astype(np.int64)]
+
+# причина смерти по битам: дорога | сбита << 1 | на бревне << 2 | за краем << 3.
+# 0 - жива, 1 - машина, 2 - крокодил, 3 - вода, 4 - унесло за край; при
+# равном времени - как в World: крокодил раньше воды
+def _cause_table():
+    table = np.zeros(16, dtype=np.int8)
+    for key in range(16):
+        road, hit, att, off = key & 1, key >> 1 & 1, key >> 2 & 1, key >> 3
+        if road:
+            table[key] = hit
+        elif hit:
+            table[key] = 2
+        elif att:
+            table[key] = 4 * off
+        else:
+            table[key] = 3
+    return table
+
+_CAUSE_TABLE = _cause_table()
+
+def _readonly(a: np.ndarray) -> np.ndarray:
+    view = a.view()
+    view.flags.writeable = False
+    return view
+
+
+# =========================================================================
+# Пакетное окружение: N независимых игр в виде массивов (struct-of-arrays)
+# =========================================================================
+# Правила те же, что у World (поле Board, спавн в точный момент по
+# расписанию полосы, привязка к бревну по позициям начала шага, заметание
+# для стоящей лягушки), но случайность своя (numpy), поэтому траектории с
+# World не совпадают - совпадает только игра.
+#
+# Объекты всех полос всех игр лежат в массивах [S, N * R] (строка - слот,
+# столбец - полоса игры); наружу отдаются виды [N, L, S]. Слот - внешняя
+# ось, чтобы операции над полосами лягушек [S, N] с величинами лягушки [N]
+# шли длинными строками, а не по S элементов. R = L + 1: за полосами игры
+# идёт пустая полоса, в неё смотрит лягушка вне полос, и шаг считает всех
+# лягушек сразу, без выборки стоящих на полосах. Все игры идут
+# по общим часам clock (сброс игры - это расписание полос от текущего
+# clock), слот жив, пока clock меньше момента ухода объекта с поля
+# (exit_t), поэтому удаление с поля - одно сравнение со скаляром на шаг.
+#
+# На 1024 играх шаг упирается в число вызовов numpy, а не в объём данных:
+# поля лягушки и счёта лежат одним блоком [9, N] (сброс - одна запись),
+# проверка места у края въезда - одно сравнение с моментом, когда полоса
+# освобождается (_free_t), величины спавна берутся из таблиц по
+# (полоса, размер), причина смерти - из таблицы по битам, запись объекта -
+# .put по плоскому индексу. Около 60 вызовов на шаг, 55x к циклу по
+# World.update (benchmarks/batch_env.py).
+class BatchFroggerEnv:
+    def __init__(self, num_envs: int, dt: float = SIM_DT, seed=None, board: Optional[Board] = None):
+        self.n = num_envs
+        self.dt = dt
+        self.board = board = board if board is not None else DEFAULT_BOARD
+        self.rng = np.random.default_rng(seed)
+        self.board_width = board.width
+        self.start_col, self.start_row = board.start_col, board.start_row
+
+        lanes = board.road_lanes + board.water_lanes
+        L = self.num_lanes = len(lanes)
+        self.lane_row = np.array([l["row"] for l in lanes], dtype=np.int64)
+        if len(set(self.lane_row.tolist())) != L:
+            raise ValueError("BatchFroggerEnv supports one lane per row")
+        self.lane_dir = np.array([l["dir"] for l in lanes], dtype=np.float64)
+        self.lane_speed = np.array([l["speed"] for l in lanes], dtype=np.float64)
+        self.lane_vx = self.lane_dir * self.lane_speed
+        self.lane_right = self.lane_dir > 0
+        self.lane_water = np.array([False] * len(board.road_lanes) + [True] * len(board.water_lanes))
+        self.lane_gap_px = np.where(self.lane_water, WATER_MIN_GAP_CELLS, CAR_MIN_GAP_CELLS) * CELL_SIZE
+        self.lane_target_px = np.where(self.lane_water, WATER_TARGET_GAP_CELLS, ROAD_TARGET_GAP_CELLS) * CELL_SIZE
+
+        # строка -> индекс полосы (-1 если полосы нет)
+        self.row_to_lane = np.full(board.rows, -1, dtype=np.int64)
+        self.row_to_lane[self.lane_row] = np.arange(L)
+        self.row_is_water = np.array(board.row_kinds) == ROW_WATER
+        # то же для шага: строка без полосы -> пустая строка слотов L; вне
+        # воды лягушку можно только сбить, на дороге она заметает объекты
+        # по направлению полосы
+        R = L + 1
+        self._row_lane = np.where(self.row_to_lane >= 0, self.row_to_lane, L)
+        self._row_road = ~self.row_is_water
+        row_right = np.zeros(board.rows, dtype=bool)
+        row_right[self.lane_row] = self.lane_right
+        self._row_sweep_right = self._row_road & row_right
+
+        # максимальное число объектов, одновременно живых на полосе (длина
+        # кольца слотов, см. _attempt): спавны полосы идут не чаще
+        # SPAWN_JITTER[0] * (target + min_w) / speed (минус опоздание спавна
+        # на шаг) и не ближе min_gap, а объект живёт (W + w) / speed плюс шаг
+        # до удаления
+        all_sizes = CAR_SIZES + LOG_SIZES + CROC_SIZES
+        min_w = min(t["size"] for t in all_sizes) * CELL_SIZE
+        max_w = max(t["size"] for t in all_sizes) * CELL_SIZE
+        shift = self.lane_speed * dt
+        spacing = np.maximum(SPAWN_JITTER[0] * (self.lane_target_px + min_w) - shift, min_w + self.lane_gap_px)
+        S = self.num_slots = int(((self.board_width + max_w + shift) // spacing).max()) + 1
+
+        N = self.n
+        flat = (S, N * R)
+        # объекты на полосах
+        self._x = np.zeros(flat, dtype=np.float32)
+        self._size = np.ones(flat, dtype=np.int64)
+        self._span = np.zeros(flat, dtype=np.int32) # ширина + CELL - 4, см. _frog_lane
+        self._kind = np.zeros(flat, dtype=np.int8)
+        self._color = np.zeros(flat, dtype=np.int8)
+        self._alive = np.zeros(flat, dtype=bool)
+        self._exit_t = np.full(flat, -np.inf) # момент ухода объекта с поля по clock
+        # состояние полос: индекс полосы игры f = env * R + lane. Пустые
+        # строки не спавнят (next_spawn = inf)
+        self.clock = 0.0
+        self._lane_t = np.full((2, N * R), np.inf)
+        self._lane_t[1] = -np.inf
+        self.next_spawn = self._lane_t[0]
+        self._free_t = self._lane_t[1] # с этого момента у края въезда есть место
+        self.consec_crocs = np.zeros(N * R, dtype=np.int64)
+        self._last = np.full(N * R, S - 1, dtype=np.int64) # слот последнего спавна
+
+        # константы полос по f (у пустой строки - нейтральные) и по паре
+        # (f, размер объекта): индекс f * M + size
+        def per_lane(values, empty):
+            return np.tile(np.append(values, empty), N)
+        self._f_water = per_lane(self.lane_water, False)
+        self._f_vx = per_lane(self.lane_vx, 0.0)
+        M = self._max_size = max(t["size"] for t in all_sizes) + 1
+        w = np.arange(M) * CELL_SIZE
+        speed = np.append(self.lane_speed, 1.0)[:, None]
+        def per_size(values):
+            return np.tile(np.broadcast_to(values, (R, M)).ravel(), N)
+        self._fz_spawn_x = per_size(np.where(np.append(self.lane_right, False)[:, None], -w, self.board_width))
+        self._fz_interval = per_size((np.append(self.lane_target_px, 0)[:, None] + w) / np.maximum(speed, 1e-6))
+        self._fz_life = per_size((self.board_width + w) / speed)
+        self._fz_free = per_size((w + np.append(self.lane_gap_px, 0)[:, None]) / speed)
+        self._ring_next = np.roll(np.arange(S), -1)
+
+        # лягушка и счёт: строки одного блока, сброс игры - одна запись
+        self._env = np.zeros((9, N), dtype=np.int64)
+        (self.frog_col, self.frog_row,
+         self.frog_slot,                # слот бревна (-1 если не на бревне)
+         self.frog_rel,
+         self.frog_x,                   # пиксели; пересчитывается в конце шага
+         self.frog_facing,
+         self.lives, self.max_pos, self.steps) = self._env
+        self._env_start = np.array([self.start_col, self.start_row, -1, 0, self.start_col * CELL_SIZE, 1,
+                                    START_LIVES, 0, 0], dtype=np.int64)[:, None]
+        self._pos_max = np.array([board.cols - 1, board.rows - 1], dtype=np.int64)[:, None]
+        self._row0 = np.arange(N) * R
+        self._env_idx = np.arange(N)
+
+        # сдвиг за шаг по полосам игр
+        self._step_row = per_lane(self.lane_vx * dt, 0.0).astype(np.float32)
+
+        # виды [N, L, S]; наблюдение отдаёт их только для чтения и без
+        # копий: массивы действительны до следующего step()/reset()
+        def lanes_view(a):
+            return a.reshape(S, N, R)[:, :, :L].transpose(1, 2, 0)
+        self.x = lanes_view(self._x)
+        self.size = lanes_view(self._size)
+        self.kind = lanes_view(self._kind)
+        self.color = lanes_view(self._color)
+        self.alive = lanes_view(self._alive)
+        self._exit_env = self._exit_t.reshape(S, N, R)
+        self._alive_env = self._alive.reshape(S, N, R)
+        self._lane_t_env = self._lane_t.reshape(2, N, R)
+        self._obs_views = {name: _readonly(getattr(self, name)) for name in ("x", "size", "kind", "alive")}
+
+    # ==============================
+    # Сброс
+    # ==============================
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self._reset(mask.nonzero()[0])
+        np.less(self.clock, self._exit_t, out=self._alive)
+        return self._observe()
+
+    # alive сброшенных игр обновляет следующее сравнение с clock
+    def _reset(self, idx):
+        self._exit_env[:, idx] = -np.inf
+        # первый спавн - в начале следующего шага, как при time = 0 у World
+        self._lane_t_env[:, idx, :self.num_lanes] = np.array([self.clock, -np.inf])[:, None, None]
+        self.consec_crocs.reshape(self.n, -1)[idx] = 0
+        self._env[:, idx] = self._env_start
+
+    def _reset_frog(self, idx):
+        self._env[:6, idx] = self._env_start[:6]
+
+    # ==============================
+    # Шаг всех игр
+    # ==============================
+    # Порядок - как в World.update: ход лягушки, привязка к бревну по
+    # позициям начала шага, спавн и движение, смерть по событиям шага,
+    # победа, счёт. Спавн идёт раньше привязки: новый объект стоит за краем
+    # поля и бревно под лягушкой не меняет, зато полосу лягушки хватает
+    # прочитать один раз
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+
+        self._apply_actions(actions)
+        self.clock += self.dt
+        self.steps += 1
+        self._spawn()
+        died, cause = self._frog_lane()
+        self._x += self._step_row
+
+        self.lives -= died
+        win = self.frog_row <= self.board.finish_rows[1] # умершая лягушка финиша не достигла
+        back = (died | win).nonzero()[0]
+        if len(back):
+            self._reset_frog(back)
+
+        # новый рекорд продвижения; у сброшенных лягушек прироста нет
+        gain = np.maximum(self.start_row - self.frog_row - self.max_pos, 0)
+        self.max_pos += gain
+
+        reward = gain * REWARD_PROGRESS + died * REWARD_DEATH + win * REWARD_WIN
+        done = (self.lives <= 0) | win # жизни кончаются только в шаге смерти
+        lives = self.lives.copy()
+        ended = done.nonzero()[0]
+        if len(ended):
+            # завершённые игры сразу начинаются заново (счёт в info у них уже 0)
+            self._reset(ended)
+        # с поля уходят объекты, чьё время вышло (после проверки смерти:
+        # ушедшие за этот шаг ещё участвуют в заметании, как spawner.culled),
+        # и все объекты сброшенных игр
+        np.less(self.clock, self._exit_t, out=self._alive)
+        info = {"death_cause": cause, "score": self.max_pos * 10, "lives": lives}
+        return self._observe(), reward, done, info
+
+    def _apply_actions(self, actions):
+        dc, dr, facing = moves = _ACTION_MOVES.take(actions, axis=1)
+        np.copyto(self.frog_facing, facing, where=facing > 0)
+
+        # при сходе с бревна нужно снова встать в сетку
+        att = self.frog_slot >= 0
+        leave = (att & (dr != 0)).nonzero()[0]
+        if len(leave):
+            self.frog_col[leave] = np.round(self.frog_x[leave] / CELL_SIZE).astype(np.int64)
+            self.frog_slot[leave] = -1
+            self.frog_rel[leave] = 0
+            att[leave] = False
+
+        # на бревне шаг вбок - клетка на бревне, а не колонка поля
+        on_log = dc * att
+        self.frog_rel += on_log
+        dc -= on_log
+        pos = self._env[:2] # колонка и строка
+        pos += moves[:2]
+        # np.clip на маленьких массивах заметно медленнее пары min/max
+        np.minimum(np.maximum(pos, 0, out=pos), self._pos_max, out=pos)
+
+    # ==============================
+    # Спавн (как LaneSpawner._attempt)
+    # ==============================
+    def _spawn(self):
+        due = (self.next_spawn <= self.clock).nonzero()[0]
+        # крупный шаг может вместить несколько попыток одной полосы
+        while len(due):
+            self._attempt(due)
+            due = due[self.next_spawn[due] <= self.clock]
+
+    def _attempt(self, f):
+        spawn_time = self.next_spawn[f]
+        t = np.maximum(spawn_time, self.clock - self.dt) # опоздавший спавн - в начале шага
+        u_kind, u_size, u_gap, u_size2, u_color = self.rng.random((5, len(f)))
+
+        water = self._f_water[f]
+        croc = water & (self.consec_crocs[f] < WATER_MAX_CONSEC_CROCS) & (u_kind < WATER_SPAWN_WEIGHTS["croc"])
+        kind = np.add(water, croc, dtype=np.int64) # KIND_CAR / KIND_LOG / KIND_CROC
+        size = _sample(kind, u_size)
+
+        # место у края въезда (как LaneSpawner._can_spawn). Объекты полосы
+        # едут с одной скоростью, и каждый прошёл проверку зазора против
+        # предыдущего, поэтому помешать может только последний, и он
+        # освобождает место, отъехав на свою ширину и зазор: этот момент
+        # _place записывает в _free_t. С поля объекты уходят в порядке
+        # спавна: слоты полосы - кольцо, и следующий слот занимал самый
+        # старый объект, уже ушедший
+        ok = t >= self._free_t[f]
+        # с настройками по умолчанию зазора хватает почти всегда: выборка
+        # по ok нужна редко
+        if ok.all():
+            self._place(f, t, kind, u_size, u_size2, u_color)
+        elif ok.any():
+            self._place(f[ok], t[ok], kind[ok], u_size[ok], u_size2[ok], u_color[ok])
+
+        lo_j, hi_j = SPAWN_JITTER
+        mean_interval = self._fz_interval[f * self._max_size + size]
+        self.next_spawn[f] = spawn_time + (lo_j + (hi_j - lo_j) * u_gap) * mean_interval
+
+    def _place(self, f, t, kind, u_size, u_size2, u_color):
+        s = self._ring_next[self._last[f]]
+        self._last[f] = s
+        fs = s * len(self._last) + f
+        # размер машины выбирается заново, как в CarSpawner._create
+        size = _sample(kind, np.where(kind == KIND_CAR, u_size2, u_size))
+        fz = f * self._max_size + size
+        # движение шага ещё впереди: к концу шага объект будет в sx + vx * (now - t)
+        self._x.put(fs, self._fz_spawn_x[fz] - self._f_vx[f] * (t - (self.clock - self.dt)))
+        self._size.put(fs, size)
+        self._span.put(fs, size * CELL_SIZE + (CELL_SIZE - 4))
+        self._kind.put(fs, kind)
+        self._color.put(fs, u_color * _KIND_COLORS[kind])
+        self._alive.put(fs, True)
+        self._exit_t.put(fs, t + self._fz_life[fz])
+        self._free_t[f] = t + self._fz_free[fz]
+        # на дороге счётчик всегда 0, поэтому машина его тоже обнуляет
+        self.consec_crocs[f] = (self.consec_crocs[f] + 1) * (kind == KIND_CROC)
+
+    # ==============================
+    # Полоса лягушки: бревно под ней и смерть за шаг
+    # ==============================
+    def _frog_lane(self):
+        # объекты - живые до удаления этого шага; лягушка вне полос видит
+        # пустую строку и жива
+        row = self.frog_row
+        rows = self._row0 + self._row_lane[row]
+        # позиции в int32: слоты кольца переиспользуются, и x не уходит далеко
+        x = self._x.take(rows, axis=1) # начало шага
+        a = x.astype(np.int32)
+        b = (x + self._step_row.take(rows)).astype(np.int32) # конец шага
+        ba = b - a
+        alive = self._alive.take(rows, axis=1)
+        log = alive & (self._kind.take(rows, axis=1) == KIND_LOG)
+        harm = alive ^ log
+        # хитбоксы лягушки [px + 1, px + CELL - 1] и объекта [ix + 1, ix + width - 1]
+        # пересекаются при ix + span - (px + CELL - 2) в [0, span], span =
+        # width + CELL - 4; сравнение без знака: число меньше 0 становится
+        # огромным
+        span = self._span.take(rows, axis=1)
+        ea = a + span
+        span = span.view(np.uint32)
+        road = self._row_road.take(row)
+
+        # как World._attach_or_detach_on_water (по позициям начала шага):
+        # остаёмся на своём бревне, если стоим на нём, иначе привязываемся
+        # к бревну под лягушкой
+        slot = self.frog_slot
+        att = slot >= 0
+        cur = np.maximum(slot, 0) * self.n + self._env_idx
+        col_px = self.frog_col * CELL_SIZE
+        px = np.where(att, a.take(cur) + self.frog_rel * CELL_SIZE, col_px)
+        on_log = log & ((ea - (px + (CELL_SIZE - 2)).astype(np.int32)).view(np.uint32) <= span)
+        move = (~(att & on_log.take(cur) | road)).nonzero()[0]
+        if len(move):
+            j = on_log[:, move].argmax(axis=0)
+            s = j * self.n + move
+            found = on_log.take(s)
+            # Frog.attach_to: клетка на бревне по колонке лягушки
+            start = np.floor(x.take(s).astype(np.float64) / CELL_SIZE).astype(np.int64)
+            col = self.frog_col[move]
+            rel = np.minimum(np.maximum(col - start, 0), span.take(s) // CELL_SIZE - 1)
+            self.frog_slot[move] = np.where(found, j, -1)
+            self.frog_rel[move] = np.where(found, rel, 0)
+            self.frog_col[move] = np.where(found, start + rel, col)
+            att = slot >= 0
+            cur[move] = s
+
+        # как World._check_death_conditions: на дороге int(x) стоящей лягушки
+        # за шаг проходит все целые между a и b (q - конец отрезка, d - его
+        # длина), в воде без бревна смотрим крокодила в начале шага, на
+        # бревне - в конце
+        px = np.where(att, b.take(cur) + self.frog_rel * CELL_SIZE, col_px)
+        eq = ea + ba * (att | self._row_sweep_right.take(row))
+        d = np.abs(ba) * road
+        hit = (harm & ((eq - (px + (CELL_SIZE - 2)).astype(np.int32)).view(np.uint32) <= span + d.view(np.uint32))).any(axis=0)
+        offscreen = (px + 1).view(np.uint64) > self.board_width - CELL_SIZE + 2
+        self.frog_x[:] = px
+
+        cause = _CAUSE_TABLE.take(road.view(np.uint8) | hit.view(np.uint8) << 1
+                                  | att.view(np.uint8) << 2 | offscreen.view(np.uint8) << 3)
+        return cause > 0, cause
+
+    def _observe(self):
+        # x, size, kind, alive - виды внутренних массивов только для чтения,
+        # следующий шаг их перепишет: чтобы сохранить, нужен .copy()
+        return {
+            "frog_x": self.frog_x.copy(),
+            "frog_row": self.frog_row.copy(),
+            **self._obs_views,
+        }
@@ -0,0 +1,44 @@
+# python -m benchmarks run [-k фильтр] [--out results.json]
+# python -m benchmarks save [--baseline benchmarks/baseline.json]
+# python -m benchmarks compare [--baseline ...] [--threshold 0.15]
+import argparse
+import sys
+
+from benchmarks import suite
+
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Frogger hot path benchmarks")
+    parser.add_argument("mode", choices=["run", "save", "compare"])
+    parser.add_argument("-k", dest="pattern", default="", help="только случаи, содержащие подстроку")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--out", help="куда записать результаты (run)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.15, help="допустимое замедление, доля (compare)")
+    args = parser.parse_args(argv)
+
+    report = suite.run(args.pattern, args.repeats)
+    for name, res in report["results"].items():
+        print(f"{name:40s} {res['median_us']:12.2f} us")
+
+    if args.mode == "run":
+        if args.out:
+            suite.save(report, args.out)
+        return 0
+    if args.mode == "save":
+        suite.save(report, args.baseline)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    regressions = suite.compare(report, suite.load(args.baseline), args.threshold)
+    for name, base, cur, ratio in regressions:
+        print(f"REGRESSION {name}: {base:.2f} us -> {cur:.2f} us ({ratio:.2f}x)")
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# Автоигрок (autoplayer.py): доля побед, время планирования на решение и
+# пропускная способность симуляции вместе с планированием. Завершается с
+# кодом 1, если хоть один план дольше кадра (FRAME_MS).
+# Запуск: python -m benchmarks.autoplay [episodes] [--board COLS SECTIONS]
+import argparse
+import sys
+import time
+
+from env import FroggerEnv
+from board import Board
+from autoplayer import Autoplayer
+
+FRAME_MS = 16.0
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+
+def run(episodes, board=None, max_steps=60 * 120, **kwargs):
+    wins, steps, decisions, deaths, plan_times = 0, 0, 0, {}, []
+    t0 = time.perf_counter()
+    for seed in range(episodes):
+        env = FroggerEnv(max_steps=max_steps, board=board)
+        env.reset(seed)
+        player = Autoplayer(env.world, **kwargs)
+        done = False
+        while not done:
+            _, _, done, info = env.step(player.act())
+            if info["death_cause"] is not None:
+                deaths[info["death_cause"]] = deaths.get(info["death_cause"], 0) + 1
+        wins += info["won"]
+        steps += info["steps"]
+        decisions += player.decision_count
+        plan_times += player.plan_times
+    elapsed = time.perf_counter() - t0
+
+    print(f"  wins: {wins}/{episodes} ({wins / episodes:.0%})  deaths: {deaths}")
+    print(f"  steps per episode: {steps / episodes:.0f}  throughput: {steps / elapsed:.0f} steps/s")
+    print(f"  plans: {len(plan_times)} for {decisions} decisions, "
+          f"{sum(plan_times) / max(decisions, 1) * 1e3:.2f} ms/decision")
+    max_ms = max(plan_times, default=0) * 1e3
+    over = sum(t * 1e3 > FRAME_MS for t in plan_times)
+    print(f"  plan latency ms: p50 {percentile(plan_times, 0.5) * 1e3:.2f}  "
+          f"p99 {percentile(plan_times, 0.99) * 1e3:.2f}  max {max_ms:.2f}")
+    print(f"  plans over {FRAME_MS:.0f} ms frame: {over}")
+    return max_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("episodes", type=int, nargs="?", default=20)
+    parser.add_argument("--board", nargs=2, type=int, metavar=("COLS", "SECTIONS"))
+    parser.add_argument("--horizon", type=int, default=240, help="горизонт планирования, тики")
+    parser.add_argument("--hop", type=int, default=4, help="тиков между решениями")
+    parser.add_argument("--budget", type=float, default=8.0, help="бюджет плана, мс (0 - без бюджета)")
+    args = parser.parse_args()
+
+    board = Board.generate(*args.board, seed=0) if args.board else None
+    name = f"{args.board[0]}x{args.board[1]} board" if args.board else "default board"
+    print(f"{name}, horizon {args.horizon} ticks, decision every {args.hop} ticks, "
+          f"budget {args.budget:g} ms")
+    max_ms = run(args.episodes, board, horizon=args.horizon, hop_ticks=args.hop,
+                 budget=args.budget / 1e3 if args.budget > 0 else None)
+    sys.exit(1 if max_ms > FRAME_MS else 0)
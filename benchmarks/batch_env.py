@@ -0,0 +1,80 @@
+# Сравнение: цикл по World.update против BatchFroggerEnv на одинаковом числе игр
+# (цель - не меньше 50x на 1024 играх). Обе стороны сначала прогреваются до
+# установившейся плотности полос (поле стартует пустым), затем их замеры
+# чередуются - фоновая нагрузка машины достаётся обеим поровну - и берётся
+# лучший из REPEATS, как в timeit.
+# Запуск из корня репозитория: python -m benchmarks.batch_env [num_envs] [ticks]
+import random
+import sys
+import time
+
+import numpy as np
+
+from enums import GameState, Action
+from env import SIM_DT
+from world import World
+from batch_env import BatchFroggerEnv
+
+WARMUP_TICKS = 180 # 3 с игрового времени: полосы успевают заполниться
+REPEATS = 10
+TARGET = 50.0
+
+
+def loop_runner(num_envs):
+    random.seed(0)
+    worlds = [World() for _ in range(num_envs)]
+    for w in worlds:
+        w.state = GameState.PLAYING
+    actions = list(Action)
+
+    def run(n):
+        for _ in range(n):
+            for w in worlds:
+                w.apply_action(random.choice(actions))
+                w.update(SIM_DT)
+                if w.state != GameState.PLAYING:
+                    w.state = GameState.PLAYING
+                    w.lives = 3
+    return run
+
+
+def batch_runner(num_envs):
+    env = BatchFroggerEnv(num_envs, seed=0)
+    env.reset()
+    actions = np.random.default_rng(0).integers(0, len(Action), (1000, num_envs))
+    tick = 0
+
+    def run(n):
+        nonlocal tick
+        for _ in range(n):
+            env.step(actions[tick % len(actions)])
+            tick += 1
+    return run
+
+
+def _seconds(run, n):
+    t0 = time.perf_counter()
+    run(n)
+    return time.perf_counter() - t0
+
+
+def bench(num_envs, ticks):
+    loop, batch = loop_runner(num_envs), batch_runner(num_envs)
+    loop(WARMUP_TICKS)
+    batch(WARMUP_TICKS)
+    # цикл по мирам в разы медленнее - ему хватает десятой части тиков
+    loop_ticks = max(1, ticks // 10)
+    best_loop = best_batch = float("inf")
+    for _ in range(REPEATS):
+        best_loop = min(best_loop, _seconds(loop, loop_ticks))
+        best_batch = min(best_batch, _seconds(batch, ticks))
+    return num_envs * loop_ticks / best_loop, num_envs * ticks / best_batch
+
+
+if __name__ == "__main__":
+    num_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    loop, batch = bench(num_envs, ticks)
+    print(f"World.update loop: {loop:12.0f} steps/s")
+    print(f"BatchFroggerEnv:   {batch:12.0f} steps/s")
+    print(f"speedup:           {batch / loop:12.1f}x (target {TARGET:.0f}x)")
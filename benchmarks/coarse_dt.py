@@ -0,0 +1,94 @@
+# Крупный шаг симуляции: совпадают ли исходы (смерти, победы) с 60 Гц и во
+# сколько раз быстрее прогон. Решения принимаются раз в --decide секунд,
+# на 60 Гц действие применяется в первом тике окна решения. Там же проверка
+# CollisionIndex.query_between против перебора x_at по моментам промежутка.
+# Запуск: python -m benchmarks.coarse_dt [episodes] [--hz 10] [--decisions 600]
+import argparse
+import random
+import time
+
+from enums import Action, GameState
+from world import World
+
+
+def run(seed, hz, decisions, decide_every):
+    world = World(seed)
+    world.state = GameState.PLAYING
+    world.lives = 10**9 # без GAME_OVER: иначе мир замирает посреди окна решения
+    policy = random.Random(seed)
+    ticks = round(decide_every * hz)
+    dt = 1.0 / hz
+    events = []
+    k = 0
+
+    def on_death(cause):
+        events.append((k, cause))
+
+    def on_win():
+        events.append((k, "win"))
+        world.state = GameState.PLAYING
+
+    world.on_death, world.on_win = on_death, on_win
+    for k in range(decisions):
+        world.apply_action(Action(policy.choice([0, 1, 1, 1, 2, 3, 4])))
+        for _ in range(ticks):
+            world.update(dt)
+    return events, (world.frog.row, world.frog.pixel_x)
+
+
+def check_query_between(seeds, queries=300, samples=200):
+    # объект, который при переборе моментов [t0, t1] задевает [x1, x2],
+    # должен быть в ответе query_between; лишние (запас окна) только считаются
+    missed = extra = found = 0
+    for seed in range(seeds):
+        world = World(seed)
+        world.state = GameState.PLAYING
+        world.lives = 10**9
+        for _ in range(60):
+            world.update(0.1)
+        rng = random.Random(seed)
+        lanes = world.cars.lanes + world.water.lanes
+        for _ in range(queries):
+            lane_state = rng.choice(lanes)
+            x1 = rng.uniform(-100, world.board.width + 100)
+            x2 = x1 + rng.uniform(0, 120)
+            t0 = world.time + rng.uniform(-3, 3)
+            t1 = t0 + rng.uniform(0, 2)
+            got = {id(it) for it in world.collision.query_between(lane_state["row"], x1, x2, t0, t1)}
+            hits = set()
+            for it in lane_state["items"]:
+                for j in range(samples + 1):
+                    x = it.x_at(t0 + (t1 - t0) * j / samples)
+                    if x + it.width >= x1 and x <= x2:
+                        hits.add(id(it))
+                        break
+            found += len(hits)
+            missed += len(hits - got)
+            extra += len(got - hits)
+    return missed, extra, found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("episodes", type=int, nargs="?", default=50)
+    parser.add_argument("--hz", type=float, default=10.0, help="частота крупного шага")
+    parser.add_argument("--decisions", type=int, default=600)
+    parser.add_argument("--decide", type=float, default=0.1, help="секунд между решениями")
+    args = parser.parse_args()
+
+    same, events, fine_s, coarse_s = 0, 0, 0.0, 0.0
+    for seed in range(args.episodes):
+        t0 = time.perf_counter()
+        fine = run(seed, 60, args.decisions, args.decide)
+        t1 = time.perf_counter()
+        coarse = run(seed, args.hz, args.decisions, args.decide)
+        fine_s += t1 - t0
+        coarse_s += time.perf_counter() - t1
+        events += len(fine[0])
+        same += fine == coarse
+
+    print(f"{args.episodes} episodes x {args.decisions * args.decide:.0f} s, 60 Hz vs {args.hz:g} Hz")
+    print(f"  identical outcomes: {same}/{args.episodes} ({events} deaths and wins at 60 Hz)")
+    print(f"  60 Hz {fine_s:.2f} s, {args.hz:g} Hz {coarse_s:.2f} s: x{fine_s / coarse_s:.1f}")
+    missed, extra, found = check_query_between(min(args.episodes, 10))
+    print(f"  query_between vs sampled x_at: {missed} missed of {found}, {extra} extra")
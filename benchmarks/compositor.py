@@ -0,0 +1,67 @@
+# Время рендеринга кадра: старый путь (новый кадр + draw_background + draw_ui)
+# против Compositor (кэш фона и HUD). Запуск: python -m benchmarks.compositor [frames]
+import random
+import sys
+import time
+
+from enums import GameState
+from env import SIM_DT
+from world import World
+from rendering import (
+    Compositor,
+    load_assets,
+    create_empty_frame,
+    draw_background,
+    draw_ui,
+    draw_frog,
+    draw_movers,
+)
+
+
+def make_world(ticks=600):
+    random.seed(0)
+    world = World()
+    world.state = GameState.PLAYING
+    for _ in range(ticks):
+        world.update(SIM_DT)
+    return world
+
+
+def draw_legacy(world):
+    frame = create_empty_frame()
+    draw_background(frame)
+    draw_movers(frame, world.water.all_items)
+    draw_frog(frame, world.frog)
+    draw_movers(frame, world.cars.all_items)
+    draw_ui(frame, world.lives, world.score, "")
+    return frame
+
+
+def draw_composited(world, compositor):
+    frame = compositor.begin_frame(world.lives, world.score, "")
+    draw_movers(frame, world.water.all_items)
+    draw_frog(frame, world.frog)
+    draw_movers(frame, world.cars.all_items)
+    return compositor.end_frame(frame)
+
+
+def bench(fn, frames):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - t0) / frames * 1e6
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    load_assets()
+    world = make_world()
+    compositor = Compositor()
+    legacy = bench(lambda: draw_legacy(world), frames)
+    composited = bench(lambda: draw_composited(world, compositor), frames)
+    movers = len(world.water.all_items) + len(world.cars.all_items)
+    print(f"movers on screen: {movers}")
+    print(f"legacy frame:     {legacy:8.1f} us")
+    print(f"compositor frame: {composited:8.1f} us")
+    print(f"saved per frame:  {legacy - composited:8.1f} us ({legacy / composited:.2f}x)")
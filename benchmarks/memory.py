@@ -0,0 +1,74 @@
+# Память и аллокации на длинном безоконном прогоне: пул объектов против
+# создания нового объекта на каждый спавн; размер объекта со __slots__ и без.
+# Запуск: python -m benchmarks.memory [ticks]
+import random
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+
+from enums import GameState, Direction
+from env import SIM_DT
+from entities import Car, MoverPool, MoverClock, STILL_CLOCK
+from world import World
+
+
+class NoPool(MoverPool):
+    # прежнее поведение: ушедшие объекты просто выбрасываются
+    def release(self, obj):
+        pass
+
+
+@dataclass
+class DictRect:
+    # те же поля, что у MovingRect, но без __slots__
+    x0: float
+    row: int
+    direction: Direction
+    speed: float
+    size: int
+    color: tuple
+    t0: float = 0.0
+    clock: MoverClock = field(default=STILL_CLOCK, repr=False)
+    sprite_id: int = -1
+    vx: float = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.vx = self.direction * self.speed
+
+
+def long_run(pool, ticks):
+    random.seed(0)
+    world = World()
+    pool.clock = world.clock
+    world.pool = pool
+    world.cars.pool = world.water.pool = pool
+    world.state = GameState.PLAYING
+
+    for _ in range(ticks // 10): # прогрев
+        world.update(SIM_DT)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    created = pool.created
+    for _ in range(ticks):
+        world.update(SIM_DT)
+        world.state = GameState.PLAYING
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, pool.created - created
+
+
+def instance_bytes(cls, n=10_000):
+    tracemalloc.start()
+    items = [cls(x0=0.0, row=5, direction=Direction.LEFT, speed=60, size=2, color=(1, 2, 3)) for _ in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return current / n
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, pool in (("new object per spawn", NoPool()), ("MoverPool", MoverPool())):
+        current, peak, created = long_run(pool, ticks)
+        print(f"{name:22s} current {current / 1024:8.1f} KiB  peak {peak / 1024:8.1f} KiB  movers allocated {created}")
+    print(f"bytes per mover: dataclass {instance_bytes(DictRect):.0f}, slotted {instance_bytes(Car):.0f}")
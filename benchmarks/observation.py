@@ -0,0 +1,64 @@
+# Стоимость наблюдения за тик: GridEncoder (сетка и подклетки) против
+# отрисовки кадра Renderer (полный и уменьшенный) и списка объектов FroggerEnv.
+# Запуск: python -m benchmarks.observation [ticks]
+import sys
+import time
+
+from enums import GameState
+from settings import GRID_COLS, GRID_ROWS
+from env import SIM_DT, FroggerEnv
+from board import Board, Viewport
+from world import World
+from observation import GridEncoder
+from renderer import Renderer
+from rendering import load_assets
+
+
+def make_world(board=None, ticks=3000):
+    world = World(seed=0, board=board)
+    world.state = GameState.PLAYING
+    for _ in range(ticks):
+        world.update(SIM_DT)
+    return world
+
+
+def bench(world, observe, ticks):
+    # update входит в замер, чтобы инкрементальное кодирование видело движение
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        world.update(SIM_DT)
+        observe()
+        if world.state != GameState.PLAYING:
+            world.state = GameState.PLAYING
+    per_tick = (time.perf_counter() - t0) / ticks
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        world.update(SIM_DT)
+        if world.state != GameState.PLAYING:
+            world.state = GameState.PLAYING
+    return (per_tick - (time.perf_counter() - t0) / ticks) * 1e6
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    load_assets()
+    for name, board in (("default board", None), ("64x5 board", Board.generate(64, 5, seed=0))):
+        world = make_world(board)
+        env = FroggerEnv()
+        env.world = world
+        cases = {
+            "GridEncoder sub=1": GridEncoder(world).encode,
+            "GridEncoder sub=4": GridEncoder(world, 4).encode,
+            "FroggerEnv objects": env._observe,
+            "Renderer cell=40": Renderer(world).render,
+            "Renderer cell=8": Renderer(world, 8).render,
+        }
+        board = world.board
+        if (board.cols, board.rows) != (GRID_COLS, GRID_ROWS):
+            # сетка покрывает всё поле, камера - только его часть
+            whole = Viewport(board, cols=board.cols, rows=board.rows)
+            cases["Renderer cell=8 whole"] = Renderer(world, 8, whole).render
+        print(name, f"({world.board.cols}x{world.board.rows}, "
+                    f"{len(world.cars.all_items) + len(world.water.all_items)} movers)")
+        for case, observe in cases.items():
+            print(f"  {case:20s} {bench(world, observe, ticks):8.1f} us/tick")
@@ -0,0 +1,52 @@
+# Полный и уменьшенный рендеринг при разных размерах окна: время сборки кадра
+# (render) и вместе с увеличением до размера окна (render + present).
+# Запуск: python -m benchmarks.render_scale [frames]
+import sys
+import time
+
+from enums import GameState
+from env import SIM_DT
+from board import Board, Viewport
+from world import World
+from renderer import Renderer
+from rendering import load_assets
+
+# размеры окна в клетках и размеры клетки внутреннего кадра
+VIEWS = [(17, 12), (34, 24), (51, 36)]
+CELLS = [40, 20, 10, 8]
+
+
+def make_world(ticks=3000):
+    # поле больше самого большого окна, полосы успевают заполниться
+    world = World(seed=0, board=Board.generate(64, 5, seed=0))
+    world.state = GameState.PLAYING
+    for _ in range(ticks):
+        world.update(SIM_DT)
+    return world
+
+
+def bench(renderer, frames, present):
+    renderer.render()
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        frame = renderer.render()
+        if present:
+            renderer.present(frame)
+    return (time.perf_counter() - t0) / frames * 1e6
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    load_assets()
+    world = make_world()
+    print(f"{'window':>12s} {'cell':>5s} {'frame':>9s} {'render us':>10s} {'+present us':>12s} {'speedup':>8s}")
+    for cols, rows in VIEWS:
+        full = None
+        for cell in CELLS:
+            renderer = Renderer(world, cell, Viewport(world.board, cols, rows))
+            render = bench(renderer, frames, present=False)
+            total = bench(renderer, frames, present=True)
+            full = full or total
+            window = f"{cols * 40}x{rows * 40}"
+            frame = f"{cols * cell}x{rows * cell}"
+            print(f"{window:>12s} {cell:5d} {frame:>9s} {render:10.1f} {total:12.1f} {full / total:7.1f}x")
@@ -0,0 +1,137 @@
+# Снимки состояния (snapshot.py): цена snapshot/restore/fork против
+# copy.deepcopy мира и проверка, что после restore и в fork игра идёт
+# бит-в-бит так же, как без них (в том числе после ветки с другим dt).
+# Запуск: python -m benchmarks.snapshot [rollouts] [--board COLS SECTIONS]
+import argparse
+import copy
+import random
+import time
+
+from enums import Action, GameState
+from env import SIM_DT
+from board import Board
+from world import World
+
+ACTIONS = [Action.NOOP, Action.UP, Action.UP, Action.LEFT, Action.RIGHT, Action.DOWN]
+ROLLOUT_TICKS = 30
+
+
+def _state(world: World):
+    lanes = tuple(tuple((type(it), it.size, it.color, it.x) for it in lane["items"])
+                  for lane in world.cars.lanes + world.water.lanes)
+    frog = world.frog
+    return (world.time, world.state, world.lives, world.max_pos, frog.row, frog.col,
+            frog.pixel_x, frog.facing, lanes)
+
+
+def _play(world: World, actions, dt=SIM_DT):
+    trace = []
+    for action in actions:
+        world.apply_action(action)
+        world.update(dt)
+        trace.append(_state(world))
+    return trace
+
+
+def _new_world(seed: int, board) -> World:
+    world = World(seed, board)
+    world.state = GameState.PLAYING
+    world.lives = 10**9 # без GAME_OVER
+    policy = random.Random(seed)
+    _play(world, [policy.choice(ACTIONS) for _ in range(600)])
+    return world
+
+
+def check(seeds: int, board) -> int:
+    bad = 0
+    for seed in range(seeds):
+        world = _new_world(seed, board)
+        policy = random.Random(seed + 1)
+        actions = [policy.choice(ACTIONS) for _ in range(300)]
+        root = world.snapshot()
+        expected = _play(world, actions)
+        # другая ветка, в том числе с крупным шагом, потом снова корень
+        world.restore(root)
+        _play(world, [policy.choice(ACTIONS) for _ in range(20)], dt=0.1)
+        world.restore(root)
+        bad += _play(world, actions) != expected
+        world.restore(root)
+        child = world.fork()
+        bad += _play(child, actions) != expected
+        # ветки от снимков, сделанных по ходу игры
+        world.restore(root)
+        mid = None
+        for k, action in enumerate(actions):
+            world.apply_action(action)
+            world.update(SIM_DT)
+            if k == 100:
+                mid = world.snapshot()
+        world.restore(mid)
+        bad += _play(world, actions[101:]) != expected[101:]
+    return bad
+
+
+def _us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bench(rollouts: int, board):
+    world = _new_world(0, board)
+    items = sum(len(lane["items"]) for lane in world.cars.lanes + world.water.lanes)
+    print(f"  {items} movers in {len(world.snapshots.lanes)} lanes")
+
+    buf = world.snapshot()
+    print(f"  snapshot (reused buffer): {_us(lambda: world.snapshot(buf), 20000):.2f} us")
+    print(f"  snapshot (new buffer):    {_us(world.snapshot, 20000):.2f} us")
+    print(f"  restore (no changes):     {_us(lambda: world.restore(buf), 20000):.2f} us")
+
+    # поиск: из корня много коротких прогонов, снимок в каждом узле
+    policy = random.Random(1)
+    root = world.snapshot()
+    node = world.snapshot()
+    t_restore = t_snap = 0.0
+    for _ in range(rollouts):
+        t0 = time.perf_counter()
+        world.restore(root)
+        t_restore += time.perf_counter() - t0
+        for _ in range(ROLLOUT_TICKS):
+            world.apply_action(policy.choice(ACTIONS))
+            world.update(SIM_DT)
+            t0 = time.perf_counter()
+            world.snapshot(node)
+            t_snap += time.perf_counter() - t0
+    print(f"  in search ({rollouts} rollouts x {ROLLOUT_TICKS} ticks): "
+          f"restore {t_restore / rollouts * 1e6:.2f} us, snapshot {t_snap / (rollouts * ROLLOUT_TICKS) * 1e6:.2f} us")
+    world.restore(root)
+    print(f"  update (for scale):       {_us(lambda: world.update(SIM_DT), 5000):.2f} us")
+    world.restore(root)
+    print(f"  fork:                     {_us(world.fork, 500):.1f} us")
+    print(f"  World() (for scale):      {_us(lambda: World(world.seed, board), 200):.1f} us")
+
+    # тот же поиск через fork: своя копия мира на каждый прогон
+    t_fork = 0.0
+    for _ in range(rollouts // 4):
+        t0 = time.perf_counter()
+        child = world.fork()
+        t_fork += time.perf_counter() - t0
+        for _ in range(ROLLOUT_TICKS):
+            child.apply_action(policy.choice(ACTIONS))
+            child.update(SIM_DT)
+    print(f"  in search via fork ({rollouts // 4} rollouts): fork {t_fork / (rollouts // 4) * 1e6:.1f} us")
+    print(f"  copy.deepcopy(world):     {_us(lambda: copy.deepcopy(world), 50):.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rollouts", type=int, nargs="?", default=2000)
+    parser.add_argument("--seeds", type=int, default=20, help="миров для проверки бит-в-бит")
+    parser.add_argument("--board", nargs=2, type=int, metavar=("COLS", "SECTIONS"))
+    args = parser.parse_args()
+
+    board = Board.generate(*args.board, seed=0) if args.board else None
+    print(f"{args.board[0]}x{args.board[1]} board" if args.board else "default board")
+    print(f"  trajectory mismatches after restore/fork: {check(args.seeds, board)} ({args.seeds} worlds)")
+    bench(args.rollouts, board)
@@ -0,0 +1,78 @@
+# Поток для зрителей (spectator.py): байт на зрителя за секунду игры, цена
+# кодирования на тик и совпадение зеркала у зрителей с миром в конце.
+# Игра без окна (лягушкой управляет автоигрок) идёт быстрее реального
+# времени, поэтому трафик считается на секунду времени симуляции.
+# Запуск: python -m benchmarks.spectator [seconds] [--spectators N] [--board COLS SECTIONS]
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from enums import GameState
+from env import SIM_DT
+from board import Board
+from world import World
+from autoplayer import Autoplayer
+from spectator import SpectatorServer, SpectatorClient
+
+
+def _read_all(client: SpectatorClient):
+    while client.poll(1.0):
+        pass
+
+
+def _mismatches(world: World, mirror) -> int:
+    bad = 0
+    for lane_state, mirrored in zip(world.cars.lanes + world.water.lanes, mirror.lanes):
+        xs = [(type(it), it.size, it.x) for it in lane_state["items"]]
+        bad += xs != [(type(it), it.size, it.x) for it in mirrored["items"]]
+    bad += (world.frog.row, world.frog.pixel_x) != (mirror.frog.row, mirror.frog.pixel_x)
+    bad += (world.state, world.lives, world.max_pos) != (mirror.state, mirror.lives, mirror.max_pos)
+    return bad
+
+
+def run(seconds: float, spectators: int, board=None):
+    world = World(seed=0, board=board)
+    world.state = GameState.PLAYING
+    player = Autoplayer(world)
+    path = os.path.join(tempfile.mkdtemp(), "frogger.sock")
+    server = SpectatorServer(world, "unix:" + path)
+    clients = [SpectatorClient("unix:" + path) for _ in range(spectators)]
+    readers = [threading.Thread(target=_read_all, args=(c,), daemon=True) for c in clients]
+    for reader in readers:
+        reader.start()
+
+    ticks = int(seconds / SIM_DT)
+    encode = 0.0
+    for _ in range(ticks):
+        if world.state != GameState.PLAYING:
+            world.state, world.lives = GameState.PLAYING, 3 # новая игра без пауз
+        world.apply_action(player.act())
+        world.update(SIM_DT)
+        t0 = time.perf_counter()
+        server.tick(SIM_DT)
+        encode += time.perf_counter() - t0
+    server.close()
+    for reader in readers:
+        reader.join()
+
+    print(f"  {world.time:.0f} s of play, {server.connected} spectators")
+    print(f"  per spectator: {server.broadcast_bytes / world.time:.0f} B/s of game time")
+    print(f"  encode and queue: {encode / ticks * 1e6:.1f} us/tick")
+    if clients:
+        print(f"  mirror mismatches: {sum(_mismatches(world, c.mirror) for c in clients)}")
+    for client in clients:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("seconds", type=float, nargs="?", default=120.0)
+    parser.add_argument("--spectators", type=int, default=4)
+    parser.add_argument("--board", nargs=2, type=int, metavar=("COLS", "SECTIONS"))
+    args = parser.parse_args()
+
+    board = Board.generate(*args.board, seed=0) if args.board else None
+    print(f"{args.board[0]}x{args.board[1]} board" if args.board else "default board")
+    run(args.seconds, args.spectators, board)
@@ -0,0 +1,55 @@
+# Стоимость отрисовки одного объекта: поиск спрайта по строковому ключу (как раньше)
+# против id спрайта, назначенного при спавне. Запуск: python -m benchmarks.sprite_lookup [movers]
+import sys
+import time
+
+import rendering
+from settings import CAR_COLORS
+from entities import Car, WoodLog, Crocodile
+from rendering import load_assets, create_empty_frame, draw_movers, overlay_sprite, draw_rect_from_hitbox
+from benchmarks.compositor import make_world
+
+
+def draw_movers_by_key(frame, movers):
+    # прежняя реализация draw_movers
+    for m in movers:
+        sprite_key = ""
+        if isinstance(m, Car):
+            try:
+                color_index = CAR_COLORS.index(m.color)
+                sprite_key = f"car_{m.size}_{color_index}_{m.direction.name.lower()}"
+            except ValueError:
+                pass
+        elif isinstance(m, WoodLog):
+            sprite_key = f"log_{m.size}"
+        elif isinstance(m, Crocodile):
+            sprite_key = f"croc_{m.size}_{m.direction.name.lower()}"
+        sprite = rendering.ASSETS.get(sprite_key)
+        if sprite is not None:
+            overlay_sprite(frame, sprite, m.x, m.y)
+        else:
+            draw_rect_from_hitbox(frame, m.hitbox, m.color)
+
+
+def per_mover(fn, frame, movers, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn(frame, movers)
+    return (time.perf_counter() - t0) / (repeats * len(movers)) * 1e9
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    load_assets()
+    world = make_world()
+    base = world.water.all_items + world.cars.all_items
+    movers = (base * (count // len(base) + 1))[:count]
+    frame = create_empty_frame()
+
+    # только поиск спрайта: объекты вынесены за кадр, наложение сразу выходит
+    hidden = [type(m)(x0=-10_000, row=m.row, direction=m.direction, speed=m.speed,
+                      size=m.size, color=m.color, sprite_id=m.sprite_id) for m in movers]
+    for name, items in (("lookup only", hidden), ("full draw", movers)):
+        before = per_mover(draw_movers_by_key, frame, items, 20)
+        after = per_mover(draw_movers, frame, items, 20)
+        print(f"{name:12s} string key: {before:8.0f} ns/mover  sprite id: {after:8.0f} ns/mover")
@@ -0,0 +1,239 @@
+# Набор замеров горячих путей: наложение спрайтов, отрисовка, спавнеры, полный кадр.
+# Каждый случай - функция, которая готовит данные и возвращает замеряемый вызов.
+import json
+import math
+import platform
+import random
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+import rendering
+from enums import GameState
+from env import SIM_DT
+from settings import (
+    CELL_SIZE, WINDOW_WIDTH,
+    CAR_SIZES, LOG_SIZES, CROC_SIZES,
+    ROAD_TARGET_GAP_CELLS, WATER_TARGET_GAP_CELLS,
+)
+from board import Board
+from renderer import Renderer
+from entities import Car, WoodLog
+from spawners import CarSpawner, WaterLaneSpawner, _add_item
+from world import World
+from rendering import (
+    create_empty_frame,
+    draw_background,
+    draw_movers,
+    load_assets,
+    overlay_sprite,
+)
+
+CASES: Dict[str, Callable[[], Callable[[], None]]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def _frame():
+    frame = create_empty_frame()
+    draw_background(frame)
+    return frame
+
+
+def _world(ticks=600, board=None):
+    world = World(seed=0, board=board)
+    world.state = GameState.PLAYING
+    for _ in range(ticks):
+        world.update(SIM_DT)
+    return world
+
+
+# ==============================
+# overlay_sprite
+# ==============================
+_SPRITES = {"frog": "frog_up", "car1": "car_1_0_right", "car3": "car_3_0_right", "log4": "log_4"}
+_PLACEMENTS = {
+    "inside": lambda w: (200, 200),
+    "clip_left": lambda w: (-w // 2, 200),
+    "clip_right": lambda w: (WINDOW_WIDTH - w // 2, 200),
+    "offscreen": lambda w: (WINDOW_WIDTH + 10, 200),
+}
+
+def _overlay_case(sprite_name, key, placement):
+    def setup():
+        frame = _frame()
+        sprite = rendering.ASSETS[key]
+        x, y = _PLACEMENTS[placement](sprite.shape[1])
+        return lambda: overlay_sprite(frame, sprite, x, y)
+    return setup
+
+for _name, _key in _SPRITES.items():
+    for _placement in _PLACEMENTS:
+        case(f"overlay_sprite.{_name}.{_placement}")(_overlay_case(_name, _key, _placement))
+
+
+# ==============================
+# draw_movers / draw_background
+# ==============================
+def _draw_movers_case(count):
+    def setup():
+        frame = _frame()
+        world = _world()
+        base = world.water.all_items + world.cars.all_items
+        movers = (base * (count // len(base) + 1))[:count]
+        return lambda: draw_movers(frame, movers)
+    return setup
+
+for _count in (10, 100, 1000):
+    case(f"draw_movers.{_count}")(_draw_movers_case(_count))
+
+
+@case("draw_background")
+def _draw_background():
+    frame = create_empty_frame()
+    return lambda: draw_background(frame)
+
+
+# ==============================
+# Спавнеры при разной плотности
+# ==============================
+# Полоса заполнена объектами с целевым зазором (как при обычном спавне),
+# поле - такой ширины, чтобы их поместилось per_lane. Время идёт шагами
+# SIM_DT, спавн по расписанию полосы, поэтому в замере и удаление с края
+# выезда, и попытки спавна, а плотность остаётся около per_lane
+def _fill(spawner, cls, size, per_lane):
+    step = size * CELL_SIZE + spawner.target_gap_px
+    for lane_state in spawner.lanes:
+        for i in range(per_lane):
+            obj = cls(x0=i * step, row=lane_state["row"], direction=lane_state["dir"],
+                      speed=lane_state["speed"], size=size, color=(0, 0, 0), clock=spawner.pool.clock)
+            _add_item(lane_state, obj)
+    spawner.reschedule() # объекты добавлены в обход спавна
+
+def _spawner_case(spawner_cls, cls, sizes, gap_cells, per_lane):
+    def setup():
+        size = min(s["size"] for s in sizes)
+        board = Board.generate(math.ceil(per_lane * (size + gap_cells)), 1, seed=0)
+        spawner = spawner_cls(board, rng=random.Random(0))
+        _fill(spawner, cls, size, per_lane)
+        now = 0.0
+
+        def tick():
+            nonlocal now
+            now += SIM_DT
+            spawner.update(now, SIM_DT)
+        return tick
+    return setup
+
+for _density in (5, 50, 500):
+    case(f"spawner.cars.{_density}_per_lane")(
+        _spawner_case(CarSpawner, Car, CAR_SIZES, ROAD_TARGET_GAP_CELLS, _density))
+    case(f"spawner.water.{_density}_per_lane")(
+        _spawner_case(WaterLaneSpawner, WoodLog, LOG_SIZES + CROC_SIZES, WATER_TARGET_GAP_CELLS, _density))
+
+
+# ==============================
+# Полный кадр: update + отрисовка
+# ==============================
+# большое поле: 64 колонки, 10 секций по 4 полосы воды и 4 дороги;
+# 3000 тиков - чтобы полосы успели заполниться от краёв
+BIG_BOARD = (64, 10, 3000)
+
+def _frame_update_case(board_args=None):
+    def setup():
+        if board_args is None:
+            world = _world()
+        else:
+            cols, sections, ticks = board_args
+            world = _world(ticks, Board.generate(cols, sections, seed=0))
+        return lambda: world.update(SIM_DT)
+    return setup
+
+def _frame_update_draw_case(board_args=None, cell=CELL_SIZE):
+    # то же, что Game.compose: renderer.Renderer + увеличение до размера окна
+    def setup():
+        if board_args is None:
+            world = _world()
+        else:
+            cols, sections, ticks = board_args
+            world = _world(ticks, Board.generate(cols, sections, seed=0))
+        renderer = Renderer(world, cell)
+
+        def frame():
+            world.update(SIM_DT)
+            renderer.present(renderer.render())
+            if world.state != GameState.PLAYING:
+                world.state = GameState.PLAYING
+        return frame
+    return setup
+
+case("frame.update")(_frame_update_case())
+case("frame.update_draw")(_frame_update_draw_case())
+case("frame.update.big_board")(_frame_update_case(BIG_BOARD))
+case("frame.update_draw.big_board")(_frame_update_draw_case(BIG_BOARD))
+case("frame.update_draw.cell10")(_frame_update_draw_case(cell=10))
+
+
+# ==============================
+# Запуск и сравнение
+# ==============================
+def measure(fn: Callable[[], None], repeats: int = 7, min_time: float = 0.02) -> dict:
+    # число вызовов подбирается так, чтобы один повтор длился не меньше min_time
+    fn()
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        if time.perf_counter() - t0 >= min_time:
+            break
+        n *= 2
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn()
+        times.append((time.perf_counter() - t0) / n * 1e6)
+    return {"median_us": float(np.median(times)), "min_us": min(times), "calls": n}
+
+
+def run(pattern: str = "", repeats: int = 7) -> dict:
+    load_assets()
+    results = {}
+    for name, setup in CASES.items():
+        if pattern in name:
+            results[name] = measure(setup(), repeats)
+    return {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "numpy": np.__version__},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    # случаи, ставшие медленнее базовой линии больше чем на threshold (доля)
+    regressions = []
+    for name, res in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = res["median_us"] / base["median_us"]
+        if ratio > 1.0 + threshold:
+            regressions.append((name, base["median_us"], res["median_us"], ratio))
+    return regressions
+
+
+def save(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,61 @@
+# Стоимость записи видео для игрового цикла: VideoWriter.write в том же потоке
+# против VideoRecorder (копия в буфер + фоновое кодирование).
+# Запуск: python -m benchmarks.video [frames]
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, TARGET_FPS
+from rendering import load_assets, Compositor, draw_movers, draw_frog
+from video import VideoRecorder
+from benchmarks.compositor import make_world
+
+
+def render(world, compositor):
+    frame = compositor.begin_frame(world.lives, world.score, "")
+    draw_movers(frame, world.water.all_items)
+    draw_frog(frame, world.frog)
+    draw_movers(frame, world.cars.all_items)
+    return frame
+
+
+if __name__ == "__main__":
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    load_assets()
+    world = make_world()
+    compositor = Compositor()
+    path = os.path.join(tempfile.mkdtemp(), "bench.mp4")
+
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        world.update(1 / TARGET_FPS)
+        render(world, compositor)
+    base = (time.perf_counter() - t0) / frames * 1e3
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), TARGET_FPS, (WINDOW_WIDTH, WINDOW_HEIGHT))
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        world.update(1 / TARGET_FPS)
+        writer.write(render(world, compositor))
+    inline = (time.perf_counter() - t0) / frames * 1e3
+    writer.release()
+
+    # игровой цикл с паузами до 60 FPS; меряем только время самого цикла
+    for block in (False, True):
+        video = VideoRecorder(path, block=block)
+        busy = 0.0
+        for _ in range(frames):
+            t0 = time.perf_counter()
+            world.update(1 / TARGET_FPS)
+            video.submit(render(world, compositor))
+            spent = time.perf_counter() - t0
+            busy += spent
+            time.sleep(max(0.0, 1 / TARGET_FPS - spent))
+        video.close()
+        print(f"VideoRecorder(block={block!s:5}): {busy / frames * 1e3:6.2f} ms/frame  {video.stats()}")
+
+    print(f"no recording:       {base:6.2f} ms/frame")
+    print(f"inline write:       {inline:6.2f} ms/frame")
@@ -0,0 +1,174 @@
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from settings import (
+    CELL_SIZE, GRID_COLS, GRID_ROWS,
+    FINISH_ROWS, START_ROWS,
+    ROAD_LANES, WATER_LANES,
+    LILYPAD_LOCATIONS, GRASS_LOCATIONS,
+)
+
+# типы строк поля
+ROW_NONE = 0
+ROW_FINISH = 1
+ROW_WATER = 2
+ROW_ROAD = 3
+ROW_SAFE = 4 # старт и безопасные полосы между секциями
+
+
+# ==========================================================
+# Описание поля: размеры, полосы, зоны и декорации
+# ==========================================================
+# Строки воды и дороги задаются самими полосами (road_lanes / water_lanes),
+# поэтому зоны не обязаны быть сплошными - на большом поле секции чередуются.
+@dataclass
+class Board:
+    cols: int = GRID_COLS
+    rows: int = GRID_ROWS
+    road_lanes: List[Dict] = field(default_factory=lambda: [dict(l) for l in ROAD_LANES])
+    water_lanes: List[Dict] = field(default_factory=lambda: [dict(l) for l in WATER_LANES])
+    finish_rows: Tuple[int, int] = FINISH_ROWS # включительно
+    safe_rows: List[int] = field(default_factory=lambda: list(range(START_ROWS[0], START_ROWS[1] + 1)))
+    lilypads: List[int] = field(default_factory=lambda: list(LILYPAD_LOCATIONS))
+    grass: List[Tuple[int, int]] = field(default_factory=lambda: list(GRASS_LOCATIONS))
+    start_col: int = 8
+    start_row: int = 10
+
+    def __post_init__(self):
+        # тип каждой строки - для быстрых проверок и отрисовки фона
+        kinds = [ROW_NONE] * self.rows
+        for row in range(self.finish_rows[0], self.finish_rows[1] + 1):
+            kinds[row] = ROW_FINISH
+        for row in self.safe_rows:
+            kinds[row] = ROW_SAFE
+        for lane in self.road_lanes:
+            kinds[lane["row"]] = ROW_ROAD
+        for lane in self.water_lanes:
+            kinds[lane["row"]] = ROW_WATER
+        self.row_kinds = kinds
+
+        # травинки по строкам, чтобы рисовать только видимые
+        self.grass_by_row: Dict[int, List[int]] = {}
+        for col, row in self.grass:
+            self.grass_by_row.setdefault(row, []).append(col)
+
+    @property
+    def width(self) -> int:
+        return self.cols * CELL_SIZE
+
+    @property
+    def height(self) -> int:
+        return self.rows * CELL_SIZE
+
+    def is_water(self, row: int) -> bool:
+        return 0 <= row < self.rows and self.row_kinds[row] == ROW_WATER
+
+    def is_road(self, row: int) -> bool:
+        return 0 <= row < self.rows and self.row_kinds[row] == ROW_ROAD
+
+    def is_finish(self, row: int) -> bool:
+        return row <= self.finish_rows[1]
+
+    @classmethod
+    def generate(cls, cols: int, sections: int, lanes_per_zone: int = 4,
+                 seed: Optional[int] = None) -> "Board":
+        # большое поле для стресс-тестов: финиш сверху, затем секции
+        # "вода -> дорога -> безопасная полоса", внизу старт из 3 строк
+        rng = random.Random(seed)
+        road_lanes, water_lanes, safe_rows, grass = [], [], [], []
+        row = 1
+        for _ in range(sections):
+            for i in range(lanes_per_zone):
+                water_lanes.append({"row": row, "dir": (-1, +1)[i % 2], "speed": rng.randint(40, 65)})
+                row += 1
+            for i in range(lanes_per_zone):
+                road_lanes.append({"row": row, "dir": (-1, +1)[i % 2], "speed": rng.randint(60, 110)})
+                row += 1
+            safe_rows.append(row)
+            row += 1
+        safe_rows.extend((row, row + 1))
+        rows = row + 3 - 1 # последняя безопасная полоса секции + ещё 2 строки старта
+
+        for safe in safe_rows:
+            for col in rng.sample(range(cols), max(1, cols // 6)):
+                grass.append((col, safe))
+
+        return cls(
+            cols=cols,
+            rows=rows,
+            road_lanes=road_lanes,
+            water_lanes=water_lanes,
+            finish_rows=(0, 0),
+            safe_rows=safe_rows,
+            lilypads=list(range(2, cols - 1, 3)),
+            grass=grass,
+            start_col=cols // 2,
+            start_row=rows - 2,
+        )
+
+
+DEFAULT_BOARD = Board()
+
+
+def default_board() -> Board:
+    return DEFAULT_BOARD
+
+
+# ==========================================================
+# Окно просмотра (камера) над полем
+# ==========================================================
+# Камера сдвигается на целые клетки, только когда лягушка подходит к краю
+# ближе, чем margin - так фон перерисовывается редко.
+class Viewport:
+    def __init__(self, board: Board, cols: int = GRID_COLS, rows: int = GRID_ROWS,
+                 margin_cols: int = 4, margin_rows: int = 3):
+        self.board = board
+        self.cols = min(cols, board.cols)
+        self.rows = min(rows, board.rows)
+        self.margin_cols = margin_cols
+        self.margin_rows = margin_rows
+        self.col = 0
+        self.row = 0
+        self.center(board.start_col, board.start_row)
+
+    @property
+    def width(self) -> int:
+        return self.cols * CELL_SIZE
+
+    @property
+    def height(self) -> int:
+        return self.rows * CELL_SIZE
+
+    @property
+    def x(self) -> int:
+        return self.col * CELL_SIZE
+
+    @property
+    def y(self) -> int:
+        return self.row * CELL_SIZE
+
+    @property
+    def visible_rows(self) -> range:
+        return range(self.row, self.row + self.rows)
+
+    def _clamp(self):
+        self.col = max(0, min(self.col, self.board.cols - self.cols))
+        self.row = max(0, min(self.row, self.board.rows - self.rows))
+
+    def center(self, col: int, row: int):
+        self.col = col - self.cols // 2
+        self.row = row - self.rows // 2
+        self._clamp()
+
+    def follow(self, col: int, row: int):
+        # держим клетку (col, row) не ближе margin к краю окна
+        if col < self.col + self.margin_cols:
+            self.col = col - self.margin_cols
+        elif col >= self.col + self.cols - self.margin_cols:
+            self.col = col - self.cols + self.margin_cols + 1
+        if row < self.row + self.margin_rows:
+            self.row = row - self.margin_rows
+        elif row >= self.row + self.rows - self.margin_rows:
+            self.row = row - self.rows + self.margin_rows + 1
+        self._clamp()
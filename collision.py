@@ -0,0 +1,115 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Type
+
+from entities import MovingRect
+from utils import rects_intersect
+
+
+def _x(item: MovingRect) -> float:
+    return item.x
+
+
+def contact_time(item: MovingRect, x1: int, x2: int, dt: float) -> Optional[float]:
+    # время первого касания неподвижного отрезка [x1, x2] объектом строки за
+    # последний шаг dt (от начала шага), None - касания не было.
+    # Хитбокс объекта [int(x) + 1, int(x) + width - 1] пересекает отрезок при
+    # int(x) в [lo, hi]; за шаг int(x) проходит все целые между концами,
+    # поэтому быстрый объект не может "перепрыгнуть" лягушку
+    lo, hi = x1 - item.width + 1, x2 - 1
+    v = item.vx
+    end = item.x
+    start = end - v * dt
+    a, b = int(start), int(end)
+    if lo <= a <= hi:
+        return 0.0
+    if max(a, b) < lo or min(a, b) > hi:
+        return None
+    # вошли в диапазон по ходу движения
+    edge = lo if v > 0 else hi + 1
+    return min(max((edge - start) / v, 0.0), dt)
+
+
+def _query_lane(lane_state, x1: float, x2: float) -> List[MovingRect]:
+    items = lane_state["items"]
+    if not items:
+        return []
+    # +1 на округление int(x) в хитбоксах
+    lo = bisect_left(items, x1 - lane_state["max_width"] - 1, key=_x)
+    hi = bisect_right(items, x2 + 1, key=_x)
+    return items[lo:hi]
+
+
+# =====================================================================
+# Индекс коллизий: полосы по номеру строки, объекты в полосе по x
+# =====================================================================
+# Спавнеры держат lane_state["items"] отсортированными по x (см. insort в
+# spawners.py), поэтому запрос к строке — два бинарных поиска и проверка
+# только тех объектов, которые могут пересечь заданный отрезок.
+class CollisionIndex:
+    def __init__(self, *spawners):
+        self.spawners = spawners
+        self.rows: Dict[int, List[dict]] = {}
+        for spawner in spawners:
+            for lane_state in spawner.lanes:
+                self.rows.setdefault(lane_state["row"], []).append(lane_state)
+
+    def query(self, row: int, x1: float, x2: float) -> List[MovingRect]:
+        # объекты строки, у которых [x, x + width] может пересечь [x1, x2]
+        out: List[MovingRect] = []
+        for lane_state in self.rows.get(row, ()):
+            out.extend(_query_lane(lane_state, x1, x2))
+        return out
+
+    def query_between(self, row: int, x1: float, x2: float, t0: float, t1: float) -> List[MovingRect]:
+        # объекты строки, которые за время [t0, t1] могут пересечь [x1, x2],
+        # без шагов симуляции: объекты полосы едут с одной скоростью, поэтому
+        # это тот же бинарный поиск по x на часах мира с окном, сдвинутым на
+        # путь полосы до t0 и t1. Только уже появившиеся объекты (будущие
+        # спавны неизвестны), включая ещё не удалённые за краем
+        out: List[MovingRect] = []
+        for lane_state in self.rows.get(row, ()):
+            items = lane_state["items"]
+            if not items:
+                continue
+            now = items[0].clock.now
+            v = items[0].vx
+            s0, s1 = v * (t0 - now), v * (t1 - now)
+            out.extend(_query_lane(lane_state, x1 - max(s0, s1), x2 - min(s0, s1)))
+        return out
+
+    def query_rows(self, rows, x1: float, x2: float) -> List[MovingRect]:
+        # объекты в прямоугольнике строк rows x [x1, x2] (видимая часть поля)
+        out: List[MovingRect] = []
+        for row in rows:
+            out.extend(self.query(row, x1, x2))
+        return out
+
+    def first_hit(self, hitbox, row: int,
+                  cls: Optional[Type[MovingRect]] = None) -> Optional[MovingRect]:
+        x1, _, x2, _ = hitbox
+        for it in self.query(row, x1, x2):
+            if (cls is None or isinstance(it, cls)) and rects_intersect(hitbox, it.hitbox):
+                return it
+        return None
+
+    def first_contact(self, hitbox, row: int, dt: float,
+                      cls: Optional[Type[MovingRect]] = None) -> Optional[float]:
+        # заметание за последний шаг для неподвижного хитбокса: время первого
+        # касания от начала шага или None. Учитываются и объекты, ушедшие за
+        # край в этом же шаге (spawner.culled)
+        x1, _, x2, _ = hitbox
+        first = None
+        for lane_state in self.rows.get(row, ()):
+            travel = lane_state["speed"] * dt
+            for it in _query_lane(lane_state, x1 - travel, x2 + travel):
+                if cls is None or isinstance(it, cls):
+                    t = contact_time(it, x1, x2, dt)
+                    if t is not None and (first is None or t < first):
+                        first = t
+        for spawner in self.spawners:
+            for it in spawner.culled:
+                if it.row == row and (cls is None or isinstance(it, cls)):
+                    t = contact_time(it, x1, x2, dt)
+                    if t is not None and (first is None or t < first):
+                        first = t
+        return first
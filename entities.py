@@ -1,17 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Optional
-
-from settings import (
-    CELL_SIZE, GRID_COLS, GRID_ROWS,
-    WINDOW_WIDTH,
-    WATER_ROWS, ROAD_ROWS,
-)
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Type
+
+from settings import CELL_SIZE
+from board import Board, default_board
 from enums import Direction, Facing
 from utils import clamp
+from sprite_ids import FROG_SPRITE_IDS
 
 
 class HasHitbox:
+    __slots__ = ()
+
     @property
     def hitbox(self):
         raise NotImplementedError
@@ -20,7 +20,7 @@ class HasHitbox:
 # ==============================
 # Лягушка
 # ==============================
-@dataclass
+@dataclass(slots=True)
 class Frog(HasHitbox):
     col: int
     row: int
@@ -28,12 +28,25 @@ class Frog(HasHitbox):
     facing: Facing = Facing.UP
     attached_log: Optional[WoodLog] = None
     rel_cell: int = 0 # позиция относительно бревна
+    sprite_id: int = -1 # id спрайта для текущего направления взгляда
+    board: Board = field(default_factory=default_board, repr=False)
+
+    def __post_init__(self):
+        self.sprite_id = FROG_SPRITE_IDS[self.facing]
+
+    def reset(self, col: int, row: int):
+        # возврат на старт без создания нового объекта
+        self.col, self.row = col, row
+        self.facing = Facing.UP
+        self.attached_log = None
+        self.rel_cell = 0
+        self.sprite_id = FROG_SPRITE_IDS[self.facing]
 
     def on_water(self) -> bool:
-        return WATER_ROWS[0] <= self.row <= WATER_ROWS[1]
+        return self.board.is_water(self.row)
 
     def on_road(self) -> bool:
-        return ROAD_ROWS[0] <= self.row <= ROAD_ROWS[1]
+        return self.board.is_road(self.row)
 
     @property
     def pixel_x(self) -> int:
@@ -62,6 +75,7 @@ class Frog(HasHitbox):
         elif col < 0: self.facing = Facing.LEFT
         elif row > 0: self.facing = Facing.DOWN
         elif row < 0: self.facing = Facing.UP
+        self.sprite_id = FROG_SPRITE_IDS[self.facing]
 
         if row != 0 and self.attached_log is not None:
             # при сходе с бревна нужно снова встать в сетку
@@ -95,21 +109,50 @@ class Frog(HasHitbox):
         self._clamp_to_bounds()
 
     def _clamp_to_bounds(self):
-        self.col = clamp(self.col, 0, GRID_COLS - 1)
-        self.row = clamp(self.row, 0, GRID_ROWS - 1)
+        self.col = clamp(self.col, 0, self.board.cols - 1)
+        self.row = clamp(self.row, 0, self.board.rows - 1)
 
 
 # ===============================================
 # Движущиеся объекты (машины, крокодилы, брёвна)
 # ===============================================
-@dataclass
+class MoverClock:
+    # общие часы объектов мира: положение объекта считается от них, поэтому
+    # спавнеру достаточно переставить now, чтобы сдвинуть все объекты сразу
+    __slots__ = ("now",)
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+
+# часы по умолчанию для объектов вне мира (замеры, проверки): всегда 0
+STILL_CLOCK = MoverClock()
+
+
+@dataclass(slots=True)
 class MovingRect(HasHitbox):
-    x: float
+    x0: float # x в момент t0
     row: int
     direction: Direction
     speed: float # пиксели в секунду
     size: int # кол-во ячеек
     color: tuple
+    t0: float = 0.0 # момент спавна по часам clock
+    clock: MoverClock = field(default=STILL_CLOCK, repr=False)
+    sprite_id: int = -1 # id спрайта (см. sprite_ids.py), назначается при спавне
+    vx: float = field(init=False, repr=False) # direction * speed
+
+    def __post_init__(self):
+        self.vx = self.direction * self.speed
+
+    @property
+    def x(self) -> float:
+        # скорость постоянная: x считается от спавна, а не накапливается
+        # по тикам (нет обхода всех объектов за тик и нет накопленной ошибки)
+        return self.x0 + self.vx * (self.clock.now - self.t0)
+
+    def x_at(self, t: float) -> float:
+        return self.x0 + self.vx * (t - self.t0)
 
     @property
     def y(self) -> float:
@@ -119,12 +162,9 @@ class MovingRect(HasHitbox):
     def width(self) -> int:
         return self.size * CELL_SIZE
 
-    def update(self, dt: float):
-        self.x += self.direction * self.speed * dt
-
-    def is_visible(self) -> bool:
+    def is_visible(self, board_width: int) -> bool:
         if self.direction > 0:
-            return self.x < WINDOW_WIDTH
+            return self.x < board_width
         else:
             return (self.x + self.width) > 0
 
@@ -137,14 +177,46 @@ class MovingRect(HasHitbox):
 
 
 class Car(MovingRect):
-    pass
+    __slots__ = ()
 
 
 class Crocodile(MovingRect):
-    pass
+    __slots__ = ()
 
 
 class WoodLog(MovingRect):
+    __slots__ = ()
+
     @property
     def start_cell(self) -> int:
         return int(self.x // CELL_SIZE)
+
+
+# ==============================================
+# Пул объектов: переиспользование ушедших с экрана
+# ==============================================
+class MoverPool:
+    def __init__(self, clock: Optional[MoverClock] = None):
+        self.clock = clock if clock is not None else MoverClock() # часы выданных объектов
+        self.free: Dict[type, List[MovingRect]] = {}
+        self.created = 0 # сколько объектов пришлось создать
+        self.reused = 0
+
+    def acquire(self, cls: Type[MovingRect], x0: float, t0: float, row: int, direction: Direction,
+                speed: float, size: int, color: tuple) -> MovingRect:
+        free = self.free.get(cls)
+        if not free:
+            self.created += 1
+            return cls(x0=x0, t0=t0, row=row, direction=direction, speed=speed, size=size,
+                       color=color, clock=self.clock)
+        self.reused += 1
+        obj = free.pop()
+        obj.x0, obj.t0, obj.row, obj.direction = x0, t0, row, direction
+        obj.speed, obj.size, obj.color = speed, size, color
+        obj.vx = direction * speed
+        obj.clock = self.clock
+        obj.sprite_id = -1
+        return obj
+
+    def release(self, obj: MovingRect):
+        self.free.setdefault(type(obj), []).append(obj)
@@ -16,3 +16,10 @@ class GameState(Enum):
     PAUSED    = auto()
     GAME_OVER = auto()
     WIN       = auto()
+
+class Action(Enum):
+    NOOP  = 0
+    UP    = 1
+    DOWN  = 2
+    LEFT  = 3
+    RIGHT = 4
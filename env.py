@@ -0,0 +1,95 @@
+from typing import Optional
+
+from enums import GameState, Action
+from settings import TARGET_FPS
+from entities import WoodLog
+from world import World
+from board import Board
+from observation import GridEncoder
+
+# фиксированный шаг симуляции по умолчанию
+SIM_DT = 1.0 / TARGET_FPS
+
+# награды
+REWARD_PROGRESS = 1.0 # за каждую новую строку
+REWARD_DEATH = -10.0
+REWARD_WIN = 50.0
+
+# коды типов объектов в наблюдении
+KIND_CAR = 0
+KIND_LOG = 1
+KIND_CROC = 2
+
+
+# ============================================================
+# Безоконное окружение с фиксированным шагом: reset() / step()
+# ============================================================
+# obs="objects" - список объектов (_observe), obs="grid" - тензор
+# observation.GridEncoder (sub_cells колонок на клетку)
+class FroggerEnv:
+    def __init__(self, dt: float = SIM_DT, max_steps: Optional[int] = None,
+                 board: Optional[Board] = None, obs: str = "objects", sub_cells: int = 1):
+        if obs not in ("objects", "grid"):
+            raise ValueError(f"unknown observation type: {obs}")
+        self.dt = dt
+        self.board = board
+        self.max_steps = max_steps
+        self.obs = obs
+        self.sub_cells = sub_cells
+        self.world: Optional[World] = None
+        self.encoder: Optional[GridEncoder] = None
+        self.steps = 0
+
+    def reset(self, seed: Optional[int] = None):
+        self.world = World(seed, self.board)
+        self.world.state = GameState.PLAYING
+        if self.obs == "grid":
+            self.encoder = GridEncoder(self.world, self.sub_cells)
+        self.steps = 0
+        return self._observe()
+
+    def step(self, action):
+        w = self.world
+        lives, max_pos = w.lives, w.max_pos
+        w.last_death = None
+
+        w.apply_action(Action(action))
+        w.update(self.dt)
+        self.steps += 1
+
+        reward = 0.0
+        if w.max_pos > max_pos:
+            reward += (w.max_pos - max_pos) * REWARD_PROGRESS
+        if w.lives < lives:
+            reward += REWARD_DEATH
+        if w.state == GameState.WIN:
+            reward += REWARD_WIN
+
+        done = w.state in (GameState.GAME_OVER, GameState.WIN)
+        truncated = self.max_steps is not None and self.steps >= self.max_steps
+        info = {
+            "lives": w.lives,
+            "score": w.score,
+            "time": w.time,
+            "steps": self.steps,
+            "death_cause": w.last_death,
+            "won": w.state == GameState.WIN,
+            "truncated": truncated and not done,
+        }
+        return self._observe(), reward, done or truncated, info
+
+    def _observe(self):
+        if self.encoder is not None:
+            # копия: буфер кодировщика перезаписывается на следующем шаге
+            return self.encoder.encode().copy()
+        w = self.world
+        movers = []
+        for it in w.cars.all_items:
+            movers.append((it.row, it.x, it.size, KIND_CAR))
+        for it in w.water.all_items:
+            kind = KIND_LOG if isinstance(it, WoodLog) else KIND_CROC
+            movers.append((it.row, it.x, it.size, kind))
+        return {
+            "frog": (w.frog.pixel_x, w.frog.row, w.frog.facing.value),
+            "movers": movers,
+        }
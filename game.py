@@ -1,189 +1,222 @@
 import cv2
+import queue
+import threading
 import time
+from typing import Optional
 
 from enums import GameState
 from settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE,
-    FRAME_DELAY_MS,
-    FINISH_ROWS,
-    ROAD_LANES, WATER_LANES,
-    START_LIVES,
+    CELL_SIZE, WINDOW_TITLE,
 )
-from entities import Frog, WoodLog, Crocodile
-from spawners import CarSpawner, WaterLaneSpawner
+from world import World
+from board import Board
+from renderer import Renderer
+from autoplayer import Autoplayer
+from replay import ReplayRecorder
+from video import VideoRecorder
+from spectator import SpectatorServer
+from presenter import TripleBuffer, FrameTimer
+from timing import FixedStepClock, FramePacer
+from profiler import Profiler
 from rendering import (
-    create_empty_frame,
-    draw_background,
+    draw_debug_lines,
     draw_grid,
-    draw_ui,
-    draw_frog,
-    draw_movers,
 )
-from utils import rects_intersect
 
 
-class Game:
-    def __init__(self):
-        cv2.namedWindow(WINDOW_TITLE, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT)
+# период обновления текста оверлея профайлера, с
+PROFILER_OVERLAY_PERIOD = 0.25
 
-        # сущности
-        self.frog = Frog(col=8, row=10)
-        self.cars = CarSpawner(ROAD_LANES)
-        self.water = WaterLaneSpawner(WATER_LANES) # брёвна + крокодилы
 
-        # состояние
-        self.state = GameState.START
-        self.lives = START_LIVES
-        self.running = True
-        self.paused = False
+class Game(World):
+    def __init__(self, seed: Optional[int] = None, profiler: Optional[Profiler] = None,
+                 board: Optional[Board] = None, render_cell: int = CELL_SIZE,
+                 autoplay: bool = False):
+        super().__init__(seed, board)
+        # окно показывает только часть поля вокруг лягушки;
+        # render_cell < CELL_SIZE - кадр собирается уменьшенным и увеличивается
+        self.renderer = Renderer(self, render_cell)
+        self.viewport = self.renderer.viewport
+        cv2.namedWindow(WINDOW_TITLE, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW_TITLE, self.viewport.width, self.viewport.height)
 
-        self.last_time = time.time()
-        self.max_pos = 0
+        # профайлер включается явно; оверлей переключается клавишей 'o'
+        if profiler is not None:
+            self.profiler = profiler
+        self.show_profiler = False
+        self._overlay_rows = []
+        self._overlay_time = 0.0
 
-    @property
-    def score(self):
-        return self.max_pos * 10
+        # автоигрок действует перед каждым тиком, клавиатура остаётся для меню
+        self.autoplayer = Autoplayer(self) if autoplay else None
 
-    # ==============================
-    # Ввод с клавиатуры
-    # ==============================
     def handle_input(self, key):
-        if key in (27, ord('q')):
-            self.running = False
-            return
-        if key == 13 and self.state == GameState.START:
-            self.state = GameState.PLAYING
-            return
-        if key != 255 and self.state in (GameState.GAME_OVER, GameState.WIN):
-            self.state = GameState.START
-            self.lives = START_LIVES
-            return
-        if key == ord('p'):
-            self.paused = not self.paused
-            return
-        if self.paused or self.state != GameState.PLAYING:
+        if key == ord('o') and self.profiler.enabled:
+            self.show_profiler = not self.show_profiler
             return
+        super().handle_input(key)
 
-        if key in (ord('w'), 82):
-            self.frog.step(0, -1)
-        elif key in (ord('a'), 81):
-            self.frog.step(-1, 0)
-        elif key in (ord('s'), 84):
-            self.frog.step(0, +1)
-        elif key in (ord('d'), 83):
-            self.frog.step(+1, 0)
-
-    # ==============================
-    # Коллизии & правила
-    # ==============================
-    def _attach_or_detach_on_water(self):
-        # наступили на бревно -> привязываемся к нему
-        if self.frog.attached_log is None and self.frog.on_water():
-            for it in self.water.all_items:
-                if isinstance(it, WoodLog) and rects_intersect(self.frog.hitbox, it.hitbox):
-                    self.frog.attach_to(it)
-                    break
-        # если уже привязаны к какому-то бревну, то проверяем до сих пор ли мы на нём стоим
-        elif self.frog.attached_log is not None:
-            cur = self.frog.attached_log
-            if rects_intersect(self.frog.hitbox, cur.hitbox):
-                return
-            # если не стоим, то пытаемся привязаться к другому бревну
-            for it in self.water.all_items:
-                if isinstance(it, WoodLog) and rects_intersect(self.frog.hitbox, it.hitbox):
-                    self.frog.attach_to(it)
-                    return
-            self.frog.detach()
-
-    def _death(self):
-        self.lives -= 1
+    def on_death(self, cause):
         print("DEAD")
-        if self.lives <= 0:
-            self.state = GameState.GAME_OVER
-            self.max_pos = 0
-        self.frog = Frog(col=8, row=10)
-
-    def _check_death_conditions(self):
-        # врезаемся в машину -> смерть
-        for car in self.cars.all_items:
-            if rects_intersect(self.frog.hitbox, car.hitbox):
-                self._death(); return
-
-        # наступаем на крокодила -> смерть
-        for it in self.water.all_items:
-            if isinstance(it, Crocodile) and rects_intersect(self.frog.hitbox, it.hitbox):
-                self._death(); return
-
-        if self.frog.on_water():
-            # падаем в воду -> смерть
-            if self.frog.attached_log is None:
-                self._death(); return
-            # уезжаем на бревне за край экрана -> смерть
-            x1, _, x2, _ = self.frog.hitbox
-            if x1 < 0 or x2 > WINDOW_WIDTH:
-                self._death(); return
-
-    def _check_win(self):
-        if self.frog.row <= FINISH_ROWS[1]:
-            self.state = GameState.WIN
-            print("YOU WIN!")
-            self.lives += 1; self._death(); self.max_pos = 0; return
-        
-    def _score_update(self):
-        if self.frog.row <= (10 - self.max_pos):
-            self.max_pos = 10 - self.frog.row
+
+    def on_win(self):
+        print("YOU WIN!")
 
     # ==============================
-    # Обновление & рендеринг
+    # Рендеринг
     # ==============================
-    def update(self, now, dt):
-        if self.paused or self.state not in (GameState.START, GameState.PLAYING):
-            return
-
-        self.cars.update(now, dt)
-        self.water.update(now, dt)
-        self.frog.update(dt)
-
-        self._attach_or_detach_on_water()
-        self._check_death_conditions()
-        self._check_win()
-        self._score_update()
+    def state_text(self) -> str:
+        if self.paused == True:
+            return "PAUSED"
+        elif self.state == GameState.START:
+            return "Press ENTER to start play"
+        elif self.state == GameState.GAME_OVER:
+            return "GAME OVER - press ANY KEY to restart"
+        elif self.state == GameState.WIN:
+            return "YOU WIN! - press ANY KEY to restart"
+        return ""
 
-    def draw(self):
-        frame = create_empty_frame()
-        draw_background(frame)
+    def compose(self, out=None, lag: float = 0.0):
+        if self.paused or self.state not in (GameState.START, GameState.PLAYING):
+            lag = 0.0 # мир стоит, интерполировать нечего
+        show_frog = self.state not in (GameState.START, GameState.GAME_OVER, GameState.WIN)
+        # при уменьшенном рендеринге out - кадр окна, маленький кадр свой
+        renderer = self.renderer
+        frame = renderer.render(self.state_text(), lag, show_frog,
+                                out if renderer.cell == CELL_SIZE else None)
+        frame = renderer.present(frame, out)
         # draw_grid(frame)
-        # крокодилы и брёвна -> лягушка -> машины
-        draw_movers(frame, self.water.all_items)
 
-        if self.state not in (GameState.START, GameState.GAME_OVER, GameState.WIN):
-            draw_frog(frame, self.frog)
+        if self.show_profiler:
+            self._draw_profiler_overlay(frame)
+        return frame
 
-        draw_movers(frame, self.cars.all_items)
+    def _draw_profiler_overlay(self, frame):
+        now = time.perf_counter()
+        if now - self._overlay_time > PROFILER_OVERLAY_PERIOD:
+            self._overlay_rows = self.profiler.overlay_rows()
+            self._overlay_time = now
+        draw_debug_lines(frame, self._overlay_rows)
 
-        state_text = ""
-        if self.paused == True:
-            state_text = "PAUSED"
-        elif self.state == GameState.START:
-            state_text = "Press ENTER to start play"
-        elif self.state == GameState.GAME_OVER:
-            state_text = "GAME OVER - press ANY KEY to restart"
-        elif self.state == GameState.WIN:
-            state_text = "YOU WIN! - press ANY KEY to restart"
-        draw_ui(frame, self.lives, self.score, state_text)
+    def draw(self):
+        frame = self.compose()
         cv2.imshow(WINDOW_TITLE, frame)
-
-    def run(self):
+        return frame
+
+    def _tick(self, clock: FixedStepClock, keys: list,
+              recorder: Optional[ReplayRecorder],
+              stream: Optional[SpectatorServer] = None) -> bool:
+        # тики симуляции за кадр; клавиши применяются после последнего тика
+        # (так же, как их воспроизводит replay.py). Если тиков не было,
+        # клавиши ждут следующего кадра -> возвращаем False
+        ticks = clock.advance()
+        for i in range(ticks):
+            if self.autoplayer is not None:
+                self.apply_action(self.autoplayer.act())
+            self.update(clock.dt)
+            if self.profiler.enabled:
+                # счётчики полос - на каждом тике, а не только при открытом оверлее
+                self.profiler.count_lanes(self.cars, self.water)
+            if i < ticks - 1:
+                if recorder is not None:
+                    recorder.record(clock.dt)
+                if stream is not None:
+                    stream.tick(clock.dt)
+        if not ticks:
+            return False
+        for key in keys:
+            self.handle_input(key)
+        if recorder is not None:
+            recorder.record(clock.dt, keys)
+        if stream is not None:
+            stream.tick(clock.dt, keys)
+        return True
+
+    def run(self, recorder: Optional[ReplayRecorder] = None,
+            video: Optional[VideoRecorder] = None,
+            stream: Optional[SpectatorServer] = None):
+        clock, pacer = FixedStepClock(), FramePacer()
+        keys = []
         while self.running:
-            now = time.time()
-            dt = now - self.last_time
-            self.last_time = now
+            if self._tick(clock, keys, recorder, stream):
+                keys = []
 
-            self.update(now, dt)
-            self.draw()
+            frame = self.compose(lag=(1.0 - clock.alpha) * clock.dt)
+            with self.profiler.section("present.imshow"):
+                cv2.imshow(WINDOW_TITLE, frame)
+            if video is not None:
+                video.submit(frame)
 
-            key = cv2.waitKey(FRAME_DELAY_MS) & 0xFF
+            with self.profiler.section("present.waitKey"):
+                key = cv2.waitKey(1) & 0xFF
             if key != 255:
-                self.handle_input(key)
+                keys.append(key)
+            pacer.wait()
+        cv2.destroyAllWindows()
+        print(f"timing: {clock.summary()}")
+        self._print_autoplay_stats()
+
+    # ==========================================================
+    # Симуляция и отрисовка в отдельном потоке, окно - в главном
+    # ==========================================================
+    def _simulate(self, buffers: TripleBuffer, keys: queue.Queue, timer: FrameTimer,
+                  recorder: Optional[ReplayRecorder], video: Optional[VideoRecorder],
+                  stream: Optional[SpectatorServer]):
+        clock, pacer = FixedStepClock(), FramePacer()
+        pressed = []
+        while self.running:
+            while True:
+                try:
+                    pressed.append(keys.get_nowait())
+                except queue.Empty:
+                    break
+            if self._tick(clock, pressed, recorder, stream):
+                pressed = []
+
+            frame = self.compose(buffers.back, lag=(1.0 - clock.alpha) * clock.dt)
+            if video is not None:
+                video.submit(frame)
+            buffers.publish()
+            timer.tick()
+            pacer.wait()
+        print(f"timing: {clock.summary()}")
+
+    def run_threaded(self, recorder: Optional[ReplayRecorder] = None,
+                     video: Optional[VideoRecorder] = None,
+                     display_delay_ms: float = 0.0,
+                     stream: Optional[SpectatorServer] = None):
+        # display_delay_ms - искусственно медленный вывод (проверка джиттера)
+        buffers = TripleBuffer((self.viewport.height, self.viewport.width, 3))
+        keys = queue.Queue()
+        sim_timer, present_timer = FrameTimer(), FrameTimer()
+        worker = threading.Thread(target=self._simulate, name="simulation",
+                                  args=(buffers, keys, sim_timer, recorder, video, stream), daemon=True)
+        worker.start()
+
+        while self.running:
+            frame = buffers.latest()
+            if frame is not None:
+                with self.profiler.section("present.imshow"):
+                    cv2.imshow(WINDOW_TITLE, frame)
+                present_timer.tick()
+                if display_delay_ms > 0:
+                    time.sleep(display_delay_ms / 1000.0)
+            with self.profiler.section("present.waitKey"):
+                key = cv2.waitKey(1) & 0xFF
+            if key != 255:
+                keys.put(key)
+                if key in (27, ord('q')):
+                    break
+
+        self.running = False
+        worker.join()
         cv2.destroyAllWindows()
+        print(f"simulation frames: {sim_timer.summary()}")
+        print(f"presented frames:  {present_timer.summary()}")
+        self._print_autoplay_stats()
+
+    def _print_autoplay_stats(self):
+        if self.autoplayer is not None:
+            stats = self.autoplayer.stats()
+            print("autoplay: " + " ".join(
+                f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
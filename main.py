@@ -1,8 +1,89 @@
+import argparse
+
 from game import Game
+from board import Board, DEFAULT_BOARD, Viewport
+from settings import CELL_SIZE
 from rendering import load_assets
+from renderer import scaled_display_pays_off
+from replay import Replay, ReplayRecorder, play_headless, play_realtime
+from video import VideoRecorder
+from spectator import SpectatorServer
+from profiler import Profiler
 
 if __name__ == "__main__":
-    print("Loading assets...")
-    load_assets()
-    print("Assets loaded. Starting game.")
-    Game().run()
+    parser = argparse.ArgumentParser(description="Frogger")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--record", metavar="PATH", help="записать сессию в файл реплея")
+    parser.add_argument("--replay", metavar="PATH", help="воспроизвести файл реплея")
+    parser.add_argument("--headless", action="store_true", help="реплей без окна на максимальной скорости")
+    parser.add_argument("--threaded", action="store_true",
+                        help="симуляция и отрисовка в отдельном потоке, окно - в главном")
+    parser.add_argument("--slow-display", type=float, default=0.0, metavar="MS",
+                        help="искусственная задержка вывода кадра (с --threaded)")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="включить профайлер (оверлей - клавиша O) и сохранить замеры в JSON при выходе")
+    parser.add_argument("--video", metavar="PATH", help="записать игру в видеофайл")
+    parser.add_argument("--video-block", action="store_true",
+                        help="ждать запись кадра вместо пропуска, если очередь заполнена")
+    parser.add_argument("--board", nargs=2, type=int, metavar=("COLS", "SECTIONS"),
+                        help="большое сгенерированное поле: ширина в клетках и число секций вода+дорога")
+    parser.add_argument("--no-sprite-cache", action="store_true",
+                        help="генерировать спрайты заново, не читая и не записывая кэш на диске")
+    parser.add_argument("--render-cell", type=int, default=None, metavar="PX",
+                        help="собирать кадр с меньшей клеткой (например, 10) и увеличивать его до размера окна; "
+                             "только если это быстрее полного рендеринга (клетка до 10 в окне от 1360 px)")
+    parser.add_argument("--autoplay", action="store_true",
+                        help="лягушкой управляет автоигрок (autoplayer.py); ENTER - старт")
+    parser.add_argument("--spectate", metavar="ADDR",
+                        help="транслировать состояние зрителям (spectator.py): unix:/path или host:port")
+    args = parser.parse_args()
+    if args.autoplay and (args.record or args.replay):
+        parser.error("--autoplay нельзя совмещать с записью и воспроизведением реплея")
+    if args.board and (args.record or args.replay):
+        parser.error("реплеи поддерживаются только для стандартного поля (без --board)")
+    if args.render_cell is not None and not 0 < args.render_cell <= CELL_SIZE:
+        parser.error(f"--render-cell: от 1 до {CELL_SIZE} px")
+
+    if args.replay:
+        replay = Replay.load(args.replay)
+        if args.headless:
+            world = play_headless(replay)
+            print(f"ticks: {len(replay.ticks)} time: {world.time:.3f} lives: {world.lives} score: {world.score}")
+        else:
+            load_assets(use_cache=not args.no_sprite_cache)
+            play_realtime(replay)
+    else:
+        print("Loading assets...")
+        load_assets(use_cache=not args.no_sprite_cache)
+        print("Assets loaded. Starting game.")
+        profiler = Profiler() if args.profile else None
+        board = Board.generate(*args.board, seed=args.seed) if args.board else None
+        render_cell = args.render_cell or CELL_SIZE
+        # увеличение уменьшенного кадра проходит по всему окну: в небольшом
+        # окне показ выходит медленнее полного рендеринга (renderer.py)
+        window_width = Viewport(board or DEFAULT_BOARD).width
+        if render_cell != CELL_SIZE and not scaled_display_pays_off(render_cell, window_width):
+            print(f"--render-cell {render_cell}: в окне {window_width} px показ уменьшенного кадра "
+                  f"не быстрее полного рендеринга, клетка {CELL_SIZE} px")
+            render_cell = CELL_SIZE
+        game = Game(args.seed, profiler, board, render_cell, args.autoplay)
+        recorder = ReplayRecorder(game.seed) if args.record else None
+        video = None
+        if args.video:
+            video = VideoRecorder(args.video, size=(game.viewport.width, game.viewport.height),
+                                  block=args.video_block)
+        stream = SpectatorServer(game, args.spectate) if args.spectate else None
+        if args.threaded:
+            game.run_threaded(recorder, video, args.slow_display, stream)
+        else:
+            game.run(recorder, video, stream)
+        if recorder is not None:
+            recorder.save(args.record)
+        if stream is not None:
+            stream.close()
+            print(f"spectators: {stream.stats()}")
+        if video is not None:
+            video.close()
+            print(f"video: {video.stats()}")
+        if profiler is not None:
+            profiler.dump(args.profile)
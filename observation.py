@@ -0,0 +1,144 @@
+import numpy as np
+
+from settings import CELL_SIZE
+from entities import Car, WoodLog, Crocodile
+from world import World
+
+# каналы наблюдения
+CH_CAR = 0
+CH_LOG = 1
+CH_CROC = 2
+CH_FROG = 3
+CH_LILYPAD = 4
+NUM_CHANNELS = 5
+
+_MOVER_CHANNELS = {Car: CH_CAR, WoodLog: CH_LOG, Crocodile: CH_CROC}
+
+
+# ======================================================================
+# Наблюдение-сетка без рендеринга: (каналы, строки, колонки) uint8
+# ======================================================================
+# Значение клетки - доля её ширины, занятая объектом канала (0..255).
+# sub_cells > 1 делит каждую клетку по горизонтали на sub_cells колонок.
+#
+# Растеризация отрезков: для каждого сегмента (полоса, канал) хранится
+# кусочно-линейная функция P(x) - суммарная длина объектов левее x.
+# Занятость колонки [e0, e1] = P(e1) - P(e0). Сегменты разнесены по одной
+# оси с шагом _span, поэтому все колонки всех полос считаются одним
+# np.interp и одним np.diff.
+#
+# Между тиками функции не пересчитываются: объекты полосы едут с одной
+# скоростью, и достаточно сдвинуть точки запроса на смещение первого
+# объекта полосы. Точки излома полосы переписываются только после спавна
+# или удаления (lane_state["version"]).
+class GridEncoder:
+    def __init__(self, world: World, sub_cells: int = 1):
+        self.world = world
+        self.sub_cells = sub_cells
+        board = world.board
+        self.rows, self.cols = board.rows, board.cols * sub_cells
+        self.col_width = CELL_SIZE / sub_cells
+        self.lanes = [lane for spawner in (world.cars, world.water) for lane in spawner.lanes]
+
+        self.obs = np.zeros((NUM_CHANNELS, self.rows, self.cols), dtype=np.uint8)
+        # кувшинки не двигаются - заполняются один раз
+        for col in board.lilypads:
+            self.obs[CH_LILYPAD, board.finish_rows[0], col * sub_cells:(col + 1) * sub_cells] = 255
+        self._frog_cells = None
+
+        # сегменты: машины - один на полосу, вода - брёвна и крокодилы
+        water = set(id(lane_state) for lane_state in world.water.lanes)
+        segments = []
+        for i, lane_state in enumerate(self.lanes):
+            channels = (CH_LOG, CH_CROC) if id(lane_state) in water else (CH_CAR,)
+            segments.extend((i, ch) for ch in channels)
+        self._lane_segments = [[s for s, (lane, _) in enumerate(segments) if lane == i]
+                               for i in range(len(self.lanes))]
+        self._seg_channel = [ch for _, ch in segments]
+        self._seg_lane = np.array([i for i, _ in segments], dtype=np.intp)
+        self._seg_index = (np.array(self._seg_channel, dtype=np.intp),
+                           np.array([self.lanes[i]["row"] for i, _ in segments], dtype=np.intp))
+
+        # объект не уже клетки и не пересекается с соседями -> в полосе не
+        # больше (ширина поля + запас за краями) / CELL_SIZE объектов
+        self._capacity = 2 * ((board.width + 8 * CELL_SIZE) // CELL_SIZE + 2) + 1
+        self._span = 8.0 * (board.width + 8 * CELL_SIZE)
+        self._origins = np.arange(len(segments)) * self._span
+        self._xp = np.zeros((len(segments), self._capacity))
+        self._fp = np.zeros((len(segments), self._capacity))
+        edges = np.arange(self.cols + 1) * self.col_width
+        self._queries = self._origins[:, np.newaxis] + edges # точки запроса без сдвига
+        self._scale = 255.0 / self.col_width
+
+        self._versions = [None] * len(self.lanes)
+        self._x0 = [0.0] * len(self.lanes) # x первого объекта полосы при сборке
+        self._shift = np.zeros(len(self.lanes))
+
+    # ---- точки излома P(x) ----
+    def _fill_segment(self, s: int, items):
+        origin, half = self._origins[s], self._span / 2
+        xp, fp = self._xp[s], self._fp[s]
+        channel = self._seg_channel[s]
+        xp[0] = origin - half
+        fp[0] = 0.0
+        n, covered = 1, 0.0
+        for it in items:
+            if _MOVER_CHANNELS[type(it)] != channel:
+                continue
+            x = origin + it.x
+            xp[n], fp[n] = x, covered
+            covered += it.width
+            xp[n + 1], fp[n + 1] = x + it.width, covered
+            n += 2
+        # остаток - горизонтальный участок до конца сегмента
+        xp[n:] = origin + half - np.arange(self._capacity - n, 0, -1)
+        fp[n:] = covered
+
+    def _sync(self):
+        # изменившиеся полосы пересобираются, для остальных - только сдвиг
+        shift = self._shift
+        for i, lane_state in enumerate(self.lanes):
+            items = lane_state["items"]
+            if lane_state["version"] != self._versions[i]:
+                if 2 * len(items) + 1 > self._capacity:
+                    raise ValueError(f"lane {lane_state['row']} has more items than GridEncoder expects")
+                for s in self._lane_segments[i]:
+                    self._fill_segment(s, items)
+                self._versions[i] = lane_state["version"]
+                self._x0[i] = items[0].x if items else 0.0
+                shift[i] = 0.0
+            elif items:
+                shift[i] = items[0].x - self._x0[i]
+
+    # ---- растеризация ----
+    def _rasterize_movers(self):
+        queries = self._queries - self._shift[self._seg_lane][:, np.newaxis]
+        covered = np.interp(queries, self._xp.ravel(), self._fp.ravel())
+        cells = np.diff(covered, axis=1)
+        cells *= self._scale
+        cells += 0.5
+        # защита от переполнения uint8 из-за округления
+        np.minimum(cells, 255.0, out=cells)
+        self.obs[self._seg_index] = cells
+
+    def _rasterize_frog(self):
+        # лягушка - один отрезок, стираем прошлые клетки и пишем новые
+        frog = self.world.frog
+        if self._frog_cells is not None:
+            row, c0, c1 = self._frog_cells
+            self.obs[CH_FROG, row, c0:c1] = 0
+        a = min(max(frog.pixel_x / self.col_width, 0), self.cols)
+        b = min(max((frog.pixel_x + CELL_SIZE) / self.col_width, 0), self.cols)
+        c0, c1 = int(a), min(-int(-b // 1), self.cols)
+        line = self.obs[CH_FROG, frog.row]
+        for c in range(c0, c1):
+            cover = min(b, c + 1) - max(a, c)
+            line[c] = int(cover * 255 + 0.5)
+        self._frog_cells = (frog.row, c0, c1)
+
+    def encode(self) -> np.ndarray:
+        # возвращается внутренний буфер; копировать, если нужно хранить
+        self._sync()
+        self._rasterize_movers()
+        self._rasterize_frog()
+        return self.obs
@@ -0,0 +1,64 @@
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+
+# ==================================================================
+# Тройной буфер кадров: поток симуляции пишет в задний буфер и
+# публикует его, поток окна забирает самый свежий готовый кадр.
+# Ни одна сторона не ждёт другую дольше обмена индексами.
+# ==================================================================
+class TripleBuffer:
+    def __init__(self, shape, dtype=np.uint8):
+        self.buffers = [np.zeros(shape, dtype=dtype) for _ in range(3)]
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self._lock = threading.Lock()
+
+    @property
+    def back(self) -> np.ndarray:
+        # буфер, в который сейчас рисует поток симуляции
+        return self.buffers[self._back]
+
+    def publish(self):
+        with self._lock:
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+
+    def latest(self) -> Optional[np.ndarray]:
+        # новый кадр с прошлого вызова или None
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+        return self.buffers[self._front]
+
+
+# ==============================
+# Статистика интервалов кадров
+# ==============================
+class FrameTimer:
+    def __init__(self):
+        self.intervals: List[float] = []
+        self._last = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.intervals.append(now - self._last)
+        self._last = now
+
+    def summary(self) -> dict:
+        if not self.intervals:
+            return {}
+        ms = np.array(self.intervals) * 1e3
+        return {
+            "frames": len(ms),
+            "mean_ms": round(float(ms.mean()), 3),
+            "jitter_ms": round(float(ms.std()), 3),
+            "p99_ms": round(float(np.percentile(ms, 99)), 3),
+            "max_ms": round(float(ms.max()), 3),
+        }
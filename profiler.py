@@ -0,0 +1,106 @@
+import json
+import time
+from collections import deque
+from typing import Dict
+
+
+# =======================================================================
+# Профайлер фаз кадра: скользящее окно замеров по каждой секции и
+# число объектов по полосам. Выключенный профайлер - NULL_PROFILER,
+# его секции ничего не делают (одна пара вызовов __enter__/__exit__).
+# =======================================================================
+class _Section:
+    __slots__ = ("samples", "start")
+
+    def __init__(self, samples: deque):
+        self.samples = samples
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, window: int = 600):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+        self.lane_counts: Dict[int, deque] = {}
+
+    def section(self, name: str) -> _Section:
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        return _Section(samples)
+
+    def count_lanes(self, *spawners):
+        for spawner in spawners:
+            for lane_state in spawner.lanes:
+                counts = self.lane_counts.get(lane_state["row"])
+                if counts is None:
+                    counts = self.lane_counts[lane_state["row"]] = deque(maxlen=self.window)
+                counts.append(len(lane_state["items"]))
+
+    def report(self) -> dict:
+        sections = {}
+        for name, samples in self.samples.items():
+            if not samples:
+                continue
+            ms = sorted(s * 1e3 for s in samples)
+            n = len(ms)
+            sections[name] = {
+                "count": n,
+                "mean_ms": sum(ms) / n,
+                "p50_ms": ms[int(0.50 * (n - 1))],
+                "p95_ms": ms[int(0.95 * (n - 1))],
+                "p99_ms": ms[int(0.99 * (n - 1))],
+            }
+        lanes = {
+            str(row): {"last": counts[-1], "mean": sum(counts) / len(counts), "max": max(counts)}
+            for row, counts in sorted(self.lane_counts.items()) if counts
+        }
+        return {"sections": sections, "lanes": lanes}
+
+    def overlay_rows(self) -> list:
+        # таблица для оверлея: [имя, p50, p95, p99] в мс + строка с числом объектов по полосам
+        report = self.report()
+        rows = [["ms", "p50", "p95", "p99"]]
+        for name, s in sorted(report["sections"].items()):
+            rows.append([name, f"{s['p50_ms']:.2f}", f"{s['p95_ms']:.2f}", f"{s['p99_ms']:.2f}"])
+        lanes = " ".join(f"{row}:{c['last']}" for row, c in report["lanes"].items())
+        rows.append([f"lanes {lanes}"])
+        return rows
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler:
+    enabled = False
+    _section = _NullSection()
+
+    def section(self, name: str) -> _NullSection:
+        return self._section
+
+    def count_lanes(self, *spawners):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
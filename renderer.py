@@ -0,0 +1,76 @@
+from typing import Optional
+
+from settings import CELL_SIZE
+from board import Viewport
+from collision import CollisionIndex
+from world import World
+from rendering import Compositor, draw_frog, draw_movers, load_scaled_assets
+
+
+# ==================================================================
+# Отрисовка мира без окна: камера, кэш фона, только видимые строки
+# ==================================================================
+# Используется Game, бенчмарками и агентами, которым нужны пиксели.
+# cell < CELL_SIZE - уменьшенный рендеринг: render() возвращает маленький
+# кадр (например, для агента), present() увеличивает его до размера окна.
+#
+# Уменьшенная клетка окупается только для агентов, которым нужны пиксели
+# (render() без present()), или в большом окне: present() проходит по
+# каждому пикселю окна. По benchmarks/render_scale.py в окне игры 680x480
+# показ с клеткой 20 медленнее полного рендеринга (0.6-0.7x), с клеткой
+# 8-10 - на уровне (0.8-1.1x); выигрыш 1.2-1.5x - с клеткой до 10 в окне
+# от 1360x960.
+SCALED_DISPLAY_MAX_CELL = 10
+SCALED_DISPLAY_MIN_WIDTH = 1360
+
+
+def scaled_display_pays_off(cell: int, window_width: int) -> bool:
+    # быстрее ли показ в окне с клеткой cell, чем полный рендеринг
+    return cell <= SCALED_DISPLAY_MAX_CELL and window_width >= SCALED_DISPLAY_MIN_WIDTH
+
+
+class Renderer:
+    def __init__(self, world: World, cell: int = CELL_SIZE, viewport: Optional[Viewport] = None):
+        self.world = world
+        self.cell = cell
+        self.viewport = viewport if viewport is not None else Viewport(world.board)
+        if cell != CELL_SIZE:
+            load_scaled_assets(cell)
+        self.compositor = Compositor(self.viewport, cell)
+        # отдельные индексы, чтобы рисовать воду под лягушкой, а машины над ней
+        self.water_view = CollisionIndex(world.water)
+        self.cars_view = CollisionIndex(world.cars)
+
+    @property
+    def display_size(self):
+        return self.viewport.width, self.viewport.height
+
+    def render(self, state_text: str = "", lag: float = 0.0, show_frog: bool = True, out=None):
+        world, vp, cell = self.world, self.viewport, self.cell
+        prof = world.profiler
+        vp.follow(world.frog.pixel_x // CELL_SIZE, world.frog.row)
+        # фон и HUD берутся из кэша, рисуются только движущиеся объекты;
+        # HUD накладывается последним, поверх них
+        with prof.section("draw.base"):
+            frame = self.compositor.begin_frame(world.lives, world.score, state_text, out)
+
+        # только объекты видимых строк; запас в клетку по x - на интерполяцию
+        ox, oy = vp.x, vp.y
+        rows = vp.visible_rows
+        x1, x2 = ox - CELL_SIZE, ox + vp.width + CELL_SIZE
+        # крокодилы и брёвна -> лягушка -> машины
+        with prof.section("draw.water"):
+            draw_movers(frame, self.water_view.query_rows(rows, x1, x2), lag, ox, oy, cell)
+
+        if show_frog:
+            with prof.section("draw.frog"):
+                draw_frog(frame, world.frog, lag, ox, oy, cell)
+
+        with prof.section("draw.cars"):
+            draw_movers(frame, self.cars_view.query_rows(rows, x1, x2), lag, ox, oy, cell)
+        with prof.section("draw.hud"):
+            return self.compositor.end_frame(frame)
+
+    def present(self, frame, out=None):
+        with self.world.profiler.section("draw.upscale"):
+            return self.compositor.present(frame, out)
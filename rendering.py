@@ -11,56 +11,73 @@ from settings import (
     WATER_COLOR,
     ROAD_COLOR,
     START_COLOR,
-    FINISH_ROWS, WATER_ROWS, ROAD_ROWS, START_ROWS,
-    CAR_COLORS, CAR_SIZES,
-    LOG_COLORS, LOG_SIZES,
-    CROC_COLORS, CROC_SIZES,
-    LILYPAD_LOCATIONS,
-    GRASS_LOCATIONS,
+    LOG_COLORS,
+    CROC_COLORS,
 )
 from enums import Facing, Direction
-from entities import Frog, MovingRect, Car, WoodLog, Crocodile
+from board import (
+    Board, Viewport, DEFAULT_BOARD,
+    ROW_NONE, ROW_FINISH, ROW_WATER, ROW_ROAD, ROW_SAFE,
+)
+from entities import Frog, MovingRect
+from sprite_ids import SPRITE_KEYS, SPRITE_SPECS
+from atlas import Sprite, SpriteAtlas
+import sprite_cache
+
+# версия генераторов спрайтов: поднять, если меняется рисование,
+# которое не видно по байткоду генераторов (например, в cv2)
+SPRITE_VERSION = 1
+
+# Все спрайты в одном буфере (atlas.py)
+ATLAS = SpriteAtlas()
+# Cловарь для хранения сгенерированных спрайтов (срезы атласа)
+ASSETS = ATLAS.sprites
+# Те же спрайты по числовому id (sprite_ids.py), None если ещё не нарисован
+SPRITES = []
+
+def _clip(frame, x, y, w, h):
+    # пересечение спрайта (x, y, w, h) с кадром -> (срез кадра, срез спрайта) или None
+    fh, fw = frame.shape[:2]
+    sx, sy = max(0, -x), max(0, -y)
+    fx1, fy1 = x + sx, y + sy
+    fx2, fy2 = min(x + w, fw), min(y + h, fh)
+    if fx2 <= fx1 or fy2 <= fy1:
+        return None
+    return ((slice(fy1, fy2), slice(fx1, fx2)),
+            (slice(sy, sy + fy2 - fy1), slice(sx, sx + fx2 - fx1)))
 
-# Cловарь для хранения сгенерированных спрайтов
-ASSETS = {}
 
 # ===============================================
 # Функция для рисования спрайтов с прозрачностью
 # ================================================
-def overlay_sprite(background_frame, sprite_bgra, x, y):
+def overlay_sprite(background_frame, sprite, x, y):
     x, y = int(x), int(y)
-    h, w = sprite_bgra.shape[:2]
-
-    sprite_x_start, sprite_y_start = 0, 0
-    frame_x_start, frame_y_start = x, y
-
-    if frame_x_start < 0:
-        sprite_x_start = -frame_x_start
-        frame_x_start = 0
-    if frame_y_start < 0:
-        sprite_y_start = -frame_y_start
-        frame_y_start = 0
-    
-    sprite_w = w - sprite_x_start
-    sprite_h = h - sprite_y_start
-    
-    frame_x_end = frame_x_start + sprite_w
-    frame_y_end = frame_y_start + sprite_h
-    
-    if frame_x_end >= WINDOW_WIDTH:
-        sprite_w = max(0, sprite_w - (frame_x_end - WINDOW_WIDTH))
-        frame_x_end = WINDOW_WIDTH
-    if frame_y_end >= WINDOW_HEIGHT:
-        sprite_h = max(0, sprite_h - (frame_y_end - WINDOW_HEIGHT))
-        frame_y_end = WINDOW_HEIGHT
-        
+    if isinstance(sprite, Sprite):
+        if sprite.box is None:
+            return
+        if not sprite.blended:
+            # альфа только 0 или 255: копируем пиксели без вычислений в float
+            y1, y2, x1, x2 = sprite.box
+            cut = _clip(background_frame, x + x1, y + y1, x2 - x1, y2 - y1)
+            if cut is None:
+                return
+            dst, src = cut
+            if sprite.opaque:
+                background_frame[dst] = sprite.bgr[src]
+            else:
+                np.copyto(background_frame[dst], sprite.bgr[src], where=sprite.mask[src])
+            return
+        sprite = sprite.bgra
+
+    h, w = sprite.shape[:2]
+    cut = _clip(background_frame, x, y, w, h)
     # Если спрайт полностью за экраном, выходим
-    if sprite_w <= 0 or sprite_h <= 0:
+    if cut is None:
         return
+    dst, src = cut
 
-    sprite_cut = sprite_bgra[sprite_y_start : sprite_y_start + sprite_h, sprite_x_start : sprite_x_start + sprite_w]
-    
-    roi = background_frame[frame_y_start : frame_y_end, frame_x_start : frame_x_end]
+    sprite_cut = sprite[src]
+    roi = background_frame[dst]
 
     sprite_bgr = sprite_cut[..., :3]
     alpha = sprite_cut[..., 3] / 255.0
@@ -68,7 +85,7 @@ def overlay_sprite(background_frame, sprite_bgra, x, y):
 
     blended_roi = (roi * (1.0 - alpha) + sprite_bgr * alpha).astype(np.uint8)
 
-    background_frame[frame_y_start : frame_y_end, frame_x_start : frame_x_end] = blended_roi
+    background_frame[dst] = blended_roi
 
 # =================================
 # Генераторы спрайтов
@@ -154,71 +171,149 @@ def _create_croc_sprite(size: int, direction: Direction) -> np.ndarray:
 
     return sprite
 
-def load_assets():
-    global ASSETS
-    ASSETS = {}
-    
-    # Лягушка
-    for facing in Facing:
-        ASSETS[f"frog_{facing.name.lower()}"] = _create_frog_sprite(facing)
-        
-    # Машины
-    for i, color in enumerate(CAR_COLORS):
-        for size_info in CAR_SIZES:
-            size = size_info["size"]
-            for direction in Direction:
-                key = f"car_{size}_{i}_{direction.name.lower()}"
-                ASSETS[key] = _create_car_sprite(size, color, direction)
-                
-    # Бревна
-    for size_info in LOG_SIZES:
-        size = size_info["size"]
-        key = f"log_{size}"
-        ASSETS[key] = _create_log_sprite(size)
-        
-    # Крокодилы
-    for size_info in CROC_SIZES:
-        size = size_info["size"]
-        for direction in Direction:
-            key = f"croc_{size}_{direction.name.lower()}"
-            ASSETS[key] = _create_croc_sprite(size, direction)
+def _create_sprite(spec: tuple) -> np.ndarray:
+    # spec - описание из sprite_ids.SPRITE_SPECS
+    kind = spec[0]
+    if kind == "frog":
+        return _create_frog_sprite(*spec[1:])
+    if kind == "car":
+        return _create_car_sprite(*spec[1:])
+    if kind == "log":
+        return _create_log_sprite(*spec[1:])
+    if kind == "croc":
+        return _create_croc_sprite(*spec[1:])
+    raise ValueError(f"unknown sprite kind: {kind}")
+
+_GENERATORS = (
+    _create_sprite, _create_frog_sprite, _create_car_sprite,
+    _create_log_sprite, _create_croc_sprite, Sprite.__init__,
+    SpriteAtlas.add, SpriteAtlas._views,
+)
+
+def load_assets(use_cache: bool = True, cache_dir: str = None):
+    # атлас берётся из кэша на диске; ключ кэша - хеш настроек и кода
+    # генераторов, при несовпадении кэш создаётся заново
+    global ATLAS, ASSETS, SPRITES
+    atlas = None
+    if use_cache:
+        path = sprite_cache.cache_path(sprite_cache.cache_key(SPRITE_VERSION, _GENERATORS), cache_dir)
+        atlas = sprite_cache.load(path)
+
+    if atlas is None:
+        atlas = SpriteAtlas()
+        for key, spec in zip(list(SPRITE_KEYS), list(SPRITE_SPECS)):
+            atlas.add(key, _create_sprite(spec))
+        if use_cache:
+            try:
+                sprite_cache.save(path, atlas)
+            except OSError as e:
+                print(f"sprite cache not saved: {e}")
+
+    ATLAS = atlas
+    ASSETS = atlas.sprites
+    SPRITES = [ASSETS.get(key) for key in SPRITE_KEYS]
+
+def _lazy_sprite(sprite_id: int):
+    # спрайт, зарегистрированный после load_assets (новый цвет или размер),
+    # рисуется и добавляется в атлас при первой отрисовке
+    if len(SPRITES) < len(SPRITE_KEYS):
+        SPRITES.extend(ASSETS.get(key) for key in SPRITE_KEYS[len(SPRITES):])
+    sprite = SPRITES[sprite_id]
+    if sprite is None:
+        key = SPRITE_KEYS[sprite_id]
+        sprite = SPRITES[sprite_id] = ATLAS.add(key, _create_sprite(SPRITE_SPECS[sprite_id]))
+    return sprite
+
+# ==============================================================
+# Уменьшенные наборы спрайтов для рендеринга с меньшей клеткой
+# ==============================================================
+# cell -> (атлас, список спрайтов по id). Спрайты уменьшаются из полных
+# через INTER_NEAREST: альфа остаётся 0/255 и работает быстрый путь наложения
+SCALED = {}
+
+def _scale_sprite(sprite: Sprite, cell: int) -> np.ndarray:
+    h, w = sprite.shape[:2]
+    size = (max(1, w * cell // CELL_SIZE), max(1, h * cell // CELL_SIZE))
+    return cv2.resize(sprite.bgra, size, interpolation=cv2.INTER_NEAREST)
+
+def load_scaled_assets(cell: int) -> list:
+    # набор для клетки cell из полного атласа (load_assets должен быть вызван)
+    if cell == CELL_SIZE:
+        return SPRITES
+    atlas, sprites = SCALED.get(cell) or (SpriteAtlas(), [])
+    for sprite_id in range(len(sprites), len(SPRITES)):
+        full = SPRITES[sprite_id]
+        sprites.append(None if full is None else atlas.add(SPRITE_KEYS[sprite_id], _scale_sprite(full, cell)))
+    SCALED[cell] = (atlas, sprites)
+    return sprites
+
+def _scaled_sprite(sprite_id: int, cell: int):
+    full = _sprite(sprite_id)
+    if full is None:
+        return None
+    atlas, sprites = SCALED[cell]
+    if len(sprites) <= sprite_id:
+        sprites.extend([None] * (sprite_id + 1 - len(sprites)))
+    sprite = sprites[sprite_id] = atlas.add(SPRITE_KEYS[sprite_id], _scale_sprite(full, cell))
+    return sprite
 
 # =================================
 # Отрисовка
 # =================================
-def create_empty_frame():
-    return np.zeros((WINDOW_HEIGHT, WINDOW_WIDTH, 3), dtype=np.uint8)
-
-def draw_background(frame):
-    frame[:] = BG_COLOR
-
-    def row_y(row):
-        return row * CELL_SIZE
-
-    cv2.rectangle(frame, (0, row_y(FINISH_ROWS[0])), (WINDOW_WIDTH, row_y(FINISH_ROWS[1] + 1)), FINISH_COLOR, -1)
-    cv2.rectangle(frame, (0, row_y(WATER_ROWS[0])), (WINDOW_WIDTH, row_y(WATER_ROWS[1] + 1)), WATER_COLOR, -1)
-    cv2.rectangle(frame, (0, row_y(ROAD_ROWS[0])), (WINDOW_WIDTH, row_y(ROAD_ROWS[1] + 1)), ROAD_COLOR, -1)
-    cv2.rectangle(frame, (0, row_y(START_ROWS[0])), (WINDOW_WIDTH, row_y(START_ROWS[1] + 1)), START_COLOR, -1)
+def create_empty_frame(height: int = WINDOW_HEIGHT, width: int = WINDOW_WIDTH):
+    return np.zeros((height, width, 3), dtype=np.uint8)
+
+# цвет фона для каждого типа строки (board.py)
+ROW_COLORS = {
+    ROW_NONE: BG_COLOR,
+    ROW_FINISH: FINISH_COLOR,
+    ROW_WATER: WATER_COLOR,
+    ROW_ROAD: ROAD_COLOR,
+    ROW_SAFE: START_COLOR,
+}
+
+def draw_background(frame, board: Board = DEFAULT_BOARD, col0: int = 0, row0: int = 0):
+    # рисуется только часть поля, попавшая в кадр: строки с row0, колонки с col0
+    h, w, _ = frame.shape
+    rows = range(row0, min(board.rows, row0 + -(-h // CELL_SIZE)))
+    cols = (col0 - 1, col0 + w // CELL_SIZE + 1)
+    # заливки - cv2.rectangle: присваивание кортежа цвета срезу в numpy на
+    # 3-канальном кадре в десятки раз медленнее. Соседние строки одного
+    # типа заливаются одним прямоугольником
+    cv2.rectangle(frame, (0, 0), (w, h), BG_COLOR, -1)
+    start = rows.start
+    for row in rows:
+        kind = board.row_kinds[row]
+        if row + 1 < rows.stop and board.row_kinds[row + 1] == kind:
+            continue
+        if kind != ROW_NONE:
+            cv2.rectangle(frame, (0, (start - row0) * CELL_SIZE),
+                          (w, (row + 1 - row0) * CELL_SIZE - 1), ROW_COLORS[kind], -1)
+        start = row + 1
 
-    row = FINISH_ROWS[0]
-    y_center = row * CELL_SIZE + CELL_SIZE // 2
     radius = CELL_SIZE // 2 - 8
     color_dark = (0, 100, 0)
     color_light = (0, 150, 0)
-    
-    for col in LILYPAD_LOCATIONS:
-        x_center = col * CELL_SIZE + CELL_SIZE // 2
-        cv2.circle(frame, (x_center, y_center), radius, color_dark, -1)
-        cv2.circle(frame, (x_center, y_center), radius - 3, color_light, -1)
+    if board.finish_rows[0] in rows:
+        y_center = (board.finish_rows[0] - row0) * CELL_SIZE + CELL_SIZE // 2
+        for col in board.lilypads:
+            if not cols[0] <= col <= cols[1]:
+                continue
+            x_center = (col - col0) * CELL_SIZE + CELL_SIZE // 2
+            cv2.circle(frame, (x_center, y_center), radius, color_dark, -1)
+            cv2.circle(frame, (x_center, y_center), radius - 3, color_light, -1)
 
     color_grass = (50, 180, 50)
-    for col, row in GRASS_LOCATIONS:
-        x_base = col * CELL_SIZE + CELL_SIZE // 2
-        y_base = row * CELL_SIZE + CELL_SIZE - 5
-        
-        cv2.line(frame, (x_base - 5, y_base), (x_base - 3, y_base - 10), color_grass, 2)
-        cv2.line(frame, (x_base, y_base), (x_base, y_base - 12), color_grass, 2)
-        cv2.line(frame, (x_base + 5, y_base), (x_base + 4, y_base - 9), color_grass, 2)
+    for row in rows:
+        for col in board.grass_by_row.get(row, ()):
+            if not cols[0] <= col <= cols[1]:
+                continue
+            x_base = (col - col0) * CELL_SIZE + CELL_SIZE // 2
+            y_base = (row - row0) * CELL_SIZE + CELL_SIZE - 5
+
+            cv2.line(frame, (x_base - 5, y_base), (x_base - 3, y_base - 10), color_grass, 2)
+            cv2.line(frame, (x_base, y_base), (x_base, y_base - 12), color_grass, 2)
+            cv2.line(frame, (x_base + 5, y_base), (x_base + 4, y_base - 9), color_grass, 2)
 
 def draw_grid(frame):
     h, w, _ = frame.shape
@@ -228,44 +323,189 @@ def draw_grid(frame):
         cv2.line(frame, (0, y), (w, y), GRID_COLOR, 1)
 
 def draw_ui(frame, lives: int, score: int, state_text: str = ""):
-    cv2.putText(frame, f"Lives: {lives} Score: {score}", (10, WINDOW_HEIGHT - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+    cv2.putText(frame, f"Lives: {lives} Score: {score}", (10, frame.shape[0] - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
     if state_text:
         cv2.putText(frame, state_text, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
 
-def draw_rect_from_hitbox(frame, hb, color):
+def draw_debug_lines(frame, rows, x: int = 10, y: int = 50, col_width: int = 50, first_col: int = 130):
+    # отладочная таблица (оверлей профайлера): строки - списки ячеек
+    h = len(rows) * 14 + 6
+    roi = frame[y - 12:y - 12 + h, x - 4:x + first_col + col_width * 3 + 4]
+    roi //= 3 # затемняем подложку
+    for i, row in enumerate(rows):
+        for j, cell in enumerate(row):
+            cx = x if j == 0 else x + first_col + (j - 1) * col_width
+            cv2.putText(frame, cell, (cx, y + i * 14), cv2.FONT_HERSHEY_PLAIN, 0.9, (255, 255, 255), 1, cv2.LINE_AA)
+
+def draw_rect_from_hitbox(frame, hb, color, ox: int = 0, oy: int = 0, k: float = 1.0):
     x1, y1, x2, y2 = hb
-    cv2.rectangle(frame, (int(x1 + 4), int(y1 + 4)), (int(x2 - 4), int(y2 - 4)), color, -1)
+    x1, y1, x2, y2 = (x1 - ox) * k, (y1 - oy) * k, (x2 - ox) * k, (y2 - oy) * k
+    pad = 4 * k
+    cv2.rectangle(frame, (int(x1 + pad), int(y1 + pad)), (int(x2 - pad), int(y2 - pad)), color, -1)
+
+def _sprite(sprite_id: int):
+    if 0 <= sprite_id < len(SPRITES) and SPRITES[sprite_id] is not None:
+        return SPRITES[sprite_id]
+    if 0 <= sprite_id < len(SPRITE_KEYS):
+        return _lazy_sprite(sprite_id)
+    return None
+
+def _sprite_at(sprite_id: int, cell: int):
+    if cell == CELL_SIZE:
+        return _sprite(sprite_id)
+    sprites = SCALED[cell][1]
+    if 0 <= sprite_id < len(sprites) and sprites[sprite_id] is not None:
+        return sprites[sprite_id]
+    return _scaled_sprite(sprite_id, cell)
+
+# lag - на сколько секунд назад отмотать движущиеся объекты (интерполяция
+# между двумя тиками симуляции, см. timing.FixedStepClock);
+# ox, oy - пиксельное смещение камеры (board.Viewport) в координатах мира;
+# cell - размер клетки в кадре (меньше CELL_SIZE при уменьшенном рендеринге,
+# набор спрайтов должен быть загружен через load_scaled_assets)
+def draw_frog(frame, frog: Frog, lag: float = 0.0, ox: int = 0, oy: int = 0, cell: int = CELL_SIZE):
+    sprite = _sprite_at(frog.sprite_id, cell)
+    k = cell / CELL_SIZE
 
-def draw_frog(frame, frog: Frog):
-    sprite_key = f"frog_{frog.facing.name.lower()}"
-    
-    sprite = ASSETS.get(sprite_key)
-    
     if sprite is not None:
-        overlay_sprite(frame, sprite, frog.pixel_x, frog.pixel_y)
+        x = frog.pixel_x
+        log = frog.attached_log
+        if lag and log is not None:
+            x -= log.vx * lag
+        overlay_sprite(frame, sprite, (x - ox) * k, (frog.pixel_y - oy) * k)
     else:
-        draw_rect_from_hitbox(frame, frog.hitbox, (0, 255, 0))
+        draw_rect_from_hitbox(frame, frog.hitbox, (0, 255, 0), ox, oy, k)
 
-def draw_movers(frame, movers: list[MovingRect]):
+def draw_movers(frame, movers: list[MovingRect], lag: float = 0.0, ox: int = 0, oy: int = 0,
+                cell: int = CELL_SIZE):
+    sprites = SPRITES if cell == CELL_SIZE else SCALED[cell][1]
+    n = len(sprites)
+    k = cell / CELL_SIZE
     for m in movers:
-        sprite_key = ""
-        
-        if isinstance(m, Car):
-            try:
-                color_index = CAR_COLORS.index(m.color)
-                sprite_key = f"car_{m.size}_{color_index}_{m.direction.name.lower()}"
-            except ValueError:
-                pass
-                
-        elif isinstance(m, WoodLog):
-            sprite_key = f"log_{m.size}"
-            
-        elif isinstance(m, Crocodile):
-            sprite_key = f"croc_{m.size}_{m.direction.name.lower()}"
-        
-        sprite = ASSETS.get(sprite_key)
-        
+        sprite_id = m.sprite_id
+        sprite = sprites[sprite_id] if 0 <= sprite_id < n else None
+        if sprite is None and sprite_id >= 0:
+            sprite = _sprite_at(sprite_id, cell)
+            n = len(sprites)
+
         if sprite is not None:
-            overlay_sprite(frame, sprite, m.x, m.y)
+            x = m.x_at(m.clock.now - lag) if lag else m.x
+            overlay_sprite(frame, sprite, (x - ox) * k, (m.y - oy) * k)
+        else:
+            draw_rect_from_hitbox(frame, m.hitbox, m.color, ox, oy, k)
+
+# ==================================================
+# Компоновщик кадра: кэш статичного фона и HUD
+# ==================================================
+class Compositor:
+    def __init__(self, viewport: Viewport = None, cell: int = CELL_SIZE):
+        self.viewport = viewport if viewport is not None else Viewport(DEFAULT_BOARD)
+        vp = self.viewport
+        # кадр собирается с клеткой cell; при cell < CELL_SIZE он меньше окна
+        # и увеличивается один раз в present()
+        self.cell = cell
+        self.scaled = cell != CELL_SIZE
+        h, w = vp.rows * cell, vp.cols * cell
+        # фон видимой части поля перерисовывается только при сдвиге камеры
+        self.background = create_empty_frame(h, w)
+        self._view_key = None
+        # переиспользуемый буфер кадра
+        self.frame = create_empty_frame(h, w)
+        # HUD - отдельный слой поверх объектов, перерисовывается только при
+        # смене текста: (срез кадра, текст на чёрном, 255 - альфа) или None
+        self._hud = None
+        self._hud_key = None
+        if self.scaled:
+            # фон рисуется в полном размере и уменьшается; HUD в маленьком
+            # кадре не читается, поэтому он накладывается после увеличения
+            self._full_background = create_empty_frame(vp.height, vp.width)
+            self.display = create_empty_frame(vp.height, vp.width)
+            # при целом коэффициенте: cv2.resize только по горизонтали (в k раз
+            # меньше пикселей), по вертикали строки копируются целиком.
+            # Горизонтальный проход идёт в BGRA: 4-байтовые пиксели cv2
+            # увеличивает заметно быстрее 3-байтовых, даже с двумя cvtColor
+            self._k = CELL_SIZE // cell if CELL_SIZE % cell == 0 else 0
+            if self._k:
+                self._small4 = np.zeros((h, w, 4), dtype=np.uint8)
+                self._rows4 = np.zeros((h, vp.width, 4), dtype=np.uint8)
+                self._rows = create_empty_frame(h, vp.width)
+
+    def _update_background(self):
+        vp = self.viewport
+        key = (vp.col, vp.row)
+        if key == self._view_key:
+            return
+        if self.scaled:
+            draw_background(self._full_background, vp.board, vp.col, vp.row)
+            h, w = self.background.shape[:2]
+            cv2.resize(self._full_background, (w, h), dst=self.background, interpolation=cv2.INTER_AREA)
+        else:
+            draw_background(self.background, vp.board, vp.col, vp.row)
+        self._view_key = key
+
+    def _update_hud(self, lives: int, score: int, state_text: str):
+        key = (lives, score, state_text)
+        if key == self._hud_key:
+            return
+        # альфа - тот же текст в одном канале: сглаженные края полупрозрачны,
+        # а не тёмные, как при маске по пикселям слоя на чёрном
+        shape = self.display.shape if self.scaled else self.frame.shape
+        layer = np.zeros(shape, dtype=np.uint8)
+        alpha = np.zeros(shape[:2], dtype=np.uint8)
+        draw_ui(layer, lives, score, state_text)
+        draw_ui(alpha, lives, score, state_text)
+        ys, xs = np.nonzero(alpha)
+        self._hud = None
+        if len(ys):
+            roi = (slice(ys.min(), ys.max() + 1), slice(xs.min(), xs.max() + 1))
+            inv = (255 - alpha[roi]).astype(np.uint16)[..., np.newaxis]
+            self._hud = (roi, layer[roi].astype(np.uint16), inv)
+        self._hud_key = key
+
+    def _draw_hud(self, frame):
+        if self._hud is None:
+            return
+        # слой на чёрном уже умножен на альфу: кадр * (1 - альфа) + слой
+        roi, pixels, inv = self._hud
+        dst = frame[roi]
+        out = dst * inv
+        out += 127
+        out //= 255
+        out += pixels
+        np.minimum(out, 255, out=out)
+        dst[...] = out
+
+    def begin_frame(self, lives: int, score: int, state_text: str = "", out=None):
+        # out - внешний буфер кадра (например, задний буфер TripleBuffer)
+        self._update_background()
+        self._update_hud(lives, score, state_text)
+        frame = self.frame if out is None else out
+        np.copyto(frame, self.background)
+        return frame
+
+    def end_frame(self, frame):
+        # HUD поверх объектов; при уменьшенном кадре - в present()
+        if not self.scaled:
+            self._draw_hud(frame)
+        return frame
+
+    def present(self, frame, out=None):
+        # кадр в размере окна: увеличение INTER_NEAREST + HUD;
+        # без уменьшения кадр уже готов
+        if not self.scaled:
+            if out is not None and out is not frame:
+                np.copyto(out, frame)
+                return out
+            return frame
+        display = self.display if out is None else out
+        h, w = display.shape[:2]
+        if self._k:
+            rows = self._rows
+            cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA, dst=self._small4)
+            cv2.resize(self._small4, (w, rows.shape[0]), dst=self._rows4, interpolation=cv2.INTER_NEAREST)
+            cv2.cvtColor(self._rows4, cv2.COLOR_BGRA2BGR, dst=rows)
+            np.copyto(display.reshape(rows.shape[0], self._k, w, 3), rows[:, np.newaxis])
         else:
-            draw_rect_from_hitbox(frame, m.hitbox, m.color)
\ No newline at end of file
+            cv2.resize(frame, (w, h), dst=display, interpolation=cv2.INTER_NEAREST)
+        self._draw_hud(display)
+        return display
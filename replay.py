@@ -0,0 +1,113 @@
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import List, Sequence, Tuple
+
+# =====================================================================
+# Формат файла реплея (всё после заголовка сжато zlib):
+#   заголовок: b"FRGR", версия (u8), сид (u64)
+#   тики:      dt (f64), кол-во клавиш (u8), коды клавиш (u8 каждая)
+# Клавиши тика обрабатываются после update(dt) этого тика, как в Game.run.
+# =====================================================================
+MAGIC = b"FRGR"
+# версия меняется вместе с правилами симуляции: старый реплей на новых
+# правилах разошёлся бы с записью (2 - спавн в точный момент, заметание;
+# 3 - x объектов считается от момента спавна, а не накапливается по тикам)
+VERSION = 3
+_HEADER = struct.Struct("<4sBQ")
+_TICK = struct.Struct("<dB")
+
+
+@dataclass
+class Replay:
+    seed: int
+    ticks: List[Tuple[float, Tuple[int, ...]]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return sum(dt for dt, _ in self.ticks)
+
+    def to_bytes(self) -> bytes:
+        body = bytearray()
+        for dt, keys in self.ticks:
+            body += _TICK.pack(dt, len(keys))
+            body += bytes(keys)
+        return _HEADER.pack(MAGIC, VERSION, self.seed) + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        magic, version, seed = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a frogger replay file")
+        if version != VERSION:
+            raise ValueError(f"replay version {version} is not supported (expected {VERSION})")
+        body = zlib.decompress(data[_HEADER.size:])
+        replay = cls(seed)
+        pos = 0
+        while pos < len(body):
+            dt, n = _TICK.unpack_from(body, pos)
+            pos += _TICK.size
+            replay.ticks.append((dt, tuple(body[pos:pos + n])))
+            pos += n
+        return replay
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    def __init__(self, seed: int):
+        self.replay = Replay(seed)
+
+    def record(self, dt: float, keys: Sequence[int] = ()):
+        self.replay.ticks.append((dt, tuple(keys)))
+
+    def save(self, path: str):
+        self.replay.save(path)
+
+
+# ==============================
+# Воспроизведение
+# ==============================
+def _step(world, dt, keys):
+    world.update(dt)
+    for key in keys:
+        world.handle_input(key)
+
+
+def play_headless(replay: Replay, world=None):
+    # без окна и ожидания: настолько быстро, насколько позволяет CPU
+    from world import World
+    if world is None:
+        world = World(replay.seed)
+    for dt, keys in replay.ticks:
+        _step(world, dt, keys)
+        if not world.running:
+            break
+    return world
+
+
+def play_realtime(replay: Replay, speed: float = 1.0):
+    # с окном и отрисовкой, с исходными паузами между тиками
+    import cv2
+    from game import Game
+    game = Game(replay.seed)
+    for dt, keys in replay.ticks:
+        start = time.perf_counter()
+        _step(game, dt, keys)
+        game.draw()
+        cv2.waitKey(1)
+        if not game.running:
+            break
+        left = dt / speed - (time.perf_counter() - start)
+        if left > 0:
+            time.sleep(left)
+    cv2.destroyAllWindows()
+    return game
@@ -0,0 +1,143 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from enums import Action
+from env import FroggerEnv
+from autoplayer import Autoplayer
+
+
+# ==============================
+# Скриптовые политики
+# ==============================
+class RandomPolicy:
+    def __call__(self, obs, rng: random.Random) -> Action:
+        return rng.choice(list(Action))
+
+
+class HopUpPolicy:
+    # прыгает вверх раз в `every` тиков, в остальное время стоит
+    def __init__(self, every: int = 20):
+        self.every = every
+        self.tick = 0
+
+    def __call__(self, obs, rng: random.Random) -> Action:
+        self.tick += 1
+        return Action.UP if self.tick % self.every == 0 else Action.NOOP
+
+
+class PlannerPolicy:
+    # поиск пути по предсказанию полос (autoplayer.py); видит мир, а не obs
+    def __init__(self):
+        self.autoplayer = None
+
+    def bind(self, env):
+        # предсказание полос - с тем же шагом, что и у окружения; без
+        # бюджета времени, чтобы эпизод по seed воспроизводился
+        self.autoplayer = Autoplayer(env.world, dt=env.dt, budget=None)
+
+    def __call__(self, obs, rng: random.Random) -> Action:
+        return self.autoplayer.act()
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "up": HopUpPolicy,
+    "plan": PlannerPolicy,
+}
+
+
+# ==============================
+# Результат эпизода
+# ==============================
+@dataclass
+class EpisodeResult:
+    seed: int
+    score: int # лучший счёт за эпизод
+    lives_lost: int
+    death_causes: Tuple[str, ...]
+    steps: int
+    won: bool
+
+    @property
+    def last_death(self) -> Optional[str]:
+        return self.death_causes[-1] if self.death_causes else None
+
+
+def episode_seed(base_seed: int, episode: int) -> int:
+    # сид зависит только от номера эпизода, а не от того, какой процесс его играет
+    return (base_seed * 1_000_003 + episode) & 0xFFFFFFFF
+
+
+def run_episode(policy, seed: int, max_steps: int = 10_000) -> EpisodeResult:
+    env = FroggerEnv(max_steps=max_steps)
+    obs = env.reset(seed)
+    if hasattr(policy, "bind"):
+        policy.bind(env)
+    rng = random.Random(seed ^ 0x5EED)
+    best, causes, won = 0, [], False
+    info = {"steps": 0}
+    done = False
+    while not done:
+        obs, reward, done, info = env.step(policy(obs, rng))
+        best = max(best, info["score"])
+        if info["death_cause"] is not None:
+            causes.append(info["death_cause"])
+        won = won or info["won"]
+    return EpisodeResult(seed, best, len(causes), tuple(causes), info["steps"], won)
+
+
+def _run_shard(args) -> List[EpisodeResult]:
+    policy_name, seeds, max_steps = args
+    return [run_episode(POLICIES[policy_name](), seed, max_steps) for seed in seeds]
+
+
+# ===================================================
+# Раздача эпизодов по процессам (ProcessPoolExecutor)
+# ===================================================
+def rollout(policy_name: str, episodes: int,
+            base_seed: int = 0,
+            max_steps: int = 10_000,
+            workers: Optional[int] = None,
+            shard_size: Optional[int] = None) -> List[EpisodeResult]:
+    workers = workers or os.cpu_count() or 1
+    seeds = [episode_seed(base_seed, i) for i in range(episodes)]
+    if shard_size is None:
+        # несколько шардов на процесс, чтобы сгладить разную длину эпизодов
+        shard_size = max(1, episodes // (workers * 4))
+    shards = [(policy_name, seeds[i:i + shard_size], max_steps)
+              for i in range(0, episodes, shard_size)]
+
+    if workers == 1:
+        results = map(_run_shard, shards)
+        return [r for shard in results for r in shard]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [r for shard in pool.map(_run_shard, shards) for r in shard]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel headless rollouts")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--episodes", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-steps", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    results = rollout(args.policy, args.episodes, args.seed, args.max_steps, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    steps = sum(r.steps for r in results)
+    causes = {}
+    for r in results:
+        for c in r.death_causes:
+            causes[c] = causes.get(c, 0) + 1
+    print(f"episodes: {len(results)}  wins: {sum(r.won for r in results)}")
+    print(f"mean score: {sum(r.score for r in results) / max(len(results), 1):.1f}")
+    print(f"deaths: {causes}")
+    print(f"{steps} steps in {elapsed:.2f}s -> {steps / elapsed:.0f} steps/s")
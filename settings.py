@@ -11,6 +11,7 @@ WINDOW_TITLE = "Frogger"
 # === Скорость обновления кадров ===
 TARGET_FPS = 60
 FRAME_DELAY_MS = int(1000 / TARGET_FPS)
+MAX_SUBSTEPS = 5 # максимум тиков симуляции за один кадр (догонялка после лага)
 
 # === Цвета (в BGR) ===
 BG_COLOR = (10, 10, 10)
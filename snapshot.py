@@ -0,0 +1,166 @@
+from typing import List, Optional
+
+from board import Board
+
+# поля World и лягушки в начале буфера (см. SnapshotCache.take)
+HEAD = 13
+# на полосу: next_spawn_time, interval, consec_crocs
+LANE_HEAD = 3
+
+
+# ======================================================================
+# Снимки состояния мира для поиска с просмотром вперёд
+# ======================================================================
+# Снимок - плоский предвыделенный список значений (поля мира и лягушки,
+# скаляры полос) и ссылки на неизменяемые части:
+#
+#  * состав полосы (_LaneShape: тип, размер, цвет, спрайт, x0 и t0
+#    объектов). Объект после спавна не меняется - x считается от часов
+#    мира (MovingRect.x), поэтому состав берётся один раз на
+#    lane_state["version"] и делится между всеми снимками, пока полоса
+#    не изменилась;
+#  * состояние генератора полосы меняется только в попытке спавна, а она
+#    всегда сдвигает next_spawn_time вперёд. getstate() (~15 мкс) делается
+#    один раз на значение next_spawn_time, кортеж состояния общий.
+#
+# restore() не трогает объекты полосы, если в ней те же объекты, что в
+# снимке (тот же состав и version не менялась с прошлого снимка или
+# восстановления); иначе полоса собирается заново из пула, а version
+# получает новое значение - счётчик не возвращается назад, и кэши по нему
+# (observation.py, spectator.py) пересобирают полосу.
+class _LaneShape:
+    __slots__ = ("specs", "max_width")
+
+    def __init__(self, lane_state):
+        self.specs = tuple((type(it), it.size, it.color, it.sprite_id, it.x0, it.t0)
+                           for it in lane_state["items"])
+        self.max_width = lane_state["max_width"]
+
+
+class Snapshot:
+    __slots__ = ("board", "values", "shapes", "rngs")
+
+    def __init__(self, board: Board, lanes: int):
+        self.board = board
+        self.values: list = [0.0] * (HEAD + lanes * LANE_HEAD)
+        self.shapes: List[Optional[_LaneShape]] = [None] * lanes
+        self.rngs: List[Optional[tuple]] = [None] * lanes
+
+
+class SnapshotCache:
+    def __init__(self, world):
+        self.world = world
+        self.lanes = world.cars.lanes + world.water.lanes
+        first = len(world.cars.lanes)
+        self.water_rows = {lane["row"]: first + j for j, lane in enumerate(world.water.lanes)}
+        n = len(self.lanes)
+        # "полоса i с версией versions[i] состоит из shapes[i]"
+        self.shapes: List[Optional[_LaneShape]] = [None] * n
+        self.versions = [-1] * n
+        # "при next_spawn_time == rng_times[i] генератор в состоянии rng_states[i]"
+        self.rng_times: List[Optional[float]] = [None] * n
+        self.rng_states: List[Optional[tuple]] = [None] * n
+
+    def _attached_index(self):
+        log = self.world.frog.attached_log
+        if log is None:
+            return -1, -1
+        i = self.water_rows[self.world.frog.row]
+        for j, it in enumerate(self.lanes[i]["items"]):
+            if it is log:
+                return i, j
+        raise ValueError("attached log is not in its lane")
+
+    def take(self, out: Optional[Snapshot] = None) -> Snapshot:
+        world = self.world
+        if out is None:
+            out = Snapshot(world.board, len(self.lanes))
+        elif out.board is not world.board:
+            raise ValueError("snapshot buffer was made for another board")
+        frog = world.frog
+        lane_i, item_i = self._attached_index()
+        v = out.values
+        v[0:HEAD] = (world.time, world.state, world.lives, world.max_pos, world.last_death, world.paused,
+                     frog.col, frog.row, frog.facing, frog.rel_cell, frog.sprite_id, lane_i, item_i)
+
+        shapes, versions = self.shapes, self.versions
+        rng_times, rng_states = self.rng_times, self.rng_states
+        pos = HEAD
+        for i, lane in enumerate(self.lanes):
+            if versions[i] != lane["version"]:
+                shapes[i] = _LaneShape(lane)
+                versions[i] = lane["version"]
+            t = lane["next_spawn_time"]
+            if rng_times[i] != t:
+                rng_states[i] = lane["rng"].getstate()
+                rng_times[i] = t
+            # поэлементная запись заметно дешевле присваивания срезу
+            v[pos] = t
+            v[pos + 1] = lane["interval"]
+            v[pos + 2] = lane.get("consec_crocs", 0)
+            pos += LANE_HEAD
+        out.shapes[:] = shapes
+        out.rngs[:] = rng_states
+        return out
+
+    def restore(self, snap: Snapshot):
+        world = self.world
+        if snap.board is not world.board:
+            raise ValueError("snapshot was taken on another board")
+        frog = world.frog
+        v = snap.values
+        (world.time, world.state, world.lives, world.max_pos, world.last_death, world.paused,
+         frog.col, frog.row, frog.facing, frog.rel_cell, frog.sprite_id, lane_i, item_i) = v[:HEAD]
+        world.clock.now = world.time
+
+        pool = world.pool
+        shapes, versions = self.shapes, self.versions
+        rng_times, rng_states = self.rng_times, self.rng_states
+        released = []
+        rescheduled = False
+        pos = HEAD
+        for i, lane in enumerate(self.lanes):
+            t = v[pos]
+            lane["interval"] = v[pos + 1]
+            if "consec_crocs" in lane:
+                lane["consec_crocs"] = v[pos + 2]
+            pos += LANE_HEAD
+            # генератор уже в нужном состоянии, если с прошлого снимка или
+            # восстановления с этим кортежем в полосе не было попыток спавна.
+            # Иначе setstate (~7 мкс) откладывается до следующей попытки
+            # спавна полосы (LaneSpawner._attempt): до неё генератор не нужен
+            state = snap.rngs[i]
+            if rng_states[i] is not state or rng_times[i] != lane["next_spawn_time"]:
+                lane["rng_state"] = state
+                rng_states[i], rng_times[i] = state, t
+            if lane["next_spawn_time"] != t:
+                lane["next_spawn_time"] = t
+                rescheduled = True
+
+            shape = snap.shapes[i]
+            if shapes[i] is shape and versions[i] == lane["version"]:
+                continue
+            # в пул - после всех полос, чтобы объект не перешёл из
+            # одной полосы в другую внутри restore
+            released.extend(lane["items"])
+            row, dir_, speed = lane["row"], lane["dir"], lane["speed"]
+            items = []
+            for cls, size, color, sprite_id, x0, t0 in shape.specs:
+                obj = pool.acquire(cls, x0=x0, t0=t0, row=row, direction=dir_, speed=speed,
+                                   size=size, color=color)
+                obj.sprite_id = sprite_id
+                items.append(obj)
+            lane["items"] = items
+            lane["max_width"] = shape.max_width
+            lane["version"] += 1
+            shapes[i], versions[i] = shape, lane["version"]
+            rescheduled = True # другой объект у края выезда (LaneSpawner.exits)
+
+        for it in released:
+            pool.release(it)
+        if rescheduled:
+            world.cars.reschedule()
+            world.water.reschedule()
+        world.cars.culled = []
+        world.water.culled = []
+        frog.attached_log = None if lane_i < 0 else self.lanes[lane_i]["items"][item_i]
@@ -1,102 +1,291 @@
+import math
 import random
-from typing import List, Dict, Type
+from bisect import insort
+from heapq import heapify, heappop, heappush, heapreplace
+from typing import List, Dict, Optional, Tuple, Type
 
 from enums import Direction
 from settings import (
-    CELL_SIZE, WINDOW_WIDTH,
+    CELL_SIZE,
     CAR_SIZES, CAR_COLORS, CAR_MIN_GAP_CELLS,
     LOG_SIZES, LOG_COLORS,
     CROC_SIZES, CROC_COLORS,
-    WATER_LANES, WATER_MIN_GAP_CELLS,
+    WATER_MIN_GAP_CELLS,
     WATER_SPAWN_WEIGHTS, WATER_MAX_CONSEC_CROCS,
     ROAD_TARGET_GAP_CELLS, WATER_TARGET_GAP_CELLS,
 )
 from utils import weighted_choice
-from entities import Car, Crocodile, WoodLog, MovingRect
+from board import Board
+from entities import Car, Crocodile, WoodLog, MovingRect, MoverPool
+from sprite_ids import car_sprite_id, log_sprite_id, croc_sprite_id, NO_SPRITE
 
+# разброс интервала спавна относительно среднего
+SPAWN_JITTER = (0.8, 1.2)
 
+
+def mover_sprite_id(obj: MovingRect) -> int:
+    # id спрайта считается один раз при спавне, а не на каждом кадре
+    if isinstance(obj, Car):
+        return car_sprite_id(obj.size, obj.color, obj.direction)
+    if isinstance(obj, WoodLog):
+        return log_sprite_id(obj.size)
+    if isinstance(obj, Crocodile):
+        return croc_sprite_id(obj.size, obj.direction)
+    return NO_SPRITE
+
+
+def _x(obj: MovingRect) -> float:
+    return obj.x
+
+def _add_item(lane_state, obj: MovingRect):
+    # все объекты полосы едут с одной скоростью, поэтому порядок по x
+    # сохраняется между кадрами и его нужно поддерживать только при спавне
+    insort(lane_state["items"], obj, key=_x)
+    lane_state["max_width"] = max(lane_state["max_width"], obj.width)
+    lane_state["version"] += 1
+
+
+def _unseeded() -> random.Random:
+    # генератор без засева (~0.5 мкс против ~14 мкс у random.Random(seed)),
+    # только под setstate
+    return random.Random.__new__(random.Random)
+
+
+def _edge_item(lane_state) -> MovingRect:
+    # объект у края выезда - он уходит с поля первым
+    items = lane_state["items"]
+    return items[-1] if lane_state["dir"] == Direction.RIGHT else items[0]
+
+
+def _exit_time(obj: MovingRect, board_width: int) -> float:
+    # момент, когда объект целиком за краем выезда (is_visible -> False),
+    # чуть раньше точного: из-за округления удаление не должно опоздать на шаг
+    if not obj.vx:
+        return math.inf
+    edge = board_width if obj.vx > 0 else -obj.width
+    return obj.t0 + (edge - obj.x0) / obj.vx - 1e-9
+
+
+def _spawn_x(lane_state, width: int, board_width: int) -> float:
+    # объект появляется целиком за краем въезда
+    if lane_state["dir"] == Direction.RIGHT:
+        return -width
+    return board_width
+
+
+# ======================================================================
+# Общий движок спавна полос (дорога и вода)
+# ======================================================================
+# Попытки спавна всех полос лежат в куче по времени (next_spawn_time), а
+# моменты ухода с поля объектов у края выезда - во второй куче (exits), поэтому
+# update трогает только полосы, в которых за шаг есть спавн или удаление.
+#
+# Объекты полосы не перекрываются (спавн оставляет зазор, скорость у всех
+# одна) и отсортированы по x, поэтому:
+#  * место у края въезда может занять только последний появившийся
+#    объект - проверка зазора смотрит на один объект;
+#  * с поля уходят объекты только с края выезда - удаление проверяет
+#    объекты с этого конца списка, пока не встретит видимый.
+# Полосы остаются списками (а не deque): CollisionIndex ищет в них
+# бинарным поиском и берёт срезы, а вставка и удаление с начала списка
+# из нескольких объектов - сдвиг нескольких указателей.
+#
+# Объекты не двигаются по одному: x считается от момента спавна по общим
+# часам пула (MovingRect.x), и update только переставляет часы на now.
+# Объект ставится у края в точный момент спавна, поэтому результат не
+# зависит от длины шага.
+#
+# Подклассы задают только тип и размер объекта попытки (_choose), его
+# создание (_create) и учёт спавна (_on_spawn).
 class LaneSpawner:
-    def __init__(self, lanes: List[Dict],
-                 cls: Type[MovingRect],
-                 size_table: List[Dict],
-                 colors: List[tuple],
-                 min_gap_cells: int):
-        self.cls = cls
-        self.lanes = []
-        for lane in lanes:
-            self.lanes.append(
-                {
-                "row": lane["row"],
-                "dir": Direction(lane["dir"]),
-                "speed": lane["speed"],
-                "items": [],
-                "next_spawn_time": 0.0,
-                "interval": 1.0,
-                }
-            )
-        self.size_table = size_table
-        self.colors = colors
+    def __init__(self, board: Board,
+                 lanes: List[Dict],
+                 min_gap_cells: int,
+                 target_gap_cells: float,
+                 min_size: int,
+                 pool: Optional[MoverPool] = None,
+                 rng: Optional[random.Random] = None):
+        self.width = board.width # объекты спавнятся и исчезают за краями поля
+        self.pool = pool if pool is not None else MoverPool()
+        self.rng = rng if rng is not None else random.Random()
+        self.lanes = [self._lane_state(lane) for lane in lanes]
+        self.culled: List[MovingRect] = []
         self.min_gap_px = min_gap_cells * CELL_SIZE
+        self.target_gap_px = target_gap_cells * CELL_SIZE
+        self.min_size = min_size
+        self.reschedule()
 
-    def _can_spawn_in_lane(self, lane_state, width: int) -> bool:
-        dir_ = lane_state["dir"]
-        items: List[MovingRect] = lane_state["items"]
-        if dir_ == Direction.RIGHT:
-            spawn_x = -width
-            for it in items:
-                if it.row != lane_state["row"]:
-                    continue
-                if (it.x + it.width) > spawn_x and it.x < (spawn_x + width + self.min_gap_px):
-                    return False
-            return True
-        else:
-            spawn_x = WINDOW_WIDTH
-            for it in items:
-                if it.row != lane_state["row"]:
-                    continue
-                if (it.x) < (spawn_x + width) and (it.x + it.width) > (spawn_x - self.min_gap_px):
-                    return False
-            return True
+    def _lane_state(self, lane) -> Dict:
+        return {
+            "row": lane["row"],
+            "dir": Direction(lane["dir"]),
+            "speed": lane["speed"],
+            "items": [], # отсортированы по x
+            "max_width": 0,
+            "version": 0, # меняется при спавне и удалении объектов (observation.py)
+            "next_spawn_time": 0.0,
+            "interval": 1.0,
+            # свой поток случайности у каждой полосы: порядок спавнов
+            # разных полос внутри одного шага не меняет результат
+            "rng": random.Random(self.rng.getrandbits(64)),
+            # отложенное состояние генератора (SnapshotCache.restore):
+            # ставится в rng при следующей попытке спавна полосы
+            "rng_state": None,
+        }
 
-    def _spawn_in_lane(self, lane_state) -> MovingRect:
-        size_info = weighted_choice(self.size_table)
-        size = size_info["size"]
-        color = random.choice(self.colors)
-        width = size * CELL_SIZE
+    def reschedule(self):
+        # кучи заново по next_spawn_time и объектам полос - после того, как
+        # их переставили снаружи (restore из snapshot.py). Более позднее время
+        # куча замечает сама, когда доходит до старой записи
+        self.events: List[Tuple[float, int]] = [
+            (lane_state["next_spawn_time"], i) for i, lane_state in enumerate(self.lanes)]
+        heapify(self.events)
+        # по записи на непустую полосу: когда уходит её объект у края выезда
+        self.exits: List[Tuple[float, int]] = [
+            (_exit_time(_edge_item(lane_state), self.width), i)
+            for i, lane_state in enumerate(self.lanes) if lane_state["items"]]
+        heapify(self.exits)
+
+    def fork(self, pool: MoverPool) -> "LaneSpawner":
+        # копия для World.fork без конструктора: настройки и расписание те же,
+        # полосы пустые (объекты ставит restore из снимка), генераторы полос
+        # без засева - их состояние приходит из снимка через rng_state
+        child = object.__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child.pool = pool
+        child.lanes = [dict(lane_state, items=[], rng=_unseeded(), rng_state=None)
+                       for lane_state in self.lanes]
+        child.events = list(self.events)
+        child.exits = list(self.exits)
+        child.culled = []
+        return child
+
+    # ==============================
+    # Что и как спавнить (подклассы)
+    # ==============================
+    def _choose(self, lane_state) -> Tuple[Type[MovingRect], int]:
+        raise NotImplementedError
+
+    def _create(self, lane_state, cls: Type[MovingRect], size: int, t: float) -> MovingRect:
+        raise NotImplementedError
 
-        x = -width if lane_state["dir"] == Direction.RIGHT else WINDOW_WIDTH
-        obj = self.cls(
-            x=x,
+    def _on_spawn(self, lane_state, obj: MovingRect):
+        pass
+
+    def _acquire(self, lane_state, cls: Type[MovingRect], size: int, color: tuple,
+                 t: float) -> MovingRect:
+        obj = self.pool.acquire(
+            cls,
+            x0=_spawn_x(lane_state, size * CELL_SIZE, self.width),
+            t0=t,
             row=lane_state["row"],
             direction=lane_state["dir"],
             speed=lane_state["speed"],
             size=size,
             color=color,
         )
+        obj.sprite_id = mover_sprite_id(obj)
         return obj
 
+    # ==============================
+    # Спавн
+    # ==============================
+    def _can_spawn(self, lane_state, width: int, t: float) -> bool:
+        # место у края въезда в момент спавна t
+        items: List[MovingRect] = lane_state["items"]
+        if not items:
+            return True
+        if lane_state["dir"] == Direction.RIGHT:
+            spawn_x = -width
+            it = items[0]
+            x = it.x_at(t)
+            return not ((x + it.width) > spawn_x and x < (spawn_x + width + self.min_gap_px))
+        spawn_x = self.width
+        it = items[-1]
+        x = it.x_at(t)
+        return not ((x) < (spawn_x + width) and (x + it.width) > (spawn_x - self.min_gap_px))
+
+    def _attempt(self, lane_state, step_start: float):
+        rng = lane_state["rng"]
+        if lane_state["rng_state"] is not None:
+            rng.setstate(lane_state["rng_state"])
+            lane_state["rng_state"] = None
+        spawn_time = lane_state["next_spawn_time"]
+        t = max(spawn_time, step_start) # опоздавший спавн - в начале шага
+        cls, size = self._choose(lane_state)
+        width = size * CELL_SIZE
+
+        if self._can_spawn(lane_state, width, t):
+            obj = self._create(lane_state, cls, size, t)
+            _add_item(lane_state, obj)
+            self._on_spawn(lane_state, obj)
+
+        v = lane_state["speed"]
+        mean_interval = (self.target_gap_px + width) / max(v, 1e-6)
+        lane_state["interval"] = rng.uniform(*SPAWN_JITTER) * mean_interval
+        lane_state["next_spawn_time"] = spawn_time + lane_state["interval"]
+
+    def min_spawn_interval(self, lane_state) -> float:
+        # нижняя граница между попытками спавна (для предсказания полосы)
+        width = self.min_size * CELL_SIZE
+        return SPAWN_JITTER[0] * (self.target_gap_px + width) / max(lane_state["speed"], 1e-6)
+
+    # ==============================
+    # Обновление
+    # ==============================
     def update(self, now: float, dt: float):
-        for lane_state in self.lanes:
-            if now >= lane_state["next_spawn_time"]:
-                size_info = weighted_choice(self.size_table)
-                size = size_info["size"]
-                width = size * CELL_SIZE
-
-                if self._can_spawn_in_lane(lane_state, width):
-                    obj = self._spawn_in_lane(lane_state)
-                    lane_state["items"].append(obj)
-
-                v = lane_state["speed"]
-                mean_interval = (ROAD_TARGET_GAP_CELLS * CELL_SIZE + width) / max(v, 1e-6)
-                lane_state["interval"] = random.uniform(0.8, 1.2) * mean_interval
-                lane_state["next_spawn_time"] = now + lane_state["interval"]
-
-            alive = []
-            for it in lane_state["items"]:
-                it.update(dt)
-                if it.is_visible():
-                    alive.append(it)
-            lane_state["items"] = alive
+        # все спавны, время которых попало в шаг, в их точный момент
+        events, exits, lanes = self.events, self.exits, self.lanes
+        width = self.width
+        step_start = now - dt
+        while events and events[0][0] <= now:
+            i = events[0][1]
+            lane_state = lanes[i]
+            was_empty = not lane_state["items"]
+            while now >= lane_state["next_spawn_time"]:
+                self._attempt(lane_state, step_start)
+            heapreplace(events, (lane_state["next_spawn_time"], i))
+            # у непустой полосы объект у края выезда спавн не меняет
+            if was_empty and lane_state["items"]:
+                heappush(exits, (_exit_time(_edge_item(lane_state), width), i))
+
+        # все объекты сразу оказываются в моменте now
+        self.pool.clock.now = now
+        culled = []
+        while exits and exits[0][0] <= now:
+            i = exits[0][1]
+            lane_state = lanes[i]
+            items = lane_state["items"]
+            if lane_state["dir"] == Direction.RIGHT:
+                k = len(items)
+                while k and not items[k - 1].is_visible(width):
+                    k -= 1
+                if k < len(items):
+                    culled.extend(items[k:])
+                    del items[k:]
+                    lane_state["version"] += 1
+            else:
+                k = 0
+                while k < len(items) and not items[k].is_visible(width):
+                    k += 1
+                if k:
+                    culled.extend(items[:k])
+                    del items[:k]
+                    lane_state["version"] += 1
+            if not items:
+                heappop(exits)
+                continue
+            # объект у края ещё виден, если момент ухода взят с запасом
+            t = _exit_time(_edge_item(lane_state), width)
+            heapreplace(exits, (t if t > now else math.nextafter(now, math.inf), i))
+
+        # в пул только после обработки всех полос: ушедшее бревно может ещё
+        # держать лягушку до проверки смерти в этом кадре. Объекты из пула
+        # берутся только при спавне в следующем update, поэтому до него
+        # culled остаются целыми (заметание в CollisionIndex.first_contact)
+        for it in culled:
+            self.pool.release(it)
+        self.culled = culled
 
     @property
     def all_items(self) -> List[MovingRect]:
@@ -110,139 +299,73 @@ class LaneSpawner:
 # Спавнер для машин
 # ==============================
 class CarSpawner(LaneSpawner):
-    def __init__(self, lanes: List[Dict]):
-        super().__init__(lanes,
-                         Car,
-                         CAR_SIZES,
-                         CAR_COLORS,
-                         min_gap_cells=CAR_MIN_GAP_CELLS)
+    def __init__(self, board: Board,
+                 pool: Optional[MoverPool] = None,
+                 rng: Optional[random.Random] = None):
+        self.cls = Car
+        self.size_table = CAR_SIZES
+        self.colors = CAR_COLORS
+        super().__init__(board,
+                         board.road_lanes,
+                         min_gap_cells=CAR_MIN_GAP_CELLS,
+                         target_gap_cells=ROAD_TARGET_GAP_CELLS,
+                         min_size=min(s["size"] for s in CAR_SIZES),
+                         pool=pool,
+                         rng=rng)
+
+    def _choose(self, lane_state) -> Tuple[Type[MovingRect], int]:
+        return self.cls, weighted_choice(self.size_table, rng=lane_state["rng"])["size"]
+
+    def _create(self, lane_state, cls: Type[MovingRect], size: int, t: float) -> MovingRect:
+        # размер машины выбирается заново (место проверялось под размер из
+        # _choose); порядок обращений к генератору - как в реплеях
+        rng = lane_state["rng"]
+        size = weighted_choice(self.size_table, rng=rng)["size"]
+        color = rng.choice(self.colors)
+        return self._acquire(lane_state, cls, size, color, t)
 
 
 # ================================
 # Спавнер для крокодилов и брёвен
 # ================================
-class WaterLaneSpawner:
-    def __init__(self, lanes: List[Dict]):
-        self.lanes = []
-        for lane in lanes:
-            self.lanes.append(
-                {
-                "row": lane["row"],
-                "dir": Direction(lane["dir"]),
-                "speed": lane["speed"],
-                "items": [],
-                "next_spawn_time": 0.0,
-                "interval": 1.0,
-                "consec_crocs": 0,
-                "last_type": None,
-                }
-            )
-        self.min_interval = 0.0
-        self.max_interval = 0.0
-        self.min_gap_px  = WATER_MIN_GAP_CELLS * CELL_SIZE
+class WaterLaneSpawner(LaneSpawner):
+    def __init__(self, board: Board,
+                 pool: Optional[MoverPool] = None,
+                 rng: Optional[random.Random] = None):
+        super().__init__(board,
+                         board.water_lanes,
+                         min_gap_cells=WATER_MIN_GAP_CELLS,
+                         target_gap_cells=WATER_TARGET_GAP_CELLS,
+                         min_size=min(s["size"] for s in LOG_SIZES + CROC_SIZES),
+                         pool=pool,
+                         rng=rng)
+
+    def _lane_state(self, lane) -> Dict:
+        lane_state = super()._lane_state(lane)
+        lane_state["consec_crocs"] = 0
+        lane_state["last_type"] = None
+        return lane_state
 
     def _choose_type(self, lane_state) -> str:
         if lane_state["consec_crocs"] >= WATER_MAX_CONSEC_CROCS:
             return "log"
-        r = random.random()
+        r = lane_state["rng"].random()
         if r < WATER_SPAWN_WEIGHTS["croc"]:
             return "croc"
         return "log"
 
-    def _can_spawn(self, lane_state, width: int) -> bool:
-        dir_ = lane_state["dir"]
-        items: List[MovingRect] = lane_state["items"]
-        if dir_ == Direction.RIGHT:
-            spawn_x = -width
-            for it in items:
-                if it.row != lane_state["row"]:
-                    continue
-                if (it.x + it.width) > spawn_x and it.x < (spawn_x + width + self.min_gap_px):
-                    return False
-            return True
-        else:
-            spawn_x = WINDOW_WIDTH
-            for it in items:
-                if it.row != lane_state["row"]:
-                    continue
-                if (it.x) < (spawn_x + width) and (it.x + it.width) > (spawn_x - self.min_gap_px):
-                    return False
-            return True
+    def _choose(self, lane_state) -> Tuple[Type[MovingRect], int]:
+        rng = lane_state["rng"]
+        if self._choose_type(lane_state) == "log":
+            return WoodLog, weighted_choice(LOG_SIZES, rng=rng)["size"]
+        return Crocodile, weighted_choice(CROC_SIZES, rng=rng)["size"]
 
-    def _spawn(self, lane_state, kind: str) -> MovingRect:
-        if kind == "log":
-            size = weighted_choice(LOG_SIZES)["size"]
-            color = random.choice(LOG_COLORS)
-            cls = WoodLog
-        else:
-            size = weighted_choice(CROC_SIZES)["size"]
-            color = random.choice(CROC_COLORS)
-            cls = Crocodile
+    def _create(self, lane_state, cls: Type[MovingRect], size: int, t: float) -> MovingRect:
+        colors = LOG_COLORS if cls is WoodLog else CROC_COLORS
+        return self._acquire(lane_state, cls, size, lane_state["rng"].choice(colors), t)
 
-        width = size * CELL_SIZE
-        x = -width if lane_state["dir"] == Direction.RIGHT else WINDOW_WIDTH
-        return cls(
-            x=x,
-            row=lane_state["row"],
-            direction=lane_state["dir"],
-            speed=lane_state["speed"],
-            size=size,
-            color=color,
-        )
-    
-    def _spawn_with_size(self, lane_state, kind: str, size: int) -> MovingRect:
-        if kind == "log":
-            color = random.choice(LOG_COLORS)
-            cls = WoodLog
+    def _on_spawn(self, lane_state, obj: MovingRect):
+        if isinstance(obj, Crocodile):
+            lane_state["consec_crocs"] += 1
         else:
-            color = random.choice(CROC_COLORS)
-            cls = Crocodile
-
-        width = size * CELL_SIZE
-        x = -width if lane_state["dir"] == Direction.RIGHT else WINDOW_WIDTH
-        return cls(
-            x=x,
-            row=lane_state["row"],
-            direction=lane_state["dir"],
-            speed=lane_state["speed"],
-            size=size,
-            color=color,
-        )
-
-    def update(self, now: float, dt: float):
-        for lane_state in self.lanes:
-            if now >= lane_state["next_spawn_time"]:
-                kind = self._choose_type(lane_state)
-
-                if kind == "log":
-                    size = weighted_choice(LOG_SIZES)["size"]
-                else:
-                    size = weighted_choice(CROC_SIZES)["size"]
-                width = size * CELL_SIZE
-
-                if self._can_spawn(lane_state, width):
-                    obj = self._spawn_with_size(lane_state, kind, size)
-                    lane_state["items"].append(obj)
-                    if kind == "croc":
-                        lane_state["consec_crocs"] += 1
-                    else:
-                        lane_state["consec_crocs"] = 0
-
-                v = lane_state["speed"]
-                mean_interval = (WATER_TARGET_GAP_CELLS * CELL_SIZE + width) / max(v, 1e-6)
-                lane_state["interval"] = random.uniform(0.8, 1.2) * mean_interval
-                lane_state["next_spawn_time"] = now + lane_state["interval"]
-
-            alive = []
-            for it in lane_state["items"]:
-                it.update(dt)
-                if it.is_visible():
-                    alive.append(it)
-            lane_state["items"] = alive
-
-    @property
-    def all_items(self) -> List[MovingRect]:
-        out: List[MovingRect] = []
-        for lane_state in self.lanes:
-            out.extend(lane_state["items"])
-        return out
+            lane_state["consec_crocs"] = 0
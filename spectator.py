@@ -0,0 +1,587 @@
+import argparse
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from bisect import insort
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from enums import Direction, Facing, GameState
+from board import Board
+from entities import Frog, Car, WoodLog, Crocodile, MovingRect, MoverClock
+from spawners import mover_sprite_id
+from sprite_ids import FROG_SPRITE_IDS
+from profiler import NULL_PROFILER
+
+# =====================================================================
+# Поток состояния игры для зрителей (отдельные процессы) по сокету
+# =====================================================================
+# Кадр протокола: длина тела (u32), тип (u8), тело.
+#   BOARD    - описание поля, один раз при подключении
+#   KEYFRAME - полное состояние: шаг, dt, время, статус, лягушка, объекты полос
+#   DELTA    - шаги с прошлого кадра и события между ними
+# Позиции объектов не передаются: объект приходит один раз с x0 и t0 (f64),
+# а зритель ведёт время мира тем же world.time += dt и считает x по той же
+# формуле MovingRect.x, поэтому зеркало совпадает с игрой бит-в-бит. События
+# помечены номером шага внутри DELTA и применяются после сдвига на этот шаг.
+_FRAME = struct.Struct("<IB")
+MSG_BOARD = 1
+MSG_KEYFRAME = 2
+MSG_DELTA = 3
+
+# события DELTA: (шаг от начала сообщения u8, тип u8) + данные
+_EVENT = struct.Struct("<BB")
+EV_SPAWN = 1   # полоса, вид, размер, цвет (BGR), x0, t0
+EV_DESPAWN = 2 # полоса, индекс в списке полосы
+EV_FROG = 3    # строка, колонка, взгляд, индекс бревна в полосе (-1 - нет), клетка на бревне
+EV_STATUS = 4  # состояние игры, жизни, пауза, max_pos
+EV_INPUT = 5   # код клавиши
+EV_DT = 6      # новый шаг симуляции
+_SPAWN = struct.Struct("<HBB3Bdd")
+_DESPAWN = struct.Struct("<HH")
+_FROG = struct.Struct("<HhBhb")
+_STATUS = struct.Struct("<BBBH")
+_INPUT = struct.Struct("<B")
+_DT = struct.Struct("<d")
+_EVENT_BODIES = {EV_SPAWN: _SPAWN, EV_DESPAWN: _DESPAWN, EV_FROG: _FROG,
+                 EV_STATUS: _STATUS, EV_INPUT: _INPUT, EV_DT: _DT}
+
+_DELTA = struct.Struct("<BH") # шагов в сообщении, событий
+_KEYFRAME = struct.Struct("<Idd")
+_LANE = struct.Struct("<HbdB")
+_ITEM = struct.Struct("<BB3Bdd")
+_U16 = struct.Struct("<H")
+_BOARD = struct.Struct("<6H")
+
+KINDS = (Car, WoodLog, Crocodile)
+_KIND_CODES = {cls: i for i, cls in enumerate(KINDS)}
+
+KEYFRAME_SECONDS = 10.0 # период ключевых кадров
+FLUSH_TICKS = 6 # DELTA раз в столько тиков (10 раз в секунду при 60 Гц)
+MAX_BACKLOG = 1 << 20 # неотправленных байт у зрителя, после которых он отключается
+
+
+def parse_address(address: str):
+    # "unix:/tmp/frogger.sock", "host:port" или ":port" (localhost)
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def _frame(msg_type: int, body: bytes) -> bytes:
+    return _FRAME.pack(len(body), msg_type) + body
+
+
+# ==============================
+# Поле
+# ==============================
+def encode_board(board: Board, lanes: Sequence[dict], water: int) -> bytes:
+    # lanes - полосы в порядке нумерации потока, первые water из них - дорожные
+    out = bytearray(_BOARD.pack(board.cols, board.rows, *board.finish_rows,
+                                board.start_col, board.start_row))
+    out += _U16.pack(len(lanes))
+    for i, lane_state in enumerate(lanes):
+        out += _LANE.pack(lane_state["row"], lane_state["dir"], lane_state["speed"], i >= water)
+    for values in (board.safe_rows, board.lilypads):
+        out += _U16.pack(len(values))
+        out += struct.pack(f"<{len(values)}H", *values)
+    out += _U16.pack(len(board.grass))
+    for col, row in board.grass:
+        out += struct.pack("<HH", col, row)
+    return bytes(out)
+
+
+def decode_board(body: bytes) -> Board:
+    cols, rows, f0, f1, start_col, start_row = _BOARD.unpack_from(body)
+    pos = _BOARD.size
+    (n,) = _U16.unpack_from(body, pos); pos += _U16.size
+    road, water = [], []
+    for _ in range(n):
+        row, dir_, speed, is_water = _LANE.unpack_from(body, pos); pos += _LANE.size
+        (water if is_water else road).append({"row": row, "dir": dir_, "speed": speed})
+    lists = []
+    for _ in range(2):
+        (n,) = _U16.unpack_from(body, pos); pos += _U16.size
+        lists.append(list(struct.unpack_from(f"<{n}H", body, pos))); pos += 2 * n
+    (n,) = _U16.unpack_from(body, pos); pos += _U16.size
+    grass = [struct.unpack_from("<HH", body, pos + 4 * i) for i in range(n)]
+    return Board(cols=cols, rows=rows, road_lanes=road, water_lanes=water,
+                 finish_rows=(f0, f1), safe_rows=lists[0], lilypads=lists[1],
+                 grass=grass, start_col=start_col, start_row=start_row)
+
+
+# ==========================================================
+# Кодировщик: состояние мира -> KEYFRAME и DELTA
+# ==========================================================
+# tick() вызывается после каждого тика игры (как ReplayRecorder.record).
+# Шаг - тик, на котором мир сдвинулся (на паузе и после конца игры
+# world.update ничего не делает). Спавны и удаления ищутся только в
+# полосах, у которых поменялся lane_state["version"].
+class StreamEncoder:
+    def __init__(self, world, keyframe_seconds: float = KEYFRAME_SECONDS,
+                 flush_ticks: int = FLUSH_TICKS):
+        self.world = world
+        self.lanes = world.cars.lanes + world.water.lanes
+        self.board_bytes = _frame(MSG_BOARD, encode_board(world.board, self.lanes, len(world.cars.lanes)))
+        self._water_lane = {lane_state["row"]: i for i, lane_state in enumerate(self.lanes)
+                            if i >= len(world.cars.lanes)}
+        self.keyframe_seconds = keyframe_seconds
+        self.flush_ticks = flush_ticks
+
+        self.steps = 0
+        self.dt = None
+        self._time = world.time
+        self._since_keyframe = 0.0
+        self._ticks = 0 # тиков в неотправленной DELTA
+        self._msg_steps = 0 # шаг, с которого начинается неотправленная DELTA
+        self._events = bytearray()
+        self._n_events = 0
+        self._versions = [None] * len(self.lanes)
+        self._items: List[List[MovingRect]] = [[] for _ in self.lanes]
+        self._frog = None
+        self._status = None
+
+    # ---- события ----
+    def _event(self, ev_type: int, *values):
+        self._events += _EVENT.pack(self.steps - self._msg_steps, ev_type)
+        self._events += _EVENT_BODIES[ev_type].pack(*values)
+        self._n_events += 1
+
+    def _frog_state(self):
+        frog = self.world.frog
+        log_index = -1
+        if frog.attached_log is not None:
+            lane = self._water_lane.get(frog.attached_log.row)
+            items = self.lanes[lane]["items"] if lane is not None else ()
+            for i, it in enumerate(items):
+                if it is frog.attached_log:
+                    log_index = i
+                    break
+        return frog.row, frog.col, frog.facing.value, log_index, frog.rel_cell
+
+    def _status_state(self):
+        w = self.world
+        return w.state.value, min(max(w.lives, 0), 255), w.paused, w.max_pos
+
+    def _diff_lanes(self):
+        for i, lane_state in enumerate(self.lanes):
+            if lane_state["version"] == self._versions[i]:
+                continue
+            prev, items = self._items[i], lane_state["items"]
+            alive = set(map(id, items))
+            known = set(map(id, prev))
+            # индексы по убыванию - у зрителя они остаются верными при удалении
+            for k in range(len(prev) - 1, -1, -1):
+                if id(prev[k]) not in alive:
+                    self._event(EV_DESPAWN, i, k)
+            for it in items:
+                if id(it) not in known:
+                    self._event(EV_SPAWN, i, _KIND_CODES[type(it)], it.size, *it.color, it.x0, it.t0)
+            self._versions[i] = lane_state["version"]
+            self._items[i] = list(items)
+
+    def _observe(self):
+        frog = self._frog_state()
+        if frog != self._frog:
+            self._event(EV_FROG, *frog)
+            self._frog = frog
+        status = self._status_state()
+        if status != self._status:
+            self._event(EV_STATUS, *status)
+            self._status = status
+
+    # ---- кадры ----
+    def keyframe(self) -> bytes:
+        # полное состояние на текущем шаге; неотправленная DELTA должна
+        # уйти раньше (tick() делает это сам)
+        for i, lane_state in enumerate(self.lanes):
+            self._versions[i] = lane_state["version"]
+            self._items[i] = list(lane_state["items"])
+        self._frog, self._status = self._frog_state(), self._status_state()
+        out = bytearray(_KEYFRAME.pack(self.steps, self.dt or 0.0, self.world.time))
+        out += _STATUS.pack(*self._status)
+        out += _FROG.pack(*self._frog)
+        for items in self._items:
+            out += _U16.pack(len(items))
+            for it in items:
+                out += _ITEM.pack(_KIND_CODES[type(it)], it.size, *it.color, it.x0, it.t0)
+        self._since_keyframe = 0.0
+        self._msg_steps, self._ticks = self.steps, 0
+        return _frame(MSG_KEYFRAME, bytes(out))
+
+    def flush(self) -> Optional[bytes]:
+        steps = self.steps - self._msg_steps
+        msg = None
+        if steps or self._n_events:
+            msg = _frame(MSG_DELTA, _DELTA.pack(steps, self._n_events) + self._events)
+        self._events = bytearray()
+        self._n_events = 0
+        self._msg_steps, self._ticks = self.steps, 0
+        return msg
+
+    def tick(self, dt: float, keys: Sequence[int] = (), keyframe: bool = False) -> List[bytes]:
+        # keyframe=True - внеочередной ключевой кадр (подключился зритель)
+        out = []
+        if self.world.time != self._time:
+            self._time = self.world.time
+            if self.steps - self._msg_steps == 255: # смещение шага - u8
+                out.append(self.flush())
+            if dt != self.dt:
+                # новый dt действует с этого шага: событие - до сдвига
+                self._event(EV_DT, dt)
+                self.dt = dt
+            self.steps += 1
+            self._since_keyframe += dt
+            self._diff_lanes()
+        self._observe()
+        for key in keys:
+            self._event(EV_INPUT, key & 0xFF)
+
+        self._ticks += 1
+        if keyframe or self._since_keyframe >= self.keyframe_seconds:
+            out.append(self.flush())
+            out.append(self.keyframe())
+        elif self._ticks >= self.flush_ticks:
+            out.append(self.flush())
+        return [msg for msg in out if msg is not None]
+
+
+# ==========================================================
+# Зеркало мира у зрителя: те же сущности, что и в игре
+# ==========================================================
+# Атрибуты повторяют World настолько, чтобы Renderer мог рисовать зеркало
+# как обычный мир (board, frog, cars/water с lanes, lives, score, profiler).
+class _MirrorLanes:
+    def __init__(self, lanes: List[dict]):
+        self.lanes = lanes
+
+
+class StreamMirror:
+    def __init__(self):
+        self.board: Optional[Board] = None
+        self.lanes: List[dict] = []
+        self.frog: Optional[Frog] = None
+        self.synced = False # был ключевой кадр
+        self.steps = 0
+        self.dt = 0.0
+        self.time = 0.0
+        self.clock = MoverClock() # часы объектов зеркала, всегда на self.time
+        self.state = GameState.START
+        self.lives = 0
+        self.paused = False
+        self.max_pos = 0
+        self.inputs: List[Tuple[int, int]] = [] # (шаг, клавиша) с прошлого чтения
+        self.profiler = NULL_PROFILER
+        self.bytes = 0
+        self.frames: Dict[int, int] = {MSG_BOARD: 0, MSG_KEYFRAME: 0, MSG_DELTA: 0}
+        self._buf = bytearray()
+
+    @property
+    def score(self):
+        return self.max_pos * 10
+
+    def feed(self, data: bytes):
+        self.bytes += len(data)
+        self._buf += data
+        pos = 0
+        while len(self._buf) - pos >= _FRAME.size:
+            size, msg_type = _FRAME.unpack_from(self._buf, pos)
+            end = pos + _FRAME.size + size
+            if end > len(self._buf):
+                break
+            self.apply(msg_type, bytes(self._buf[pos + _FRAME.size:end]))
+            pos = end
+        del self._buf[:pos]
+
+    def apply(self, msg_type: int, body: bytes):
+        self.frames[msg_type] = self.frames.get(msg_type, 0) + 1
+        if msg_type == MSG_BOARD:
+            self._apply_board(body)
+        elif msg_type == MSG_KEYFRAME:
+            self._apply_keyframe(body)
+        elif msg_type == MSG_DELTA and self.synced:
+            self._apply_delta(body)
+
+    def _apply_board(self, body: bytes):
+        self.board = decode_board(body)
+        road, water = [], []
+        for lanes, src in ((road, self.board.road_lanes), (water, self.board.water_lanes)):
+            for lane in src:
+                lanes.append({"row": lane["row"], "dir": Direction(lane["dir"]), "speed": lane["speed"],
+                              "items": [], "max_width": 0, "version": 0})
+        self.lanes = road + water
+        self.cars, self.water = _MirrorLanes(road), _MirrorLanes(water)
+        self.frog = Frog(col=self.board.start_col, row=self.board.start_row, board=self.board)
+        self.synced = False
+
+    def _new_item(self, lane_state, kind: int, size: int, color: tuple,
+                  x0: float, t0: float) -> MovingRect:
+        obj = KINDS[kind](x0=x0, t0=t0, row=lane_state["row"], direction=lane_state["dir"],
+                          speed=lane_state["speed"], size=size, color=color, clock=self.clock)
+        obj.sprite_id = mover_sprite_id(obj)
+        lane_state["max_width"] = max(lane_state["max_width"], obj.width)
+        lane_state["version"] += 1
+        return obj
+
+    def _set_frog(self, row, col, facing, log_index, rel):
+        frog = self.frog
+        frog.row, frog.col, frog.rel_cell = row, col, rel
+        frog.facing = Facing(facing)
+        frog.sprite_id = FROG_SPRITE_IDS[frog.facing]
+        frog.attached_log = None
+        if log_index >= 0:
+            for lane_state in self.water.lanes:
+                if lane_state["row"] == row:
+                    frog.attached_log = lane_state["items"][log_index]
+
+    def _set_status(self, state, lives, paused, max_pos):
+        self.state, self.lives = GameState(state), lives
+        self.paused, self.max_pos = bool(paused), max_pos
+
+    def _apply_keyframe(self, body: bytes):
+        self.steps, self.dt, self.time = _KEYFRAME.unpack_from(body)
+        self.clock.now = self.time
+        pos = _KEYFRAME.size
+        self._set_status(*_STATUS.unpack_from(body, pos)); pos += _STATUS.size
+        frog = _FROG.unpack_from(body, pos); pos += _FROG.size
+        for lane_state in self.lanes:
+            (n,) = _U16.unpack_from(body, pos); pos += _U16.size
+            lane_state["items"] = []
+            for _ in range(n):
+                kind, size, b, g, r, x0, t0 = _ITEM.unpack_from(body, pos); pos += _ITEM.size
+                lane_state["items"].append(self._new_item(lane_state, kind, size, (b, g, r), x0, t0))
+        self._set_frog(*frog)
+        self.synced = True
+
+    def _advance(self, steps: int):
+        # время - тем же сложением по шагам, что и world.time в игре
+        dt = self.dt
+        for _ in range(steps):
+            self.time += dt
+        self.clock.now = self.time
+        self.steps += steps
+
+    def _apply_delta(self, body: bytes):
+        steps, n = _DELTA.unpack_from(body)
+        pos, done = _DELTA.size, 0
+        for _ in range(n):
+            offset, ev_type = _EVENT.unpack_from(body, pos); pos += _EVENT.size
+            st = _EVENT_BODIES[ev_type]
+            values = st.unpack_from(body, pos); pos += st.size
+            if offset > done:
+                self._advance(offset - done)
+                done = offset
+            if ev_type == EV_SPAWN:
+                lane, kind, size, b, g, r, x0, t0 = values
+                lane_state = self.lanes[lane]
+                insort(lane_state["items"], self._new_item(lane_state, kind, size, (b, g, r), x0, t0),
+                       key=lambda it: it.x)
+            elif ev_type == EV_DESPAWN:
+                lane, index = values
+                del self.lanes[lane]["items"][index]
+                self.lanes[lane]["version"] += 1
+            elif ev_type == EV_FROG:
+                self._set_frog(*values)
+            elif ev_type == EV_STATUS:
+                self._set_status(*values)
+            elif ev_type == EV_INPUT:
+                self.inputs.append((self.steps, values[0]))
+            elif ev_type == EV_DT:
+                self.dt = values[0]
+        self._advance(steps - done)
+
+
+# ==========================================================
+# Сервер: один кодировщик, отправка всем зрителям в фоне
+# ==========================================================
+# Игровой поток только кодирует кадры и кладёт их в очередь; поток
+# отправки принимает подключения и пишет в неблокирующие сокеты. Новый
+# зритель сразу получает BOARD и ждёт ближайшего KEYFRAME (его запрашивает
+# поток отправки); зритель, отставший больше MAX_BACKLOG байт, отключается.
+class SpectatorServer:
+    def __init__(self, world, address: str, keyframe_seconds: float = KEYFRAME_SECONDS,
+                 flush_ticks: int = FLUSH_TICKS):
+        self.encoder = StreamEncoder(world, keyframe_seconds, flush_ticks)
+        self.family, self.address = parse_address(address)
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address) # сокет от прошлого запуска
+        self.listener = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.address)
+        self.listener.listen()
+        self.listener.setblocking(False)
+
+        self.pending = queue.Queue()
+        self.clients: Dict[socket.socket, bytearray] = {}
+        self.waiting: Dict[socket.socket, bytearray] = {} # ждут ключевого кадра
+        self.need_keyframe = False
+
+        self.started = time.perf_counter()
+        self.sent_bytes = 0 # всем зрителям вместе
+        self.broadcast_bytes = 0 # одному зрителю
+        self.connected = 0
+        self.dropped = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="spectators", daemon=True)
+        self.thread.start()
+
+    def tick(self, dt: float, keys: Sequence[int] = ()):
+        keyframe = self.need_keyframe
+        if keyframe:
+            self.need_keyframe = False
+        for msg in self.encoder.tick(dt, keys, keyframe):
+            self.pending.put(msg)
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            conn.setblocking(False)
+            self.waiting[conn] = bytearray(self.encoder.board_bytes)
+            self.connected += 1
+            self.need_keyframe = True
+
+    def _drop(self, conn):
+        self.clients.pop(conn, None)
+        self.waiting.pop(conn, None)
+        self.dropped += 1
+        conn.close()
+
+    def _send(self):
+        for group in (self.clients, self.waiting):
+            for conn, buf in list(group.items()):
+                if not buf:
+                    continue
+                try:
+                    n = conn.send(buf)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    self._drop(conn)
+                    continue
+                self.sent_bytes += n
+                del buf[:n]
+
+    def _run(self):
+        while self.running or not self.pending.empty():
+            self._accept()
+            try:
+                msg = self.pending.get(timeout=0.01)
+            except queue.Empty:
+                msg = None
+            while msg is not None:
+                self.broadcast_bytes += len(msg)
+                if msg[4] == MSG_KEYFRAME:
+                    # ожидающие зрители начинают с ключевого кадра
+                    self.clients.update(self.waiting)
+                    self.waiting.clear()
+                for conn, buf in list(self.clients.items()):
+                    buf += msg
+                    if len(buf) > MAX_BACKLOG:
+                        self._drop(conn)
+                try:
+                    msg = self.pending.get_nowait()
+                except queue.Empty:
+                    msg = None
+            self._send()
+        self._send()
+
+    def close(self):
+        msg = self.encoder.flush()
+        if msg is not None:
+            self.pending.put(msg)
+        self.running = False
+        self.thread.join()
+        for conn in list(self.clients) + list(self.waiting):
+            conn.close()
+        self.listener.close()
+        if self.family == socket.AF_UNIX and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def stats(self) -> dict:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "spectators": len(self.clients) + len(self.waiting),
+            "connected": self.connected,
+            "dropped": self.dropped,
+            "bytes_per_s_per_spectator": round(self.broadcast_bytes / elapsed, 1),
+            "sent_bytes": self.sent_bytes,
+        }
+
+
+# ==============================
+# Зритель
+# ==============================
+class SpectatorClient:
+    def __init__(self, address: str):
+        family, addr = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(addr)
+        self.mirror = StreamMirror()
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        # читает всё, что пришло; False - сервер закрыл соединение
+        self.sock.settimeout(timeout)
+        try:
+            while True:
+                data = self.sock.recv(1 << 16)
+                if not data:
+                    return False
+                self.mirror.feed(data)
+                self.sock.settimeout(0.0)
+        except (BlockingIOError, socket.timeout):
+            return True
+
+    def close(self):
+        self.sock.close()
+
+
+def _watch(client: SpectatorClient):
+    import cv2
+    from rendering import load_assets
+    from renderer import Renderer
+    load_assets()
+    mirror, renderer = client.mirror, None
+    while client.poll(1.0 / 60):
+        if not mirror.synced:
+            continue
+        if renderer is None or renderer.world.board is not mirror.board:
+            renderer = Renderer(mirror)
+        cv2.imshow("Frogger spectator", renderer.present(renderer.render()))
+        if cv2.waitKey(1) & 0xFF in (27, ord('q')):
+            break
+    cv2.destroyAllWindows()
+
+
+def _log(client: SpectatorClient, period: float = 1.0):
+    mirror, last, last_bytes = client.mirror, time.perf_counter(), 0
+    while client.poll(period):
+        now = time.perf_counter()
+        if now - last < period or not mirror.synced:
+            continue
+        frog = mirror.frog
+        items = sum(len(lane_state["items"]) for lane_state in mirror.lanes)
+        keys = " ".join(str(k) for _, k in mirror.inputs)
+        print(f"step {mirror.steps} {mirror.state.name} lives {mirror.lives} score {mirror.score} "
+              f"frog ({frog.row}, {frog.pixel_x}) items {items} "
+              f"{(mirror.bytes - last_bytes) / (now - last):.0f} B/s" + (f" keys {keys}" if keys else ""))
+        mirror.inputs.clear()
+        last, last_bytes = now, mirror.bytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frogger spectator")
+    parser.add_argument("address", help="адрес игры: unix:/path или host:port (см. main.py --spectate)")
+    parser.add_argument("--view", action="store_true", help="показывать игру в окне (иначе - лог раз в секунду)")
+    args = parser.parse_args()
+    client = SpectatorClient(args.address)
+    try:
+        _watch(client) if args.view else _log(client)
+    finally:
+        client.close()
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+import settings
+from atlas import SpriteAtlas
+
+# каталог кэша по умолчанию, переопределяется переменной окружения
+DEFAULT_CACHE_DIR = os.environ.get(
+    "FROGGER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "frogger"))
+
+# значения settings.py, от которых зависит вид спрайтов
+SPRITE_SETTINGS = (
+    "CELL_SIZE",
+    "CAR_COLORS", "CAR_SIZES",
+    "LOG_COLORS", "LOG_SIZES",
+    "CROC_COLORS", "CROC_SIZES",
+)
+
+
+# ==============================================================
+# Ключ кэша: настройки + версия и байткод генераторов спрайтов
+# ==============================================================
+def cache_key(version: int, generators: Iterable[Callable]) -> str:
+    h = hashlib.sha256()
+    h.update(str(version).encode())
+    values = {name: getattr(settings, name) for name in SPRITE_SETTINGS}
+    h.update(json.dumps(values, sort_keys=True).encode())
+    # изменение кода генератора меняет ключ даже без ручного поднятия версии
+    for fn in generators:
+        code = fn.__code__
+        h.update(code.co_code)
+        h.update(repr(code.co_consts).encode())
+    return h.hexdigest()[:16]
+
+
+def cache_path(key: str, cache_dir: Optional[str] = None) -> str:
+    # путь без расширения: данные в ".bin", индекс в ".json"
+    return os.path.join(cache_dir or DEFAULT_CACHE_DIR, f"sprites-{key}")
+
+
+# ==============================
+# Чтение и запись
+# ==============================
+# Формат: буфер атласа (atlas.SpriteAtlas) как есть в "<path>.bin" -
+# отображается в память, спрайты становятся срезами без копирования, -
+# и таблица атласа в "<path>.json". Таблица пишется последней, так что
+# её наличие означает, что данные дописаны.
+def load(path: str) -> Optional[SpriteAtlas]:
+    # None -> кэша нет или он повреждён, нужно сгенерировать заново
+    try:
+        with open(path + ".json") as f:
+            index = json.load(f)
+        # обычный ndarray поверх отображения: срезы np.memmap заметно дороже
+        blob = np.asarray(np.memmap(path + ".bin", dtype=np.uint8, mode="r"))
+        return SpriteAtlas.from_buffer(blob, index)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_atomic(path: str, write):
+    # временный файл + переименование: параллельно стартующие процессы
+    # никогда не увидят недописанный файл
+    directory = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.chmod(tmp, 0o644) # mkstemp создаёт файл только для владельца
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def save(path: str, atlas: SpriteAtlas):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    data = atlas.buffer[:atlas.used]
+    _write_atomic(path + ".bin", lambda f: f.write(data.tobytes()))
+    _write_atomic(path + ".json", lambda f: f.write(json.dumps(atlas.to_index()).encode()))
+    _remove_stale(directory, os.path.basename(path))
+
+
+def _remove_stale(directory: str, keep: str):
+    # кэши от старых настроек больше не нужны
+    for name in os.listdir(directory):
+        if name.startswith("sprites-") and not name.startswith(keep) and not name.endswith(".tmp"):
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
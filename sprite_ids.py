@@ -0,0 +1,71 @@
+from enums import Facing, Direction
+from settings import CAR_COLORS, CAR_SIZES, LOG_SIZES, CROC_SIZES
+
+# ==========================================================
+# Числовые id спрайтов (без cv2, чтобы их знали спавнеры)
+# ==========================================================
+# Ключи совпадают с ключами ASSETS в rendering.load_assets.
+# SPRITE_SPECS[id] - описание, по которому rendering рисует спрайт:
+# ("frog", facing), ("car", size, color, direction), ("log", size),
+# ("croc", size, direction)
+SPRITE_KEYS = []
+SPRITE_SPECS = []
+SPRITE_IDS = {}
+
+def _register(key: str, spec: tuple) -> int:
+    SPRITE_KEYS.append(key)
+    SPRITE_SPECS.append(spec)
+    SPRITE_IDS[key] = len(SPRITE_KEYS) - 1
+    return SPRITE_IDS[key]
+
+FROG_SPRITE_IDS = {
+    facing: _register(f"frog_{facing.name.lower()}", ("frog", facing))
+    for facing in Facing
+}
+CAR_SPRITE_IDS = {
+    (size_info["size"], color, direction): _register(
+        f"car_{size_info['size']}_{i}_{direction.name.lower()}",
+        ("car", size_info["size"], color, direction))
+    for i, color in enumerate(CAR_COLORS)
+    for size_info in CAR_SIZES
+    for direction in Direction
+}
+LOG_SPRITE_IDS = {
+    size_info["size"]: _register(f"log_{size_info['size']}", ("log", size_info["size"]))
+    for size_info in LOG_SIZES
+}
+CROC_SPRITE_IDS = {
+    (size_info["size"], direction): _register(
+        f"croc_{size_info['size']}_{direction.name.lower()}",
+        ("croc", size_info["size"], direction))
+    for size_info in CROC_SIZES
+    for direction in Direction
+}
+
+# id спрайтов из таблиц settings.py; остальные регистрируются при первом
+# запросе, а рисуются при первой отрисовке (rendering.SpriteAtlas)
+BASE_SPRITE_COUNT = len(SPRITE_KEYS)
+
+NO_SPRITE = -1
+
+
+def car_sprite_id(size: int, color: tuple, direction: Direction) -> int:
+    sprite_id = CAR_SPRITE_IDS.get((size, color, direction))
+    if sprite_id is None:
+        name = "-".join(str(c) for c in color)
+        sprite_id = _register(f"car_{size}_{name}_{direction.name.lower()}", ("car", size, color, direction))
+        CAR_SPRITE_IDS[(size, color, direction)] = sprite_id
+    return sprite_id
+
+def log_sprite_id(size: int) -> int:
+    sprite_id = LOG_SPRITE_IDS.get(size)
+    if sprite_id is None:
+        sprite_id = LOG_SPRITE_IDS[size] = _register(f"log_{size}", ("log", size))
+    return sprite_id
+
+def croc_sprite_id(size: int, direction: Direction) -> int:
+    sprite_id = CROC_SPRITE_IDS.get((size, direction))
+    if sprite_id is None:
+        sprite_id = _register(f"croc_{size}_{direction.name.lower()}", ("croc", size, direction))
+        CROC_SPRITE_IDS[(size, direction)] = sprite_id
+    return sprite_id
@@ -0,0 +1,73 @@
+import time
+
+from settings import TARGET_FPS, MAX_SUBSTEPS
+
+
+# ====================================================================
+# Фиксированный шаг симуляции: реальное время копится в аккумуляторе
+# и расходуется тиками по dt; остаток (alpha) идёт на интерполяцию
+# ====================================================================
+class FixedStepClock:
+    def __init__(self, tick_rate: float = TARGET_FPS, max_substeps: int = MAX_SUBSTEPS):
+        self.dt = 1.0 / tick_rate
+        self.max_substeps = max_substeps
+        self.accumulator = 0.0
+        self.last = time.perf_counter()
+        self.started = self.last
+        self.frames = 0
+        self.ticks = 0
+        self.dropped_time = 0.0 # время, выброшенное после лагов
+
+    def advance(self) -> int:
+        # сколько тиков симуляции нужно сделать в этом кадре
+        now = time.perf_counter()
+        self.accumulator += now - self.last
+        self.last = now
+        self.frames += 1
+
+        n = int(self.accumulator / self.dt)
+        if n > self.max_substeps:
+            # после долгой паузы не догоняем всё сразу: лучше замедлиться,
+            # чем телепортировать объекты одним огромным dt
+            self.dropped_time += (n - self.max_substeps) * self.dt
+            n = self.max_substeps
+            self.accumulator = self.dt * n + (self.accumulator % self.dt)
+        self.accumulator -= n * self.dt
+        self.ticks += n
+        return n
+
+    @property
+    def alpha(self) -> float:
+        # доля следующего тика, уже прошедшая в реальном времени
+        return self.accumulator / self.dt
+
+    def summary(self) -> dict:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "fps": round(self.frames / elapsed, 2),
+            "tick_rate": round(self.ticks / elapsed, 2),
+            "dropped_s": round(self.dropped_time, 3),
+        }
+
+
+# ======================================================
+# Выдержка кадра: ждём только остаток бюджета кадра
+# ======================================================
+class FramePacer:
+    SPIN_S = 0.001 # последнюю миллисекунду крутимся, а не спим (точность sleep)
+
+    def __init__(self, fps: float = TARGET_FPS):
+        self.frame_time = 1.0 / fps
+        self.deadline = time.perf_counter() + self.frame_time
+
+    def wait(self):
+        now = time.perf_counter()
+        left = self.deadline - now
+        if left > self.SPIN_S:
+            time.sleep(left - self.SPIN_S)
+        while time.perf_counter() < self.deadline:
+            pass
+        self.deadline += self.frame_time
+        if self.deadline < now:
+            # отстали больше чем на кадр -> не пытаемся наверстать
+            self.deadline = now + self.frame_time
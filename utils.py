@@ -7,8 +7,8 @@ def clamp(value, lo, hi):
         return hi
     return value
 
-def weighted_choice(items, key="prob"):
-    r = random.random()
+def weighted_choice(items, key="prob", rng=random):
+    r = rng.random()
     cur = 0.0
     for item in items:
         cur += item[key]
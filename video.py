@@ -0,0 +1,82 @@
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, TARGET_FPS
+
+
+# ====================================================================
+# Запись видео в фоновом потоке: игровой цикл только копирует кадр
+# в свободный буфер, кодирование (cv2 отпускает GIL) идёт параллельно
+# ====================================================================
+class VideoRecorder:
+    def __init__(self, path: str,
+                 fps: float = TARGET_FPS,
+                 size=(WINDOW_WIDTH, WINDOW_HEIGHT),
+                 queue_size: int = 64,
+                 block: bool = False,
+                 fourcc: str = "mp4v"):
+        self.path = path
+        self.block = block # очередь полна: True - ждать писателя, False - выбросить кадр
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"cannot open video writer for {path}")
+
+        # заранее выделенные буферы кадров ходят по кругу: free -> pending -> free
+        w, h = size
+        self.free = queue.Queue()
+        for _ in range(queue_size):
+            self.free.put(np.empty((h, w, 3), dtype=np.uint8))
+        self.pending = queue.Queue()
+
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.encode_time = 0.0 # суммарное время VideoWriter.write
+        self.wait_time = 0.0 # сколько игровой поток ждал свободный буфер
+
+        self.thread = threading.Thread(target=self._run, name="video-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, frame: np.ndarray):
+        self.submitted += 1
+        if self.block:
+            start = time.perf_counter()
+            buf = self.free.get()
+            self.wait_time += time.perf_counter() - start
+        else:
+            try:
+                buf = self.free.get_nowait()
+            except queue.Empty:
+                self.dropped += 1
+                return
+        np.copyto(buf, frame)
+        self.pending.put(buf)
+
+    def _run(self):
+        while True:
+            buf = self.pending.get()
+            if buf is None:
+                break
+            start = time.perf_counter()
+            self.writer.write(buf)
+            self.encode_time += time.perf_counter() - start
+            self.written += 1
+            self.free.put(buf)
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        self.writer.release()
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "encode_fps": self.written / self.encode_time if self.encode_time > 0 else 0.0,
+            "producer_wait_s": self.wait_time,
+        }
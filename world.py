@@ -0,0 +1,254 @@
+import random
+from typing import Optional
+
+from enums import GameState, Action
+from settings import CELL_SIZE, START_LIVES
+from board import Board, DEFAULT_BOARD
+from entities import Frog, Car, WoodLog, Crocodile, MoverPool, MoverClock
+from spawners import CarSpawner, WaterLaneSpawner
+from collision import CollisionIndex
+from snapshot import Snapshot, SnapshotCache
+from profiler import NULL_PROFILER
+from utils import rects_intersect
+
+# смещение лягушки (col, row) для каждого действия
+ACTION_STEPS = {
+    Action.UP:    (0, -1),
+    Action.DOWN:  (0, +1),
+    Action.LEFT:  (-1, 0),
+    Action.RIGHT: (+1, 0),
+}
+
+
+# клавиши управления лягушкой (коды cv2.waitKey)
+KEY_ACTIONS = {
+    ord('w'): Action.UP,    82: Action.UP,
+    ord('s'): Action.DOWN,  84: Action.DOWN,
+    ord('a'): Action.LEFT,  81: Action.LEFT,
+    ord('d'): Action.RIGHT, 83: Action.RIGHT,
+}
+
+
+# =====================================================
+# Игровой мир без окна и рендеринга (не зависит от cv2)
+# =====================================================
+class World:
+    def __init__(self, seed: Optional[int] = None, board: Optional[Board] = None):
+        # вся случайность игры идёт через этот генератор
+        if seed is None:
+            seed = random.randrange(2**63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        # поле: размеры, полосы и зоны
+        self.board = board if board is not None else DEFAULT_BOARD
+
+        # сущности
+        self.frog = Frog(col=self.board.start_col, row=self.board.start_row, board=self.board)
+        # часы объектов: спавнеры ставят их на world.time в update,
+        # положения объектов считаются от них (MovingRect.x)
+        self.clock = MoverClock()
+        self.pool = MoverPool(self.clock) # общий для машин, брёвен и крокодилов
+        self.cars = CarSpawner(self.board, self.pool, self.rng)
+        self.water = WaterLaneSpawner(self.board, self.pool, self.rng) # брёвна + крокодилы
+        self.collision = CollisionIndex(self.cars, self.water)
+
+        # состояние
+        self.state = GameState.START
+        self.lives = START_LIVES
+        self.running = True
+        self.paused = False
+
+        self.time = 0.0 # время симуляции в секундах
+        self.max_pos = 0
+        self.last_death = None # причина последней смерти
+        self.profiler = NULL_PROFILER
+        self.snapshots = SnapshotCache(self)
+
+    @property
+    def score(self):
+        return self.max_pos * 10
+
+    # ==============================
+    # Ввод с клавиатуры
+    # ==============================
+    def handle_input(self, key):
+        if key in (27, ord('q')):
+            self.running = False
+            return
+        if key == 13 and self.state == GameState.START:
+            self.state = GameState.PLAYING
+            return
+        if key != 255 and self.state in (GameState.GAME_OVER, GameState.WIN):
+            self.state = GameState.START
+            self.lives = START_LIVES
+            return
+        if key == ord('p'):
+            self.paused = not self.paused
+            return
+
+        action = KEY_ACTIONS.get(key)
+        if action is not None:
+            self.apply_action(action)
+
+    # ==============================
+    # Действия
+    # ==============================
+    def apply_action(self, action: Action):
+        if self.paused or self.state != GameState.PLAYING:
+            return
+        step = ACTION_STEPS.get(action)
+        if step is not None:
+            self.frog.step(*step)
+
+    # ==============================
+    # Коллизии & правила
+    # ==============================
+    def _attach_or_detach_on_water(self):
+        frog = self.frog
+        # наступили на бревно -> привязываемся к нему
+        if frog.attached_log is None and frog.on_water():
+            log = self.collision.first_hit(frog.hitbox, frog.row, WoodLog)
+            if log is not None:
+                frog.attach_to(log)
+        # если уже привязаны к какому-то бревну, то проверяем до сих пор ли мы на нём стоим
+        elif frog.attached_log is not None:
+            hitbox = frog.hitbox
+            if rects_intersect(hitbox, frog.attached_log.hitbox):
+                return
+            # если не стоим, то пытаемся привязаться к другому бревну
+            log = self.collision.first_hit(hitbox, frog.row, WoodLog)
+            if log is not None:
+                frog.attach_to(log)
+                return
+            frog.detach()
+
+    def _reset_frog(self):
+        self.frog.reset(col=self.board.start_col, row=self.board.start_row)
+
+    def _death(self, cause: str):
+        self.lives -= 1
+        self.last_death = cause
+        self.on_death(cause)
+        if self.lives <= 0:
+            self.state = GameState.GAME_OVER
+            self.max_pos = 0
+        self._reset_frog()
+
+    def _offscreen_time(self, x0: int, x1: int, dt: float) -> Optional[float]:
+        # лягушку на бревне уносит от x0 к x1 за шаг: когда хитбокс впервые
+        # вышел за край поля (от начала шага), None - остался на поле
+        lo, hi = -1, self.board.width - CELL_SIZE + 1 # допустимые pixel_x
+        if not lo <= x0 <= hi:
+            return 0.0
+        if lo <= x1 <= hi:
+            return None
+        edge = hi if x1 > hi else lo
+        return dt * (edge - x0) / (x1 - x0)
+
+    def _check_death_conditions(self, dt: float, start_x: int):
+        # смерть - по событию, раньше всех случившемуся за шаг (заметание),
+        # а не по положению в конце шага: исход не зависит от длины dt.
+        # При равном времени порядок проверок прежний: машина, крокодил, вода
+        frog = self.frog
+        hitbox = frog.hitbox
+        events = [] # (время от начала шага, причина)
+        if frog.attached_log is None:
+            # лягушка стоит, объекты строки заметают отрезок за шаг
+            for cls, cause in ((Car, "car"), (Crocodile, "croc")):
+                t = self.collision.first_contact(hitbox, frog.row, dt, cls)
+                if t is not None:
+                    events.append((t, cause))
+            # падаем в воду -> смерть в момент прыжка
+            if frog.on_water():
+                events.append((0.0, "water"))
+        else:
+            # крокодилы строки едут вместе с бревном: касание не меняется за шаг
+            if self.collision.first_hit(hitbox, frog.row, Crocodile) is not None:
+                events.append((0.0, "croc"))
+            # уезжаем на бревне за край экрана -> смерть
+            t = self._offscreen_time(start_x, frog.pixel_x, dt)
+            if t is not None:
+                events.append((t, "offscreen"))
+
+        if events:
+            self._death(min(events, key=lambda e: e[0])[1])
+
+    def _check_win(self):
+        if self.board.is_finish(self.frog.row):
+            self.state = GameState.WIN
+            self.on_win()
+            self._reset_frog(); self.max_pos = 0; return
+
+    def _score_update(self):
+        # очки - за самую дальнюю строку от старта
+        progress = self.board.start_row - self.frog.row
+        if progress > self.max_pos:
+            self.max_pos = progress
+
+    # ==============================
+    # Снимки состояния (snapshot.py)
+    # ==============================
+    def snapshot(self, out: Optional[Snapshot] = None) -> Snapshot:
+        # out - буфер прошлого снимка этого поля, переписывается без выделений
+        return self.snapshots.take(out)
+
+    def restore(self, snap: Snapshot):
+        self.snapshots.restore(snap)
+
+    def fork(self) -> "World":
+        # независимая копия без окна, хуков и профайлера (для поиска). Без
+        # конструктора: поле, настройки спавнеров, составы полос (_LaneShape)
+        # и состояния генераторов общие со снимком, свои - только часы, пул
+        # и объекты полос. Засева полос нет: генераторы получают состояние
+        # из снимка при первой попытке спавна (LaneSpawner._attempt)
+        child = World.__new__(World)
+        child.seed = self.seed
+        child.rng = None # нужен только конструктору - для засева полос
+        child.board = self.board
+        child.frog = Frog(col=self.board.start_col, row=self.board.start_row, board=self.board)
+        child.clock = MoverClock()
+        child.pool = MoverPool(child.clock)
+        child.cars = self.cars.fork(child.pool)
+        child.water = self.water.fork(child.pool)
+        child.collision = CollisionIndex(child.cars, child.water)
+        child.running = True
+        child.profiler = NULL_PROFILER
+        child.snapshots = SnapshotCache(child)
+        # время, состояние игры, жизни и счёт ставит restore
+        child.restore(self.snapshot())
+        return child
+
+    # ==============================
+    # Хуки для обёрток (окно, логи)
+    # ==============================
+    def on_death(self, cause: str):
+        pass
+
+    def on_win(self):
+        pass
+
+    # ==============================
+    # Обновление
+    # ==============================
+    def update(self, dt: float):
+        if self.paused or self.state not in (GameState.START, GameState.PLAYING):
+            return
+
+        prof = self.profiler
+        self.time += dt
+        # прыжок случился в начале шага: привязка к бревну - по позициям
+        # на этот момент, дальше лягушка либо стоит, либо едет с бревном
+        with prof.section("update.attach"):
+            self._attach_or_detach_on_water()
+        start_x = self.frog.pixel_x
+        with prof.section("update.cars"):
+            self.cars.update(self.time, dt)
+        with prof.section("update.water"):
+            self.water.update(self.time, dt)
+        self.frog.update(dt)
+
+        with prof.section("update.death"):
+            self._check_death_conditions(dt, start_x)
+        self._check_win()
+        self._score_update()